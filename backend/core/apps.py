@@ -1,5 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class CoreConfig(AppConfig):
     name = "core"
+
+    def ready(self):
+        from core.etag import connect_signals as connect_etag_signals
+        from core.reference_cache import connect_signals as connect_reference_cache_signals
+        from core.search_outbox import SEARCH_BACKENDS
+
+        if settings.SEARCH_BACKEND not in SEARCH_BACKENDS:
+            raise ImproperlyConfigured(f"SEARCH_BACKEND must be one of {', '.join(SEARCH_BACKENDS)}")
+
+        connect_etag_signals()
+        connect_reference_cache_signals()
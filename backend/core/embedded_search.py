@@ -0,0 +1,472 @@
+"""
+Embedded, in-process search engine: the `embedded` search engine of core.typesense.
+
+It answers the subset of the Typesense search API the /search endpoints use (q, query_by, infix,
+filter_by, facet_by, page/per_page or offset/limit) with Typesense's response shape, so small
+installs and tests do not need a Typesense server.
+
+Each collection is an inverted index from trigrams of the lowercased words of its query_by fields
+to sorted arrays of document ordinals, plus the first one and two characters of every word for
+short queries. A query word selects the documents holding all of its grams; each candidate is then
+checked against the actual text and scored: an exact word beats a word prefix, which beats a
+substring inside a word (infix fields only), and earlier query_by fields weigh more.
+
+Persistence, per collection, in SEARCH_EMBEDDED_PATH:
+- `<name>.idx`, a snapshot: a marshal header with the documents and the term dictionary, followed
+  by the postings as raw uint32 arrays. It is memory-mapped on load and the postings are read in
+  place, so a restart does not rebuild the index.
+- `<name>.journal`, every change since the snapshot as JSON lines, fsynced before `upsert` or
+  `delete` returns and replayed on load. Changes live in an in-memory overlay (new ordinals plus
+  tombstones for replaced ones) until the overlay reaches SEARCH_EMBEDDED_COMPACT_OPS changes or
+  the engine is closed; then a new snapshot is written and the journal is cleared.
+
+The files belong to one process (the API, which runs the search outbox worker); other processes
+must not open them for writing.
+"""
+
+import bisect
+import json
+import marshal
+import mmap
+import operator
+import os
+import re
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from core.search_outbox import enqueue
+from core.typesense import SearchEngine, TypesenseCollection, registry
+
+MAGIC = b"MKDBIDX1"
+FORMAT_VERSION = 1
+HEADER = len(MAGIC) + 8  # magic, then the length of the marshal header as uint64
+WORD = re.compile(r"\w+")
+FILTER_CLAUSE = re.compile(r"^\s*(\w+):(>=|<=|!=|=|>|<)?(.*?)\s*$")
+
+COMPARE = {">": operator.gt, "<": operator.lt, ">=": operator.ge, "<=": operator.le}
+
+# Score of a query word per kind of match, times the field weight
+EXACT, PREFIX, INFIX = 3, 2, 1
+
+
+def words(text: str) -> List[str]:
+    return WORD.findall(text.lower())
+
+
+def grams(word: str) -> Set[str]:
+    """Index terms of a word: its trigrams and its first one and two characters ("^a", "^ab")."""
+    terms = {word[i : i + 3] for i in range(len(word) - 2)}
+    terms.update(f"^{word[:size]}" for size in (1, 2) if len(word) >= size)
+    return terms
+
+
+def query_terms(word: str) -> Set[str]:
+    """Terms every document matching the query word holds (its trigrams, or its prefix when shorter)."""
+    if len(word) >= 3:
+        return {word[i : i + 3] for i in range(len(word) - 2)}
+    return {f"^{word}"}
+
+
+def field_text(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+    return "" if value is None else str(value)
+
+
+def parse_value(raw: str) -> Any:
+    raw = raw.strip()
+    if raw.startswith("[") and raw.endswith("]"):
+        return [parse_value(item) for item in re.findall(r"`[^`]*`|[^,\s][^,]*", raw[1:-1])]
+    if raw.startswith("`") and raw.endswith("`"):
+        return raw[1:-1]
+    if raw in ("true", "false"):
+        return raw == "true"
+    try:
+        return float(raw) if "." in raw else int(raw)
+    except ValueError:
+        return raw
+
+
+def parse_filter(filter_by: str) -> List[Tuple[str, str, Any]]:
+    """`a:=[`x`,`y`] && b:>0` -> [("a", "=", ["x", "y"]), ("b", ">", 0)]; only && is supported."""
+    clauses = []
+    for clause in filter(None, (part.strip() for part in filter_by.split("&&"))):
+        match = FILTER_CLAUSE.match(clause)
+        if match is None:
+            raise ValueError(f"Unsupported filter: {clause}", 400)
+        field, comparison, value = match.groups()
+        clauses.append((field, comparison or "=", parse_value(value)))
+    return clauses
+
+
+def matches_filter(document: Dict, clauses: Sequence[Tuple[str, str, Any]]) -> bool:
+    for field, comparison, expected in clauses:
+        value = document.get(field)
+        if comparison in ("=", "!="):
+            wanted = expected if isinstance(expected, list) else [expected]
+            held = value if isinstance(value, list) else [value]
+            found = any(item in wanted for item in held)
+            if found != (comparison == "="):
+                return False
+        elif isinstance(value, bool) or not isinstance(value, (int, float)) or not COMPARE[comparison](value, expected):
+            return False
+    return True
+
+
+def contains(postings: Sequence[int], ordinal: int) -> bool:
+    position = bisect.bisect_left(postings, ordinal)
+    return position < len(postings) and postings[position] == ordinal
+
+
+def highlight(text: str, word: str) -> str:
+    position = text.lower().find(word)
+    if position < 0:
+        return text
+    return f"{text[:position]}<mark>{text[position:position + len(word)]}</mark>{text[position + len(word):]}"
+
+
+class EmbeddedIndex:
+    """One collection: a memory-mapped snapshot, an in-memory overlay of later changes and the journal."""
+
+    def __init__(self, directory: Path, name: str, fields: Sequence[str], compact_ops: int = 10000):
+        self.directory = directory
+        self.name = name
+        self.fields = list(fields)
+        self.compact_ops = compact_ops
+        self._lock = threading.RLock()
+        self._journal = None
+        self._load()
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.directory / f"{self.name}.idx"
+
+    @property
+    def journal_path(self) -> Path:
+        return self.directory / f"{self.name}.journal"
+
+    # Loading and persistence
+
+    def _reset(self):
+        self._mmap: Optional[mmap.mmap] = None
+        self._postings: Optional[memoryview] = None
+        self._terms: Dict[str, Tuple[int, int]] = {}  # snapshot term -> (offset, count) in _postings
+        self._docs: List[Optional[Dict]] = []  # ordinal -> document; None once deleted or replaced
+        self._ordinals: Dict[str, int] = {}  # document id -> current ordinal
+        self._snapshot_size = 0  # ordinals below this are in the snapshot
+        self._live: Dict[str, array] = {}  # overlay term -> ordinals
+        self._changes = 0
+
+    def _load(self):
+        self._reset()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.snapshot_path.exists():
+            self._open_snapshot()
+        if self.journal_path.exists():
+            with open(self.journal_path, "r+b") as journal:
+                replayed = 0
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line torn by a crash mid-write: it was never acknowledged, drop it
+                        journal.truncate(replayed)
+                        break
+                    replayed += len(line)
+                    if entry["op"] == "upsert":
+                        self._upsert(entry["doc"])
+                    else:
+                        self._delete(entry["id"])
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def _open_snapshot(self):
+        with open(self.snapshot_path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.snapshot_path} is not a search index snapshot")
+        header_size = int.from_bytes(self._mmap[len(MAGIC) : HEADER], "little")
+        header = marshal.loads(self._mmap[HEADER : HEADER + header_size])
+        if header["version"] != FORMAT_VERSION or header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{self.snapshot_path} was written by another format or platform")
+        self._postings = memoryview(self._mmap)[HEADER + header_size :].cast("I")
+        self._terms = header["terms"]
+        self._docs = header["docs"]
+        self._snapshot_size = len(self._docs)
+        self._ordinals = {doc["id"]: ordinal for ordinal, doc in enumerate(self._docs)}
+
+    def _close_snapshot(self):
+        if self._postings is not None:
+            self._postings.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def compact(self):
+        """Write the current documents as a new snapshot and clear the journal and overlay."""
+        with self._lock:
+            documents = [doc for doc in self._docs if doc is not None]
+            postings: Dict[str, array] = {}
+            for ordinal, doc in enumerate(documents):
+                for term in self._document_terms(doc):
+                    postings.setdefault(term, array("I")).append(ordinal)
+            terms, offset = {}, 0
+            for term, ordinals in postings.items():
+                terms[term] = (offset, len(ordinals))
+                offset += len(ordinals)
+            header = marshal.dumps(
+                {"version": FORMAT_VERSION, "byteorder": sys.byteorder, "terms": terms, "docs": documents}
+            )
+
+            temporary = self.snapshot_path.with_suffix(".idx.tmp")
+            with open(temporary, "wb") as file:
+                file.write(MAGIC + len(header).to_bytes(8, "little") + header)
+                for ordinals in postings.values():
+                    ordinals.tofile(file)
+                file.flush()
+                os.fsync(file.fileno())
+            self._close_snapshot()
+            os.replace(temporary, self.snapshot_path)
+            self._journal.close()
+            open(self.journal_path, "w").close()
+            self._load()
+
+    def close(self):
+        with self._lock:
+            if self._changes:
+                self.compact()
+            self._journal.close()
+            self._close_snapshot()
+
+    # Writes
+
+    def _document_terms(self, document: Dict) -> Set[str]:
+        terms = set()
+        for field in self.fields:
+            for word in words(field_text(document.get(field))):
+                terms |= grams(word)
+        return terms
+
+    def _upsert(self, document: Dict):
+        self._delete(document["id"])
+        ordinal = len(self._docs)
+        self._docs.append(document)
+        self._ordinals[document["id"]] = ordinal
+        for term in self._document_terms(document):
+            self._live.setdefault(term, array("I")).append(ordinal)
+        self._changes += 1
+
+    def _delete(self, document_id: str):
+        ordinal = self._ordinals.pop(document_id, None)
+        if ordinal is not None:
+            self._docs[ordinal] = None
+            self._changes += 1
+
+    def _write_journal(self, entries: Iterable[Dict]):
+        self._journal.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def upsert(self, documents: Sequence[Dict]):
+        with self._lock:
+            self._write_journal({"op": "upsert", "doc": document} for document in documents)
+            for document in documents:
+                self._upsert(document)
+            self._maybe_compact()
+
+    def delete(self, ids: Sequence[str]):
+        with self._lock:
+            self._write_journal({"op": "delete", "id": document_id} for document_id in ids)
+            for document_id in ids:
+                self._delete(document_id)
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._changes >= self.compact_ops:
+            self.compact()
+
+    # Reads
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def _posting_lists(self, term: str) -> List[Sequence[int]]:
+        lists = []
+        if term in self._terms:
+            offset, count = self._terms[term]
+            lists.append(self._postings[offset : offset + count])
+        if term in self._live:
+            lists.append(self._live[term])
+        return lists
+
+    def _candidates(self, word: str) -> Set[int]:
+        """Live ordinals holding every query term of `word` (a superset of the matches)."""
+        terms = sorted(query_terms(word), key=lambda term: sum(len(p) for p in self._posting_lists(term)))
+        candidates = {ordinal for postings in self._posting_lists(terms[0]) for ordinal in postings}
+        for term in terms[1:]:
+            lists = self._posting_lists(term)
+            candidates = {ordinal for ordinal in candidates if any(contains(p, ordinal) for p in lists)}
+            if not candidates:
+                break
+        return {ordinal for ordinal in candidates if self._docs[ordinal] is not None}
+
+    def _score(self, document: Dict, query: List[Tuple], fields: List[str], infix: Set[str]) -> Tuple[int, Dict]:
+        """Score of `document` for the query words, and the field each word matched best in."""
+        score, matched = 0, {}
+        for word, exact, prefix in query:
+            best = 0
+            for position, field in enumerate(fields):
+                weight = len(fields) - position
+                if best >= EXACT * weight:
+                    break  # no later field can score higher
+                text = field_text(document.get(field)).lower()
+                if word not in text:
+                    continue
+                if exact.search(text):
+                    kind = EXACT
+                elif prefix.search(text):
+                    kind = PREFIX
+                elif field in infix:
+                    kind = INFIX
+                else:
+                    continue
+                if kind * weight > best:
+                    best, matched[word] = kind * weight, field
+            if not best:
+                return 0, {}
+            score += best
+        return score, matched
+
+    def search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        q = str(params.get("q", "*"))
+        fields = [field for field in str(params.get("query_by", ",".join(self.fields))).split(",") if field]
+        infix_modes = str(params.get("infix", "off")).split(",")
+        infix = {
+            field
+            for position, field in enumerate(fields)
+            if (infix_modes[position] if position < len(infix_modes) else infix_modes[-1]) != "off"
+        }
+        clauses = parse_filter(str(params["filter_by"])) if params.get("filter_by") else []
+
+        with self._lock:
+            query = [] if q.strip() == "*" else words(q)
+            if query:
+                patterns = [
+                    (word, re.compile(rf"\b{word}\b"), re.compile(rf"\b{word}")) for word in dict.fromkeys(query)
+                ]
+                ordinals = None
+                for word in query:
+                    found = self._candidates(word)
+                    ordinals = found if ordinals is None else ordinals & found
+                ranked = []
+                for ordinal in ordinals or ():
+                    document = self._docs[ordinal]
+                    if clauses and not matches_filter(document, clauses):
+                        continue
+                    score, matched = self._score(document, patterns, fields, infix)
+                    if score:
+                        ranked.append((score, document, matched))
+            else:
+                ranked = [
+                    (0, document, {})
+                    for document in self._docs
+                    if document is not None and (not clauses or matches_filter(document, clauses))
+                ]
+
+        ranked.sort(key=lambda hit: (-hit[0], -hit[1].get("created_at", 0), hit[1]["id"]))
+        facet_counts = []
+        for field in filter(None, str(params.get("facet_by", "")).split(",")):
+            counts: Dict[Any, int] = {}
+            for _, document, _ in ranked:
+                value = document.get(field)
+                for item in value if isinstance(value, list) else [value]:
+                    if item not in (None, ""):
+                        counts[item] = counts.get(item, 0) + 1
+            top = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+            top = top[: int(params.get("max_facet_values", 10))]
+            facet_counts.append(
+                {"field_name": field, "counts": [{"value": str(value), "count": count} for value, count in top]}
+            )
+
+        if "offset" in params or "limit" in params:
+            start, size = int(params.get("offset", 0)), int(params.get("limit", 10))
+        else:
+            size = int(params.get("per_page", 10))
+            start = (int(params.get("page", 1)) - 1) * size
+        return {
+            "found": len(ranked),
+            "hits": [
+                {
+                    "document": document,
+                    "highlights": [
+                        {"field": field, "snippet": highlight(field_text(document.get(field)), word)}
+                        for word, field in matched.items()
+                    ],
+                    "text_match": score,
+                }
+                for score, document, matched in ranked[start : start + size]
+            ],
+            "facet_counts": facet_counts,
+        }
+
+
+class EmbeddedEngine(SearchEngine):
+    """The `embedded` SearchEngine: one EmbeddedIndex per collection, stored under `directory`."""
+
+    name = "embedded"
+
+    def __init__(self, directory, compact_ops: int = 10000):
+        self.directory = Path(directory)
+        self.compact_ops = compact_ops
+        self._indexes: Dict[str, EmbeddedIndex] = {}
+        self._lock = threading.Lock()
+
+    def _index(self, name: str, fields: Optional[Sequence[str]] = None) -> EmbeddedIndex:
+        with self._lock:
+            if name not in self._indexes:
+                if fields is None:
+                    fields = registry.collections[name].query_by_fields
+                self._indexes[name] = EmbeddedIndex(self.directory, name, fields, self.compact_ops)
+            return self._indexes[name]
+
+    def _files(self, name: str) -> Tuple[Path, Path]:
+        return self.directory / f"{name}.idx", self.directory / f"{name}.journal"
+
+    def exists(self, name: str) -> bool:
+        return name in self._indexes or any(path.exists() for path in self._files(name))
+
+    def create_collection(self, collection: TypesenseCollection, name: Optional[str] = None):
+        self._index(name or collection.name, collection.query_by_fields)
+
+    def drop_collection(self, name: str):
+        with self._lock:
+            index = self._indexes.pop(name, None)
+        if index is not None:
+            index.close()
+        for path in self._files(name):
+            path.unlink(missing_ok=True)
+
+    def upsert(self, name: str, documents: List[Dict]) -> Dict[str, str]:
+        self._index(name).upsert(documents)
+        return {}
+
+    def delete(self, name: str, ids: List[str]):
+        self._index(name).delete(ids)
+
+    def search(self, name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self._index(name).search(params)
+
+    def close(self):
+        with self._lock:
+            indexes, self._indexes = list(self._indexes.values()), {}
+        for index in indexes:
+            index.close()
+
+
+def queue_unindexed_collections():
+    """Queue every row of the registered collections that have no index yet, e.g. on first start."""
+    engine = registry.engine
+    for name, collection in registry.collections.items():
+        if not engine.exists(name):
+            engine.create_collection(collection)
+            enqueue(name, collection.model.objects.values_list("pk", flat=True).iterator())
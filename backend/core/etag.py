@@ -0,0 +1,159 @@
+"""
+Conditional GET (ETag / If-None-Match) for API resources.
+
+Every tracked model has a version number in the cache, bumped on commit by its post_save,
+post_delete and m2m_changed signals. A resource (e.g. "stock") is the set of models its responses
+are built from, and its ETag is a hash of their versions, so an unchanged resource is answered
+with 304 Not Modified after a single cache lookup and no database query. The ETag of a DATED
+resource also changes at midnight, when its daily history moves on without any write. Bulk paths
+that bypass model signals (QuerySet.update, bulk_create) must call bump_versions() themselves.
+
+Versions live in the Django cache. Every bump is also sent with pg_notify() in the writer's
+transaction (core.pg_listen), and each process bumps its own counters when notified, so writes made
+by other processes (uvicorn workers, management commands) change the ETag even with a per-process
+cache (locmem). With ETAG_LISTEN off, a multi-process deployment needs a shared cache (CACHE_URL).
+"""
+
+import hashlib
+import time
+from typing import Dict, Iterable, List, Optional
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils import timezone
+from fastapi import Depends, HTTPException, Request, Response
+from core import pg_listen
+from core.executor import database_sync_to_async
+
+VERSION_KEY = "etag:version:{}"
+CHANNEL = "makerdb_etag"
+
+PART = ("parts.Part", "parts.Designator", "core.Company", "core.Attachment", "inventory.PartStockSummary")
+STORAGE = ("inventory.Storage", "core.Attachment")
+LOT = ("inventory.Lot", "core.Attachment")
+DASHBOARD = (
+    "parts.Part",
+    "procurement.Order",
+    "projects.Project",
+    "inventory.Stock",
+    "inventory.StockMovement",
+    "inventory.StockSnapshot",
+    "inventory.StockValuation",
+)
+
+RESOURCES: Dict[str, tuple] = {
+    "companies": ("core.Company", "core.Attachment"),
+    "designators": ("parts.Designator",),
+    "parts": PART,
+    "locations": (*STORAGE, "inventory.Stock"),  # has_stock filters on stock
+    "lots": LOT,
+    "stock": ("inventory.Stock", *PART, *STORAGE, *LOT),
+    "movements": ("inventory.StockMovement",),
+    "orders": ("procurement.Order", "core.Company", "core.Attachment"),
+    "offers": ("procurement.Offer", *PART),
+    "projects": ("projects.Project", "core.Attachment"),
+    "bom": ("projects.BOMItem", *PART),
+    "dashboard": DASHBOARD,
+    "overview": (*DASHBOARD, "inventory.Storage", "inventory.PartStockSummary"),
+}
+
+# Resources whose content also depends on the current day (dashboard value history)
+DATED = frozenset({"dashboard", "overview"})
+
+TRACKED = frozenset(label for labels in RESOURCES.values() for label in labels)
+
+
+def _label(model) -> str:
+    return model._meta.label
+
+
+def _bump(labels: List[str]):
+    for label in labels:
+        key = VERSION_KEY.format(label)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def bump_versions(*changed: type[models.Model]):
+    """Mark the `changed` models as changed once the current transaction commits."""
+    labels = [_label(model) for model in changed if _label(model) in TRACKED]
+    if labels:
+        transaction.on_commit(lambda: _bump(labels))
+        pg_listen.notify(CHANNEL, ",".join(labels))
+
+
+def _handle_notify(payload: str):
+    _bump([label for label in payload.split(",") if label in TRACKED])
+
+
+def start_listener():
+    """Listen for changes from other processes; the API starts it in its lifespan, others on first use."""
+    if settings.ETAG_LISTEN:
+        # Missed notifications while reconnecting: any version may be stale
+        pg_listen.listen(CHANNEL, _handle_notify, lambda: _bump(sorted(TRACKED)))
+
+
+def resource_etag(resource: str) -> str:
+    """The current (weak) ETag of `resource`, from one cache lookup."""
+    start_listener()
+    labels = sorted(set(RESOURCES[resource]))
+    keys = [VERSION_KEY.format(label) for label in labels]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        # Seeded with the clock, so a restarted process never reissues an ETag from before a change
+        cache.set_many(missing, None)
+        versions.update(missing)
+    state = [versions[key] for key in keys]
+    if resource in DATED:
+        state.append(timezone.localdate().isoformat())
+    digest = hashlib.sha1(f"{resource}:{state}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against `etag`, as used for GET."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in tags}
+
+
+def conditional_get(resource: str):
+    """
+    Route dependency answering 304 Not Modified when the client's ETag is current, and adding
+    ETag and Cache-Control: no-cache (always revalidate) to the response otherwise.
+    """
+    if resource not in RESOURCES:
+        raise KeyError(f"Unknown resource: {resource}")
+
+    async def check(request: Request, response: Response):
+        # Off the event loop: a cache lookup (network I/O with CACHE_URL), and starting the listener
+        etag = await database_sync_to_async(resource_etag)(resource)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return Depends(check)
+
+
+def _handle_change(sender, **kwargs):
+    bump_versions(sender)
+
+
+def _handle_m2m_change(sender, instance, action, model, **kwargs):
+    if action.startswith("post_"):
+        bump_versions(type(instance), model)
+
+
+def connect_signals(labels: Iterable[str] = TRACKED):
+    for label in labels:
+        model = apps.get_model(label)
+        post_save.connect(_handle_change, sender=model, dispatch_uid=f"core.etag.{label}_save")
+        post_delete.connect(_handle_change, sender=model, dispatch_uid=f"core.etag.{label}_delete")
+    m2m_changed.connect(_handle_m2m_change, dispatch_uid="core.etag.m2m")
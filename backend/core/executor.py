@@ -0,0 +1,140 @@
+"""
+Database executor for the API routers.
+
+asgiref's `sync_to_async` defaults to `thread_sensitive=True`, which runs the sync work of every
+concurrent request on one shared thread, so the API only ever executes one query at a time.
+Routers instead run their ORM work with `database_sync_to_async`, on a bounded pool of
+`DB_EXECUTOR_WORKERS` threads sized to the number of database connections the API may hold.
+
+Django connections are per thread. `close_old_connections()` runs around every call, as it does
+around a Django request: with the connection pool (DB_POOL) each call takes a connection from the
+pool and returns it afterwards; without it, each worker keeps its own connection until CONN_MAX_AGE
+or an error. A call is one unit of work on one thread; a `transaction.atomic` block must live
+inside the function it runs.
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Dict, Optional
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+
+class DatabaseExecutor:
+    """A thread pool for blocking database work, with queue depth and wait time counters."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._max_queued = 0
+        self._completed = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="makerdb-db")
+            return self._pool
+
+    def _call(self, submitted: float, func, args, kwargs):
+        started = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self._wait_seconds += started - submitted
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+                self._run_seconds += time.perf_counter() - started
+
+    async def run(self, func, *args, **kwargs):
+        """Run `func(*args, **kwargs)` on a database thread and return its result."""
+        pool = self._executor()
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        call = functools.partial(copy_context().run, self._call, time.perf_counter(), func, args, kwargs)
+        return await asyncio.get_running_loop().run_in_executor(pool, call)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.max_workers,
+                "active": self._active,
+                "queued": self._queued,
+                "max_queued": self._max_queued,
+                "completed": completed,
+                "avg_wait_ms": round(self._wait_seconds / completed * 1000, 3) if completed else 0.0,
+                "avg_run_ms": round(self._run_seconds / completed * 1000, 3) if completed else 0.0,
+            }
+
+    def shutdown(self, timeout: float = 5.0):
+        """Close the connection of every worker thread and stop the pool."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        # Connections may only be closed by their own thread; the barrier puts one task on each worker.
+        barrier = threading.Barrier(self.max_workers)
+
+        def close():
+            try:
+                barrier.wait(timeout)
+            except threading.BrokenBarrierError:
+                pass
+            connections.close_all()
+
+        for _ in range(self.max_workers):
+            pool.submit(close)
+        pool.shutdown(wait=True)
+
+
+db_executor = DatabaseExecutor(settings.DB_EXECUTOR_WORKERS)
+
+
+def database_sync_to_async(func):
+    """Like `sync_to_async`, but runs `func` on the database executor. Usable as a decorator."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await db_executor.run(func, *args, **kwargs)
+
+    return wrapper
+
+
+def pool_stats() -> Optional[Dict]:
+    """Usage of the psycopg connection pool (see DB_POOL in settings), or None without pooling."""
+    pool = connections["default"].pool
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    requests = stats.get("requests_num", 0)
+    return {
+        "min_size": stats["pool_min"],
+        "max_size": stats["pool_max"],
+        "size": stats["pool_size"],
+        "in_use": stats["pool_size"] - stats["pool_available"],
+        "available": stats["pool_available"],
+        "waiting": stats.get("requests_waiting", 0),
+        "requests": requests,
+        "requests_queued": stats.get("requests_queued", 0),
+        "avg_wait_ms": round(stats.get("requests_wait_ms", 0) / requests, 3) if requests else 0.0,
+        "timeouts": stats.get("requests_errors", 0),
+        "connections_opened": stats.get("connections_num", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+        "bad_returns": stats.get("returns_bad", 0),
+    }
@@ -0,0 +1,62 @@
+import asyncio
+import time
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from core.executor import DatabaseExecutor
+from parts.models import Part
+
+
+def api_request(query_ms: float):
+    """One request's database work: a list query plus `query_ms` of server-side query time."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_sleep(%s)", [query_ms / 1000])
+    return list(Part.objects.order_by("name", "id").values("id", "name")[:20])
+
+
+class Command(BaseCommand):
+    help = "Compare API database throughput on the shared sync_to_async thread and on executors of several sizes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=400, help="Requests per run")
+        parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once")
+        parser.add_argument("--workers", default="1,2,4,8,16", help="Comma-separated executor sizes to measure")
+        parser.add_argument("--query-ms", type=float, default=5.0, help="Simulated query time per request")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options["workers"].split(",")]
+        except ValueError:
+            raise CommandError("--workers must be a comma-separated list of integers")
+
+        def measure(run):
+            return asyncio.run(self._drive(run, options["requests"], options["concurrency"], options["query_ms"]))
+
+        self.stdout.write(f"{'path':<22}{'req/s':>10}{'avg wait ms':>14}")
+        baseline = measure(lambda func, *args: sync_to_async(func)(*args))
+        self.stdout.write(f"{'sync_to_async':<22}{baseline:>10.1f}{'-':>14}")
+
+        best = baseline
+        for size in sizes:
+            executor = DatabaseExecutor(size)
+            try:
+                rate = measure(executor.run)
+                wait = executor.stats()["avg_wait_ms"]
+            finally:
+                executor.shutdown()
+            best = max(best, rate)
+            self.stdout.write(f"{f'executor ({size} workers)':<22}{rate:>10.1f}{wait:>14.1f}")
+
+        self.stdout.write(self.style.SUCCESS(f"best executor is {best / baseline:.1f}x the sync_to_async throughput"))
+
+    async def _drive(self, run, requests, concurrency, query_ms):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                await run(api_request, query_ms)
+
+        await one()  # warm up the connection
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return requests / (time.perf_counter() - started)
@@ -0,0 +1,131 @@
+import random
+import statistics
+import string
+import tempfile
+import time
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from core.embedded_search import EmbeddedIndex
+from core.typesense import PartCollection, TypesenseEngine, registry
+
+KINDS = ["Resistor", "Capacitor", "Inductor", "Diode", "Transistor", "Connector", "Crystal", "Regulator"]
+FOOTPRINTS = ["0402", "0603", "0805", "1206", "SOT-23", "SOIC-8", "QFN-32", "TO-220"]
+MAKERS = ["Murata", "Yageo", "Vishay", "TDK", "Nexperia", "Texas Instruments", "Bourns", "Kemet"]
+# q, infix: word prefixes as typed, and substrings from inside MPNs
+QUERIES = {"prefix": ["res", "capac 0805", "murata", "tr", "regulator sot"], "infix": ["0710", "104k", "r7", "a10"]}
+
+
+def synthetic_parts(count: int, seed: int = 0):
+    """Part documents shaped like PartCollection.to_document()."""
+    rng = random.Random(seed)
+    for number in range(count):
+        kind, footprint = rng.choice(KINDS), rng.choice(FOOTPRINTS)
+        mpn = "".join(rng.choices(string.ascii_uppercase + string.digits, k=rng.randint(8, 14)))
+        yield {
+            "id": f"00000000-0000-0000-0000-{number:012d}",
+            "name": f"{kind} {rng.randint(1, 999)}{rng.choice(['k', 'R', 'nF', 'uF', 'V', 'MHz'])} {footprint}",
+            "mpn": mpn,
+            "description": f"{kind} in a {footprint} package",
+            "manufacturer": rng.choice(MAKERS),
+            "manufacturer_id": "",
+            "designator": kind[0],
+            "part_type": rng.choice(["local", "linked", "meta"]),
+            "footprint": footprint,
+            "tags": rng.sample(["smd", "tht", "bulk", "audio", "power"], k=rng.randint(0, 2)),
+            "total_stock": rng.choice([0, 0, rng.randint(1, 5000)]),
+            "created_at": 1700000000 + number,
+        }
+
+
+def search_params(q: str, infix: bool):
+    fields = PartCollection.query_by_fields
+    return {
+        "q": q,
+        "query_by": ",".join(fields),
+        "infix": ",".join("always" if infix and field in PartCollection.infix_fields else "off" for field in fields),
+        "facet_by": ",".join(PartCollection.facet_fields),
+        "per_page": 20,
+    }
+
+
+def latencies(search, repeat: int):
+    """Percentiles of `search(params)` in ms, per kind of query."""
+    results = {}
+    for kind, queries in QUERIES.items():
+        samples = []
+        for _ in range(repeat):
+            for q in queries:
+                started = time.perf_counter()
+                search(search_params(q, kind == "infix"))
+                samples.append((time.perf_counter() - started) * 1000)
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+        results[kind] = (cuts[49], cuts[94], cuts[98])
+    return results
+
+
+class Command(BaseCommand):
+    help = "Measure index build, snapshot load and query latency of the embedded search engine (and Typesense)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated numbers of documents")
+        parser.add_argument("--repeat", type=int, default=20, help="Runs of each query per measurement")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Documents per upsert")
+        parser.add_argument(
+            "--typesense", action="store_true", help="Also measure a temporary collection on the Typesense server"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",")]
+        except ValueError:
+            raise CommandError("--sizes must be a comma-separated list of integers")
+
+        columns = ["build s", "load ms", "query", "p50 ms", "p95 ms", "p99 ms"]
+        self.stdout.write(f"{'engine':<10}{'docs':>9}" + "".join(f"{column:>10}" for column in columns))
+        for size in sizes:
+            documents = list(synthetic_parts(size))
+            with tempfile.TemporaryDirectory() as directory:
+                build, load, results = self._embedded(Path(directory), documents, options)
+            self._report("embedded", size, build, load, results)
+            if options["typesense"]:
+                build, results = self._typesense(documents, options)
+                self._report("typesense", size, build, None, results)
+
+    def _report(self, engine, size, build, load, results):
+        load = "-" if load is None else f"{load:.1f}"
+        for kind, (p50, p95, p99) in results.items():
+            self.stdout.write(
+                f"{engine:<10}{size:>9}{build:>10.2f}{load:>10}{kind:>10}{p50:>10.2f}{p95:>10.2f}{p99:>10.2f}"
+            )
+
+    def _embedded(self, directory, documents, options):
+        fields = PartCollection.query_by_fields
+        started = time.perf_counter()
+        index = EmbeddedIndex(directory, "parts", fields, compact_ops=len(documents) + 1)
+        for start in range(0, len(documents), options["batch_size"]):
+            index.upsert(documents[start : start + options["batch_size"]])
+        index.compact()
+        build = time.perf_counter() - started
+        index.close()
+
+        started = time.perf_counter()
+        index = EmbeddedIndex(directory, "parts", fields)
+        load = (time.perf_counter() - started) * 1000
+        try:
+            return build, load, latencies(index.search, options["repeat"])
+        finally:
+            index.close()
+
+    def _typesense(self, documents, options):
+        name = f"benchmark_parts_{len(documents)}"
+        engine = TypesenseEngine(lambda: registry.client)
+        engine.drop_collection(name)
+        engine.create_collection(PartCollection(), name)
+        try:
+            started = time.perf_counter()
+            for start in range(0, len(documents), options["batch_size"]):
+                engine.upsert(name, documents[start : start + options["batch_size"]])
+            build = time.perf_counter() - started
+            return build, latencies(lambda params: engine.search(name, params), options["repeat"])
+        finally:
+            engine.drop_collection(name)
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.search_outbox import indexing_enabled, outbox_stats, worker
+
+
+class Command(BaseCommand):
+    help = "Index the documents queued in the search outbox (use when SEARCH_OUTBOX_WORKER is off in the API)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the due rows and exit instead of polling")
+
+    def handle(self, *args, **options):
+        if settings.SEARCH_BACKEND == "embedded":
+            raise CommandError("The embedded search index is written by the API process's outbox worker only")
+        if not indexing_enabled():
+            raise CommandError(f"SEARCH_BACKEND {settings.SEARCH_BACKEND} searches the database; nothing is indexed")
+        if not options["once"]:
+            self.stdout.write("Draining the search outbox (Ctrl+C to stop)...")
+            worker.run()
+            return
+
+        handled = 0
+        while batch := worker.drain():
+            handled += batch
+        stats = outbox_stats()
+        message = f"Handled {handled} outbox rows; {stats['pending']} pending ({stats['retrying']} retrying)"
+        self.stdout.write(self.style.SUCCESS(message))
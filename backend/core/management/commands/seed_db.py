@@ -138,6 +138,16 @@ class Command(BaseCommand):
             defaults={"description": "Default storage location"},
         )
 
+        # Loaded once per run: seeding is one transaction, so the reference cache only fills on commit.
+        # The first row by primary key wins for duplicate names, as with a lookup.
+        designators, manufacturers, storages = {}, {}, {}
+        for designator in Designator.objects.order_by("pk"):
+            designators.setdefault(designator.code, designator)
+        for company in Company.objects.filter(is_manufacturer=True).order_by("pk"):
+            manufacturers.setdefault(company.name, company)
+        for storage in Storage.objects.order_by("pk"):
+            storages.setdefault(storage.name, storage)
+
         with open(filepath, "r", encoding="utf-8-sig") as f:
             reader = csv.DictReader(f)
 
@@ -157,11 +167,11 @@ class Command(BaseCommand):
 
                 designator = None
                 if designator_code:
-                    designator = Designator.objects.filter(code=designator_code).first()
+                    designator = designators.get(designator_code)
 
                 manufacturer = None
                 if manufacturer_name:
-                    manufacturer = Company.objects.filter(name=manufacturer_name, is_manufacturer=True).first()
+                    manufacturer = manufacturers.get(manufacturer_name)
 
                 part, part_created = Part.objects.update_or_create(
                     name=name,
@@ -178,10 +188,11 @@ class Command(BaseCommand):
                 if inventory > 0:
                     storage = default_storage
                     if location:
-                        storage, _ = Storage.objects.get_or_create(
-                            name=location,
-                            defaults={"description": f"Storage location: {location}"},
-                        )
+                        storage = storages.get(location)
+                        if storage is None:
+                            storage = storages[location] = Storage.objects.create(
+                                name=location, description=f"Storage location: {location}"
+                            )
 
                     stock, stock_created = Stock.objects.update_or_create(
                         part=part,
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:34
+
+import core.search_indexes
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_search_outbox'),
+    ]
+
+    operations = [
+        core.search_indexes.CreateExtensionIfAvailable('pg_trgm'),
+        migrations.AddField(
+            model_name='company',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('name', config='simple', weight='A'), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='company_search_vector_idx'),
+        ),
+        core.search_indexes.AddIndexIfExtension(
+            model_name='company',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='company_name_trgm_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_search_vectors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchSyncState',
+            fields=[
+                ('collection', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('synced_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -1,5 +1,8 @@
 import uuid
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from core.search_indexes import search_vector_field, trigram_index
+from django.utils import timezone
 
 class TimeStampedModel(models.Model):
     """
@@ -38,8 +41,17 @@ class Company(GlobalOpsBase):
     
     contacts = models.JSONField(default=list, blank=True) # List of contact info objects
 
+    # Full-text search (see core.search_indexes)
+    search_vector = search_vector_field(name="A")
+
     class Meta(GlobalOpsBase.Meta):
         verbose_name_plural = "Companies"
+        indexes = [
+            # Keyset pagination order (core.pagination.BY_NAME)
+            models.Index(fields=["name", "id"], name="company_name_id_idx"),
+            GinIndex(fields=["search_vector"], name="company_search_vector_idx"),
+            trigram_index("name", "company_name_trgm_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -73,3 +85,41 @@ class Attachment(TimeStampedModel):
 
     def __str__(self):
         return self.filename
+
+
+class SearchOutbox(models.Model):
+    """
+    A search document to bring in line with the database (core.search_outbox).
+    Written in the same transaction as the change; deleted once the document is indexed.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    collection = models.CharField(max_length=100)
+    document_id = models.CharField(max_length=100)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["next_attempt_at", "id"], name="search_outbox_due_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.collection}/{self.document_id}"
+
+
+class SearchSyncState(models.Model):
+    """
+    Watermark of a search collection (`manage.py sync_typesense`): the start of its last successful
+    sync. Rows updated from then on are what `sync_typesense --since last` syncs.
+    """
+
+    collection = models.CharField(max_length=100, primary_key=True)
+    synced_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.collection} @ {self.synced_at:%Y-%m-%d %H:%M:%S}"
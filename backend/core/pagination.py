@@ -0,0 +1,147 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Lists are ordered by a stable key ending in `id`, e.g. ("name", "id") or ("created_at", "id"),
+with a matching index. A cursor is an opaque token holding the key of the last row of a page;
+the next page is read with `WHERE key > cursor` instead of OFFSET, so deep pages cost the same
+as the first one and rows are neither repeated nor skipped when others are inserted or deleted.
+
+Offset pagination (`skip`) still works for existing clients. Both modes return the cursor for
+the following page in the X-Next-Cursor response header (absent on the last page).
+
+With `total`, the number of rows matching the filters is returned in X-Total-Count. On the first
+page it is computed by the page query itself (COUNT(*) OVER ()), so no separate count runs. With
+`estimate`, unfiltered lists of large tables use the planner's row estimate (pg_class.reltuples)
+instead, flagged with X-Total-Count-Estimated; filtered or small lists are still counted exactly.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Count, Q, Window
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_ESTIMATED_HEADER = "X-Total-Count-Estimated"
+
+# Tables the planner estimates below this many rows are counted exactly even when estimating
+EXACT_COUNT_BELOW = 10000
+
+_TOTAL_ALIAS = "_total_count"
+
+BY_NAME = ("name", "id")
+BY_CREATED = ("created_at", "id")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, model, ordering: Sequence[str]) -> List[Any]:
+    """The key values held by `cursor`, converted by the fields of `model` named in `ordering`."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ValueError("wrong number of values")
+        return [model._meta.get_field(field).to_python(value) for field, value in zip(ordering, values)]
+    except (binascii.Error, UnicodeDecodeError, ValidationError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _after(ordering: Sequence[str], values: Sequence[Any]) -> Q:
+    """Row-wise `(a, b, ...) > (x, y, ...)`, with a leading `a >= x` so the index range scan applies."""
+    condition = Q()
+    for index, field in enumerate(ordering):
+        step = Q(**{f"{field}__gt": values[index]}, **dict(zip(ordering[:index], values[:index])))
+        condition = step if index == 0 else condition | step
+    return Q(**{f"{ordering[0]}__gte": values[0]}) & condition
+
+
+def _key(item, field: str):
+    return item[field] if isinstance(item, dict) else getattr(item, field)
+
+
+class Total(NamedTuple):
+    count: int
+    estimated: bool = False
+
+
+def estimate_count(queryset) -> Optional[int]:
+    """
+    The planner's row estimate for an unfiltered `queryset` of a large table, or None when the
+    queryset is filtered, the table has not been analyzed, or it is small enough to count exactly.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql" or queryset.query.where or queryset.query.distinct:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    if row is None or row[0] < EXACT_COUNT_BELOW:
+        return None
+    return int(row[0])
+
+
+def count_total(queryset, estimate: bool = False) -> Total:
+    """Number of rows in `queryset`: exact, or the planner estimate if `estimate` allows one."""
+    estimated = estimate_count(queryset) if estimate else None
+    if estimated is not None:
+        return Total(estimated, estimated=True)
+    return Total(queryset.order_by().count())
+
+
+def paginate(
+    queryset,
+    ordering: Tuple[str, ...],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    total: bool = False,
+    estimate: bool = False,
+) -> Tuple[List, Optional[str], Optional[Total]]:
+    """
+    Return one page of `queryset` ordered by `ordering`, the cursor for the next page and, with
+    `total` or `estimate`, the number of rows in `queryset` (None otherwise).
+    Works on model and values() querysets; the latter must include the ordering columns.
+    """
+    count = None
+    if estimate:
+        estimated = estimate_count(queryset)
+        count = Total(estimated, estimated=True) if estimated is not None else None
+    fused = (total or estimate) and count is None and not cursor
+
+    page = queryset.order_by(*ordering)
+    if fused:
+        page = page.annotate(**{_TOTAL_ALIAS: Window(Count("*"))})
+    if cursor:
+        page = page.filter(_after(ordering, decode_cursor(cursor, queryset.model, ordering)))
+        items = list(page[: limit + 1])
+    else:
+        items = list(page[skip : skip + limit + 1])
+
+    if fused:
+        counts = [item.pop(_TOTAL_ALIAS) if isinstance(item, dict) else getattr(item, _TOTAL_ALIAS) for item in items]
+        # An empty page past the end carries no count; only then is a separate count needed
+        count = Total(counts[0] if counts else (queryset.order_by().count() if skip else 0))
+    elif (total or estimate) and count is None:
+        count = count_total(queryset)
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor([_key(items[-1], field) for field in ordering])
+    return items, next_cursor, count
+
+
+def set_page_headers(response: Response, next_cursor: Optional[str], total: Optional[Total] = None):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(total.count)
+        if total.estimated:
+            response.headers[TOTAL_ESTIMATED_HEADER] = "true"
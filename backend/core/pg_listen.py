@@ -0,0 +1,93 @@
+"""
+Postgres LISTEN/NOTIFY for per-process caches that must stay coherent across processes
+(core.reference_cache, core.etag): uvicorn workers, management commands and the API.
+
+notify() sends pg_notify() in the current transaction, so the notification is delivered on commit
+only. One listener thread per process LISTENs on every channel passed to listen(), on a dedicated
+connection, and hands each payload to the channel's handler. If the connection is lost, every
+channel's on_reconnect handler runs once it is back, since notifications may have been missed.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+from django.db import connection, connections
+
+logger = logging.getLogger(__name__)
+
+# Seconds listen() waits for the LISTEN to be in place
+LISTEN_TIMEOUT = 5.0
+
+
+class Channel(NamedTuple):
+    on_notify: Callable[[str], None]
+    on_reconnect: Callable[[], None]
+    listening: threading.Event
+
+
+_channels: Dict[str, Channel] = {}
+_lock = threading.Lock()
+_listener: Optional["_Listener"] = None
+
+
+def notify(channel: str, payload: str):
+    """Notify `channel` listeners in every process once the current transaction commits."""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [channel, payload])
+
+
+def listen(channel: str, on_notify: Callable[[str], None], on_reconnect: Callable[[], None]):
+    """
+    Deliver notifications on `channel` to on_notify(payload) in this process, from now on: returns
+    once the channel is listened to (or after LISTEN_TIMEOUT). Repeated calls are cheap no-ops.
+    """
+    global _listener
+    if channel in _channels or connection.vendor != "postgresql":
+        return
+    with _lock:
+        if channel not in _channels:
+            _channels[channel] = Channel(on_notify, on_reconnect, threading.Event())
+        if _listener is None:
+            _listener = _Listener()
+            _listener.start()
+    if not _channels[channel].listening.wait(LISTEN_TIMEOUT):
+        logger.warning("Not yet listening on %s; changes from other processes may be missed", channel)
+
+
+class _Listener(threading.Thread):
+    def __init__(self):
+        super().__init__(name="makerdb-pg-listen", daemon=True)
+
+    def run(self):
+        import psycopg
+
+        backoff, reconnecting = 1, False
+        while True:
+            listening = set()
+            try:
+                params = connections["default"].get_connection_params()
+                with psycopg.connect(**params, autocommit=True) as listen_connection:
+                    while True:
+                        for name, channel in list(_channels.items()):
+                            if name not in listening:
+                                listen_connection.execute(f"LISTEN {name}")
+                                listening.add(name)
+                                channel.listening.set()
+                        if reconnecting:
+                            # Anything may have changed while no listener was connected
+                            for channel in list(_channels.values()):
+                                channel.on_reconnect()
+                        backoff, reconnecting = 1, False
+                        # Wakes up every second to pick up channels added since
+                        for notification in listen_connection.notifies(timeout=1.0):
+                            if notification.channel in _channels:
+                                _channels[notification.channel].on_notify(notification.payload)
+            except Exception as e:
+                logger.warning("Postgres listener disconnected: %s", e)
+                reconnecting = True
+                for channel in list(_channels.values()):
+                    channel.on_reconnect()
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
@@ -0,0 +1,225 @@
+"""
+Projection read path for list endpoints.
+
+Instead of loading model instances, patching `obj.__dict__['attachments']` on every object and
+relation, and letting Pydantic read them back attribute by attribute, a Projection fetches the
+response columns of a model and its to-one relations in a single `values()` query, loads the
+attachments of every level with one query per level, and builds plain response dicts.
+
+Columns are derived from the response schema, so a projection stays in sync with the schema it
+feeds. Relations that the schema does not include are never joined.
+
+Endpoints narrow a projection per request with `select()` (the `fields=` and `expand=` query
+parameters), which removes the columns, joins, annotations and follow-up queries of everything
+not requested.
+"""
+
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Type
+from django.db import models
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ATTACHMENT_FIELDS = ("id", "file_type", "filename", "content_type", "size", "file", "created_at", "updated_at")
+
+
+def schema_columns(model: Type[models.Model], schema: Type[BaseModel]) -> List[str]:
+    """Concrete, non-relational columns of `model` that `schema` serializes (by name or attname)."""
+    columns = {}
+    for field in model._meta.concrete_fields:
+        columns[field.name] = field.name if not field.is_relation else None
+        columns[field.attname] = field.attname
+    return [columns[name] for name in schema.model_fields if columns.get(name)]
+
+
+def attachments_for(model: Type[models.Model], ids: Iterable) -> Dict[Any, List[Dict]]:
+    """Attachments of many `model` rows, grouped by owner id, from one query on the M2M table."""
+    ids = list(ids)
+    if not ids:
+        return {}
+    field = model._meta.get_field("attachments")
+    owner = f"{field.m2m_field_name()}_id"
+    target = field.m2m_reverse_field_name()
+
+    rows = (
+        field.remote_field.through.objects.filter(**{f"{owner}__in": ids})
+        .order_by(f"{target}__created_at")
+        .values(owner, *(f"{target}__{column}" for column in ATTACHMENT_FIELDS))
+    )
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[row[owner]].append({column: row[f"{target}__{column}"] for column in ATTACHMENT_FIELDS})
+    return grouped
+
+
+class Projection:
+    """
+    The columns, annotations, to-one relations and attachments to read for one model.
+
+    `related` maps a foreign key name to the Projection of the related model; a null foreign key
+    becomes None. `many` maps a many-to-many field name to the Projection of its targets, which are
+    loaded with one follow-up query. `annotations` maps an output key to a callable taking the
+    lookup prefix of this level (e.g. "part__") and returning an expression.
+    """
+
+    def __init__(
+        self,
+        model: Type[models.Model],
+        fields: Sequence[str],
+        related: Optional[Dict[str, "Projection"]] = None,
+        annotations: Optional[Dict[str, Callable[[str], Any]]] = None,
+        attachments: bool = False,
+        many: Optional[Dict[str, "Projection"]] = None,
+    ):
+        self.model = model
+        self.fields = tuple(dict.fromkeys(("id", *fields)))
+        self.related = related or {}
+        self.annotations = annotations or {}
+        self.attachments = attachments
+        self.many = many or {}
+
+    @classmethod
+    def for_schema(cls, model: Type[models.Model], schema: Type[BaseModel], **kwargs) -> "Projection":
+        """Projection of the columns `schema` serializes; attachments are read if the schema has them."""
+        kwargs.setdefault("attachments", "attachments" in schema.model_fields)
+        return cls(model, schema_columns(model, schema), **kwargs)
+
+    def _names(self) -> set:
+        names = {*self.fields, *self.annotations, *self.related, *self.many}
+        names.update(f"{name}_id" for name in self.related)
+        if self.attachments:
+            names.add("attachments")
+        return names
+
+    def select(
+        self, fields: Optional[List[str]] = None, expand: Optional[List[str]] = None, keep: Sequence[str] = ()
+    ) -> "Projection":
+        """
+        Narrow the projection to `fields` and the relations in `expand`; both accept dotted names
+        for nested levels ("part.name", "part.manufacturer"). With neither, the projection is
+        returned unchanged (every column, every relation). A relation that is neither expanded nor
+        named in `fields` is not joined; only its `<name>_id` column is returned. `id` and the
+        `keep` columns (e.g. the pagination key) are always included.
+        """
+        if fields is None and expand is None:
+            return self
+
+        own, nested_fields, nested_expand = set(), defaultdict(list), {}
+        for name in fields or []:
+            head, _, rest = name.partition(".")
+            if rest:
+                nested_fields[head].append(rest)
+            else:
+                own.add(head)
+        for name in expand or []:
+            head, _, rest = name.partition(".")
+            nested_expand.setdefault(head, [])
+            if rest:
+                nested_expand[head].append(rest)
+
+        relations = {*self.related, *self.many}
+        unknown = (own - self._names()) | ({*nested_fields, *nested_expand} - relations)
+        if unknown:
+            raise ValueError(f"Unknown field: {sorted(unknown)[0]}", 400)
+
+        def wanted(name):
+            return fields is None or name in own
+
+        def narrow(name, projection):
+            if name not in nested_expand and name not in own and name not in nested_fields:
+                return None
+            return projection.select(nested_fields.get(name) or None, nested_expand.get(name, []))
+
+        related = {name: narrow(name, projection) for name, projection in self.related.items()}
+        many = {name: narrow(name, projection) for name, projection in self.many.items()}
+        columns = [field for field in self.fields if wanted(field) or field in keep]
+        columns += [f"{name}_id" for name, projection in related.items() if projection is None and wanted(f"{name}_id")]
+        return Projection(
+            self.model,
+            columns,
+            related={name: projection for name, projection in related.items() if projection is not None},
+            annotations={name: expression for name, expression in self.annotations.items() if wanted(name)},
+            attachments=self.attachments and wanted("attachments"),
+            many={name: projection for name, projection in many.items() if projection is not None},
+        )
+
+    def _plan(self, prefix: str, columns: List[str], expressions: Dict[str, Any]):
+        for field in self.fields:
+            columns.append(f"{prefix}{field}")
+        for name, expression in self.annotations.items():
+            expressions[f"_{prefix}{name}".replace("__", "_")] = expression(prefix)
+        for name, projection in self.related.items():
+            projection._plan(f"{prefix}{name}__", columns, expressions)
+
+    def values(self, queryset):
+        """The `values()` queryset holding every column of this projection, including relations."""
+        columns: List[str] = []
+        expressions: Dict[str, Any] = {}
+        self._plan("", columns, expressions)
+        return queryset.values(*columns, **expressions)
+
+    def _build(self, row: Dict, prefix: str, pending: Dict) -> Optional[Dict]:
+        if row[f"{prefix}id"] is None:
+            return None
+        item = {field: row[f"{prefix}{field}"] for field in self.fields}
+        for name in self.annotations:
+            item[name] = row[f"_{prefix}{name}".replace("__", "_")]
+        for name, projection in self.related.items():
+            item[name] = projection._build(row, f"{prefix}{name}__", pending)
+        if self.attachments:
+            pending[(self, "attachments")].append(item)
+        for name in self.many:
+            pending[(self, name)].append(item)
+        return item
+
+    def _load_many(self, name: str, objects: List[Dict]):
+        field = self.model._meta.get_field(name)
+        owner = f"{field.m2m_field_name()}_id"
+        target = f"{field.m2m_reverse_field_name()}_id"
+        links = list(
+            field.remote_field.through.objects.filter(**{f"{owner}__in": {item["id"] for item in objects}})
+            .order_by("id")
+            .values_list(owner, target)
+        )
+        targets = self.many[name].fetch(field.related_model.objects.filter(id__in={link[1] for link in links}))
+        targets = {target["id"]: target for target in targets}
+        grouped = defaultdict(list)
+        for owner_id, target_id in links:
+            grouped[owner_id].append(targets[target_id])
+        for item in objects:
+            item[name] = grouped.get(item["id"], [])
+
+    def build(self, rows: Iterable[Dict]) -> List[Dict]:
+        """Turn rows from values() into nested response dicts and load attachments and M2M relations."""
+        pending: Dict[tuple, List[Dict]] = defaultdict(list)
+        items = [self._build(row, "", pending) for row in rows]
+        for (projection, name), objects in pending.items():
+            if name != "attachments":
+                projection._load_many(name, objects)
+                continue
+            attachments = attachments_for(projection.model, {item["id"] for item in objects})
+            for item in objects:
+                item["attachments"] = attachments.get(item["id"], [])
+        return items
+
+    def fetch(self, queryset) -> List[Dict]:
+        return self.build(self.values(queryset))
+
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated `fields=`/`expand=` query parameter (None when absent)."""
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def projected_response(items: List[Dict], response: Response, fields: Optional[str], expand: Optional[str]):
+    """
+    Return `items` for the endpoint's response model, or, for a sparse selection that the full
+    response model would reject, as a JSON response carrying the headers already set on `response`.
+    """
+    if fields is None and expand is None:
+        return items
+    return JSONResponse(jsonable_encoder(items), headers=dict(response.headers))
@@ -0,0 +1,21 @@
+"""Query helpers shared by the routers."""
+
+from typing import Dict
+from django.db import connections
+
+
+def count_many(using: str = "default", **querysets) -> Dict[str, int]:
+    """
+    Count several querysets in one SQL statement, with one scalar subquery per queryset:
+    `SELECT (SELECT COUNT(*) FROM (...)) AS "a", (SELECT COUNT(*) FROM (...)) AS "b"`.
+    """
+    connection = connections[using]
+    columns, params = [], []
+    for name, queryset in querysets.items():
+        sql, query_params = queryset.order_by().values("pk").query.sql_with_params()
+        columns.append(f"(SELECT COUNT(*) FROM ({sql}) AS counted) AS {connection.ops.quote_name(name)}")
+        params.extend(query_params)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(columns)}", params)
+        row = cursor.fetchone()
+    return dict(zip(querysets, row))
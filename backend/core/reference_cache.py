@@ -0,0 +1,137 @@
+"""
+In-process cache for reference data: designators, companies and storage locations.
+
+These rows rarely change but are looked up constantly (designator lists, manufacturer and storage
+validation in create_part/update_part). Each model gets a bounded LRU of instances keyed by
+lookup, plus cached full lists. Any save or delete of the model clears its cache and bumps its
+version; a load that started before the invalidation is not stored. Rows read inside a
+transaction are stored when it commits, and not at all if it rolls back.
+
+Other processes (e.g. uvicorn workers) are kept coherent through Postgres LISTEN/NOTIFY
+(core.pg_listen): a write sends pg_notify() in its own transaction, so the notification is
+delivered on commit only, and the listener thread of every process clears the named cache. If the
+listener loses its connection it clears every cache after reconnecting, since notifications may
+have been missed.
+
+Rows are only cached after they were found; misses always go to the database. Writes that bypass
+model signals (QuerySet.update, bulk_create of existing rows) must call invalidate() themselves.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from core import pg_listen
+
+CHANNEL = "makerdb_reference_cache"
+
+
+class ReferenceCache:
+    """A bounded, versioned cache of one model's rows. Returns copies, so callers may modify them."""
+
+    def __init__(self, label: str, max_size: Optional[int] = None):
+        self.label = label
+        self.max_size = max_size
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        return apps.get_model(self.label)
+
+    def _lookup(self, key, load):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            version = self.version
+
+        value = load()
+        if value is None:
+            return None
+        # Rows read in a transaction are only stored once it commits: it may still roll back
+        transaction.on_commit(lambda: self._store(key, value, version))
+        return value
+
+    def _store(self, key, value, version: int):
+        with self._lock:
+            if self.version == version:
+                self._entries[key] = value
+                limit = self.max_size or settings.REFERENCE_CACHE_SIZE
+                while len(self._entries) > limit:
+                    self._entries.popitem(last=False)
+
+    def get(self, **lookup):
+        """The first row (by primary key) matching `lookup`, or None. Only found rows are cached."""
+        start_listener()
+        key = tuple(sorted((field, str(value)) for field, value in lookup.items()))
+        instance = self._lookup(key, lambda: self.model.objects.filter(**lookup).order_by("pk").first())
+        return copy.copy(instance) if instance is not None else None
+
+    def all(self, *ordering: str) -> List:
+        """Every row, ordered by `ordering` (default: the model's ordering)."""
+        start_listener()
+        key = ("__all__", *ordering)
+        instances = self._lookup(key, lambda: list(self.model.objects.order_by(*ordering)))
+        return [copy.copy(instance) for instance in instances]
+
+    def invalidate(self):
+        """Clear this process's entries."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "version": self.version, "hits": self.hits, "misses": self.misses}
+
+
+designators = ReferenceCache("parts.Designator")
+companies = ReferenceCache("core.Company")
+storage_locations = ReferenceCache("inventory.Storage")
+
+CACHES: Dict[str, ReferenceCache] = {cache.label: cache for cache in (designators, companies, storage_locations)}
+
+
+def invalidate(label: str):
+    """Clear the cache for `label` here, and in every other process once the transaction commits."""
+    CACHES[label].invalidate()
+    # Also after commit: until then, other threads can still load and cache the old rows
+    transaction.on_commit(CACHES[label].invalidate)
+    pg_listen.notify(CHANNEL, label)
+
+
+def _handle_change(sender, **kwargs):
+    invalidate(sender._meta.label)
+
+
+def connect_signals():
+    for label in CACHES:
+        model = apps.get_model(label)
+        post_save.connect(_handle_change, sender=model, dispatch_uid=f"core.reference_cache.{label}_save")
+        post_delete.connect(_handle_change, sender=model, dispatch_uid=f"core.reference_cache.{label}_delete")
+
+
+def _handle_notify(label: str):
+    if label in CACHES:
+        CACHES[label].invalidate()
+
+
+def _invalidate_all():
+    for cache in CACHES.values():
+        cache.invalidate()
+
+
+def start_listener():
+    """Clear caches on writes from other processes; the API starts it in its lifespan, others on first use."""
+    if settings.REFERENCE_CACHE_LISTEN:
+        pg_listen.listen(CHANNEL, _handle_notify, _invalidate_all)
@@ -1,38 +1,45 @@
 from typing import List
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from uuid import UUID
 from core.models import Company
+from core.etag import conditional_get
+from core.pagination import BY_NAME, paginate, set_page_headers
 from core.schemas import CompanySchema, CompanyCreate
-from asgiref.sync import sync_to_async
+from core.executor import database_sync_to_async
 
 router = APIRouter(tags=["Core"])
 
 
-@router.get("/companies", response_model=List[CompanySchema])
+@router.get("/companies", response_model=List[CompanySchema], dependencies=[conditional_get("companies")])
 async def list_companies(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Cursor from the X-Next-Cursor header of the previous page (replaces skip)"),
+    total: bool = Query(False, description="Return the number of matching rows in the X-Total-Count header"),
+    estimate: bool = Query(False, description="Like total, but unfiltered large lists may use a planner estimate"),
     is_manufacturer: bool = None,
     is_vendor: bool = None,
 ):
     """List companies with optional filtering."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _list():
         queryset = Company.objects.all()
         if is_manufacturer is not None:
             queryset = queryset.filter(is_manufacturer=is_manufacturer)
         if is_vendor is not None:
             queryset = queryset.filter(is_vendor=is_vendor)
-        return list(queryset[skip : skip + limit])
+        return paginate(queryset, BY_NAME, limit, cursor=cursor, skip=skip, total=total, estimate=estimate)
 
-    companies = await _list()
+    companies, next_cursor, page_total = await _list()
+    set_page_headers(response, next_cursor, page_total)
     return companies
 
 
-@router.get("/companies/count", response_model=dict)
+@router.get("/companies/count", response_model=dict, dependencies=[conditional_get("companies")])
 async def count_companies(is_manufacturer: bool = None, is_vendor: bool = None):
-    @sync_to_async
+    @database_sync_to_async
     def _count():
         queryset = Company.objects.all()
         if is_manufacturer is not None:
@@ -45,11 +52,11 @@ async def count_companies(is_manufacturer: bool = None, is_vendor: bool = None):
     return {"count": count}
 
 
-@router.get("/companies/{company_id}", response_model=CompanySchema)
+@router.get("/companies/{company_id}", response_model=CompanySchema, dependencies=[conditional_get("companies")])
 async def get_company(company_id: UUID):
     """Get a company by ID."""
     try:
-        company = await sync_to_async(Company.objects.get)(id=company_id)
+        company = await database_sync_to_async(Company.objects.get)(id=company_id)
         return company
     except Company.DoesNotExist:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -59,7 +66,7 @@ async def get_company(company_id: UUID):
 async def create_company(data: CompanyCreate):
     """Create a new company (manufacturer or vendor)."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _create():
         company = Company.objects.create(**data.model_dump())
         return Company.objects.get(id=company.id)
@@ -75,7 +82,7 @@ async def create_company(data: CompanyCreate):
 async def update_company(company_id: UUID, data: CompanyCreate):
     """Update a company."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _update():
         try:
             company = Company.objects.get(id=company_id)
@@ -101,7 +108,7 @@ async def update_company(company_id: UUID, data: CompanyCreate):
 async def delete_company(company_id: UUID):
     """Delete a company."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _delete():
         try:
             company = Company.objects.get(id=company_id)
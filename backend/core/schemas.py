@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Dict, Any, Optional, Annotated
+from pydantic import BaseModel, ConfigDict, Field, BeforeValidator
 
 
 def convert_m2m_to_list(value):
@@ -11,6 +11,13 @@ def convert_m2m_to_list(value):
     return value
 
 
+def convert_file_to_name(value):
+    """Convert a Django FieldFile to its stored name (None when no file is set)."""
+    if hasattr(value, "field") and hasattr(value, "name"):
+        return value.name or None
+    return value or None
+
+
 class TimeStampedSchema(BaseModel):
     created_at: datetime
     updated_at: datetime
@@ -47,7 +54,7 @@ class AttachmentSchema(TimeStampedSchema):
     filename: str
     content_type: str
     size: int
-    file_url: Optional[str] = Field(None, alias="file")
+    file_url: Annotated[Optional[str], BeforeValidator(convert_file_to_name)] = Field(None, alias="file")
 
     # We might want to compute the full URL if we use Media storage
     @property
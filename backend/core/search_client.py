@@ -0,0 +1,158 @@
+"""
+Typesense connection settings and the API's shared HTTP client.
+
+The Typesense host is resolved once per process: TYPESENSE_HOST when set, otherwise "typesense"
+if that name resolves (inside Docker) and "localhost" if not. Both the async client the search
+router uses and the typesense.Client of core.typesense are built from `typesense_config()`.
+
+`search_client` holds one httpx.AsyncClient for the lifetime of the API (opened and closed by the
+ASGI lifespan), so searches reuse pooled keep-alive connections instead of paying a DNS lookup
+and a TCP handshake each. Requests time out after TYPESENSE_TIMEOUT seconds (TYPESENSE_CONNECT_TIMEOUT
+to connect); requests that fail to connect, and reads that fail on a transport error, are retried
+up to TYPESENSE_RETRIES times. Latency per endpoint is kept for /health/search.
+"""
+
+import asyncio
+import functools
+import logging
+import socket
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Methods that may be sent again after a transport error
+IDEMPOTENT_METHODS = {"GET", "HEAD", "DELETE"}
+# Latency samples kept per endpoint for the percentiles
+LATENCY_SAMPLES = 1000
+
+
+@functools.lru_cache(maxsize=None)
+def typesense_host() -> str:
+    if settings.TYPESENSE_HOST:
+        return settings.TYPESENSE_HOST
+    try:
+        socket.gethostbyname("typesense")
+        return "typesense"
+    except socket.gaierror:
+        return "localhost"
+
+
+def typesense_config() -> Dict[str, Any]:
+    return {
+        "host": typesense_host(),
+        "port": settings.TYPESENSE_PORT,
+        "protocol": settings.TYPESENSE_PROTOCOL,
+        "api_key": settings.TYPESENSE_API_KEY,
+        "url": f"{settings.TYPESENSE_PROTOCOL}://{typesense_host()}:{settings.TYPESENSE_PORT}",
+        "connect_timeout": settings.TYPESENSE_CONNECT_TIMEOUT,
+        "timeout": settings.TYPESENSE_TIMEOUT,
+        "retries": settings.TYPESENSE_RETRIES,
+    }
+
+
+def _percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class TypesenseHTTP:
+    """A pooled httpx.AsyncClient for Typesense, with retries and per-endpoint latency counters."""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=LATENCY_SAMPLES))
+        self._requests: Dict[str, int] = defaultdict(int)
+        self._errors: Dict[str, int] = defaultdict(int)
+        self.retries = 0
+        self.clients_opened = 0
+
+    def _build(self) -> httpx.AsyncClient:
+        config = typesense_config()
+        self.clients_opened += 1
+        return httpx.AsyncClient(
+            base_url=config["url"],
+            headers={"X-TYPESENSE-API-KEY": config["api_key"]},
+            timeout=httpx.Timeout(config["timeout"], connect=config["connect_timeout"]),
+            limits=httpx.Limits(
+                max_connections=settings.TYPESENSE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.TYPESENSE_MAX_CONNECTIONS,
+                keepalive_expiry=settings.TYPESENSE_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    def client(self) -> httpx.AsyncClient:
+        """The client of the running event loop; pooled connections cannot move between loops."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client, self._loop = self._build(), loop
+        return self._client
+
+    async def start(self):
+        self.client()
+
+    async def aclose(self):
+        client, self._client, self._loop = self._client, None, None
+        if client is not None:
+            await client.aclose()
+
+    async def request(
+        self, method: str, path: str, json: Optional[dict] = None, params: Optional[dict] = None
+    ) -> httpx.Response:
+        """Send a request and return the response; raises httpx.TransportError once retries run out."""
+        method = method.upper()
+        endpoint = f"{method} {path}"
+        attempts = settings.TYPESENSE_RETRIES + 1
+        for attempt in range(attempts):
+            started = time.perf_counter()
+            try:
+                response = await self.client().request(method, path, json=json, params=params)
+            except httpx.TransportError as e:
+                self._record(endpoint, time.perf_counter() - started, error=True)
+                retryable = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)) or method in IDEMPOTENT_METHODS
+                if not retryable or attempt == attempts - 1:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                logger.info("Typesense %s failed (%s), retrying", endpoint, type(e).__name__)
+                await asyncio.sleep(0.05 * 2**attempt)
+                continue
+            self._record(endpoint, time.perf_counter() - started, error=response.status_code >= 500)
+            return response
+
+    def _record(self, endpoint: str, seconds: float, error: bool = False):
+        with self._lock:
+            self._requests[endpoint] += 1
+            self._samples[endpoint].append(seconds)
+            if error:
+                self._errors[endpoint] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            endpoints = {
+                endpoint: {
+                    "requests": self._requests[endpoint],
+                    "errors": self._errors[endpoint],
+                    "p50_ms": round(_percentile(samples, 0.5) * 1000, 3),
+                    "p95_ms": round(_percentile(samples, 0.95) * 1000, 3),
+                    "p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+                    "max_ms": round(max(samples) * 1000, 3),
+                }
+                for endpoint, samples in self._samples.items()
+            }
+            return {
+                "url": typesense_config()["url"],
+                "open": self._client is not None,
+                "clients_opened": self.clients_opened,
+                "retries": self.retries,
+                "endpoints": endpoints,
+            }
+
+
+search_client = TypesenseHTTP()
@@ -0,0 +1,79 @@
+"""
+Postgres search columns and indexes, used by the Postgres search backend (search.backends).
+
+Searchable models carry a generated `search_vector` tsvector column (see `search_vector_field()`),
+kept current by Postgres itself and indexed with GIN. Substring (`icontains`) filters are
+backed by pg_trgm GIN indexes on UPPER(column), the expression Django's icontains compares,
+so the existing filters use them without changes.
+
+pg_trgm ships with Postgres contrib but is not installed everywhere. `CreateExtensionIfAvailable`
+and `AddIndexIfExtension` skip the extension and its indexes when the server does not provide
+it; icontains then falls back to a sequential scan and full-text search is unaffected.
+"""
+
+import logging
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import CreateExtension
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import models
+from django.db.migrations.operations import AddIndex
+from django.db.models.functions import Upper
+
+logger = logging.getLogger(__name__)
+
+TRIGRAM_EXTENSION = "pg_trgm"
+# Text search configuration: no stemming or stop words, as part names and MPNs are not prose
+SEARCH_CONFIG = "simple"
+
+
+def search_vector_field(**weights: str) -> models.GeneratedField:
+    """A stored, generated tsvector over the given columns, e.g. search_vector_field(name="A", description="B")."""
+    vectors = [SearchVector(column, weight=weight, config=SEARCH_CONFIG) for column, weight in weights.items()]
+    expression = vectors[0]
+    for vector in vectors[1:]:
+        expression = expression + vector
+    return models.GeneratedField(expression=expression, output_field=SearchVectorField(), db_persist=True)
+
+
+def trigram_index(column: str, name: str) -> GinIndex:
+    """A pg_trgm GIN index serving `<column>__icontains` filters."""
+    return GinIndex(OpClass(Upper(column), name="gin_trgm_ops"), name=name)
+
+
+def extension_installed(schema_editor, name: str = TRIGRAM_EXTENSION) -> bool:
+    if schema_editor.connection.vendor != "postgresql":
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = %s", [name])
+        return cursor.fetchone() is not None
+
+
+class CreateExtensionIfAvailable(CreateExtension):
+    """CreateExtension that is skipped, with a warning, when the server does not provide the extension."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            with schema_editor.connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = %s", [self.name])
+                if cursor.fetchone() is None:
+                    logger.warning("Postgres extension %s is not available; skipping its indexes", self.name)
+                    return
+        super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+
+class AddIndexIfExtension(AddIndex):
+    """AddIndex for an index whose operator class comes from an extension that may be missing."""
+
+    def __init__(self, model_name, index, extension: str = TRIGRAM_EXTENSION):
+        super().__init__(model_name, index)
+        self.extension = extension
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        if self.extension != TRIGRAM_EXTENSION:
+            kwargs["extension"] = self.extension
+        return name, args, kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if extension_installed(schema_editor, self.extension):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
@@ -0,0 +1,205 @@
+"""
+Transactional outbox for the Typesense index.
+
+Saves and deletes of indexed models do not call Typesense. They insert a SearchOutbox row naming
+the changed document, in the transaction of the change, so a write that rolls back leaves nothing
+to index and no request waits on Typesense. (Outside transaction.atomic, Django commits the save
+and the outbox row separately.)
+
+A worker drains the outbox in batches: the API process runs one in a thread (SEARCH_OUTBOX_WORKER)
+and `manage.py drain_search_outbox` runs one standalone. Repeated changes to one document are
+coalesced, the documents are read from the database as they are now and sent with one
+documents.import_ per collection, documents whose row no longer exists are deleted, and failures
+are retried with exponential backoff. A Postgres advisory lock lets only one worker drain at a
+time, so an older read can never overwrite a newer one in the index.
+
+With SEARCH_BACKEND "postgres" the searches read the tables themselves: nothing is queued and no
+worker runs.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.db import close_old_connections, connection, connections, transaction
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+from core.models import SearchOutbox
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_xact_lock key held while draining
+DRAIN_LOCK = 0x6D616B6572  # "maker"
+
+# Values of SEARCH_BACKEND (search.backends), and those that search an index fed by the outbox
+SEARCH_BACKENDS = ("typesense", "embedded", "postgres")
+INDEXED_BACKENDS = ("typesense", "embedded")
+
+
+def indexing_enabled() -> bool:
+    return settings.SEARCH_BACKEND in INDEXED_BACKENDS
+
+
+def enqueue(collection: str, ids: Iterable):
+    """Queue the documents `ids` of `collection` for indexing, in the current transaction."""
+    if not indexing_enabled():
+        return
+    rows = [SearchOutbox(collection=collection, document_id=str(document_id)) for document_id in ids]
+    if rows:
+        SearchOutbox.objects.bulk_create(rows, batch_size=1000)
+        transaction.on_commit(worker.wake)
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(2 ** (attempts - 1), settings.SEARCH_OUTBOX_MAX_BACKOFF))
+
+
+def _drain_lock() -> bool:
+    if connection.vendor != "postgresql":
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [DRAIN_LOCK])
+        return cursor.fetchone()[0]
+
+
+class OutboxWorker:
+    """Drains the outbox, on a background thread or one batch at a time, and counts what it did."""
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self.indexed = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_drain_at = None
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+        self.last_error = ""
+
+    def drain(self, batch_size: Optional[int] = None) -> int:
+        """Index one batch of due outbox rows and return the number of rows handled."""
+        from core.typesense import registry
+
+        batch_size = batch_size or settings.SEARCH_OUTBOX_BATCH_SIZE
+        now = timezone.now()
+        with transaction.atomic():
+            if not _drain_lock():
+                return 0
+            rows = list(SearchOutbox.objects.filter(next_attempt_at__lte=now).order_by("id")[:batch_size])
+            if not rows:
+                return 0
+
+            by_document: Dict[Tuple[str, str], List[SearchOutbox]] = defaultdict(list)
+            for row in rows:
+                by_document[(row.collection, row.document_id)].append(row)
+            by_collection: Dict[str, List[str]] = defaultdict(list)
+            for collection, document_id in by_document:
+                by_collection[collection].append(document_id)
+
+            errors: Dict[Tuple[str, str], str] = {}
+            for collection, ids in by_collection.items():
+                try:
+                    failed = registry.index(collection, ids)
+                except Exception as e:
+                    failed = {document_id: str(e) for document_id in ids}
+                errors.update({(collection, document_id): error for document_id, error in failed.items()})
+
+            done = [row.id for key, same in by_document.items() if key not in errors for row in same]
+            SearchOutbox.objects.filter(id__in=done).delete()
+            retries = []
+            for key, error in errors.items():
+                for row in by_document[key]:
+                    row.attempts += 1
+                    row.next_attempt_at = now + _backoff(row.attempts)
+                    row.last_error = error[:1000]
+                    retries.append(row)
+            SearchOutbox.objects.bulk_update(retries, ["attempts", "next_attempt_at", "last_error"])
+
+        indexed = [row for key, same in by_document.items() if key not in errors for row in same]
+        lag = max(((now - row.created_at).total_seconds() for row in indexed), default=0.0)
+        with self._lock:
+            self.indexed += len(by_document) - len(errors)
+            self.failed += len(errors)
+            self.batches += 1
+            self.last_drain_at = now
+            if indexed:
+                self.last_lag_seconds = lag
+                self.max_lag_seconds = max(self.max_lag_seconds, lag)
+            if errors:
+                self.last_error = next(iter(errors.values()))[:1000]
+        if errors:
+            logger.warning("Search outbox: %d documents failed, retrying with backoff", len(errors))
+        return len(rows)
+
+    def run(self):
+        """Drain until stopped, sleeping SEARCH_OUTBOX_POLL_INTERVAL when idle or woken by enqueue()."""
+        while not self._stopping.is_set():
+            self._wake.clear()
+            close_old_connections()
+            try:
+                handled = self.drain()
+            except Exception as e:
+                logger.warning("Search outbox drain failed: %s", e)
+                handled = 0
+            finally:
+                close_old_connections()
+            if handled < settings.SEARCH_OUTBOX_BATCH_SIZE:
+                self._wake.wait(settings.SEARCH_OUTBOX_POLL_INTERVAL)
+        connections.close_all()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self.run, name="makerdb-search-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        thread.join(timeout)
+
+    def wake(self):
+        self._wake.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "indexed": self.indexed,
+                "failed": self.failed,
+                "batches": self.batches,
+                "last_drain_at": self.last_drain_at,
+                "last_lag_seconds": round(self.last_lag_seconds, 3),
+                "max_lag_seconds": round(self.max_lag_seconds, 3),
+                "last_error": self.last_error,
+            }
+
+
+worker = OutboxWorker()
+
+
+def outbox_stats() -> Dict:
+    """Pending outbox rows, the age of the oldest (the indexing lag) and this process's worker counters."""
+    pending = SearchOutbox.objects.aggregate(
+        pending=Count("id"),
+        retrying=Count("id", filter=Q(attempts__gt=0)),
+        max_attempts=Max("attempts"),
+        oldest=Min("created_at"),
+    )
+    oldest = pending.pop("oldest")
+    return {
+        **pending,
+        "max_attempts": pending["max_attempts"] or 0,
+        "lag_seconds": round((timezone.now() - oldest).total_seconds(), 3) if oldest else 0.0,
+        "worker": worker.stats(),
+    }
@@ -0,0 +1,39 @@
+"""
+Request coalescing for expensive computations.
+
+Concurrent callers asking for the same key share one execution: the first starts it as a task
+and the others await the same task. The task is shielded, so a caller that disconnects does not
+cancel the computation for the rest, and it is forgotten once it finishes, so later calls start
+a new one (callers cache the result themselves if it may be reused).
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self.started = 0
+        self.shared = 0
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here, so an error nobody awaited is not logged as lost
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the result of `func()`, or of the call already in flight for `key`."""
+        task = self._tasks.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(func())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.started += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict:
+        return {"in_flight": len(self._tasks), "started": self.started, "shared": self.shared}
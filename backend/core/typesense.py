@@ -1,14 +1,119 @@
 """
 Typesense integration for Django models.
-Provides real-time sync via Django signals.
+Model signals queue changed documents in the search outbox (core.search_outbox), whose worker
+indexes them off the request path.
+
+Documents are written to and searched in a SearchEngine: the Typesense server by default, or the
+in-process index of core.embedded_search when SEARCH_BACKEND is "embedded".
 """
 
-import os
-from typing import Any, Dict, List, Optional
-from django.db.models.signals import post_save, post_delete, m2m_changed
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
 from django.db import models
+from django.db.models import Q
 import typesense
+from core.search_client import typesense_config
+from core.search_outbox import enqueue
+
+
+class SearchEngine:
+    """Where the documents of registered collections are stored and searched."""
+
+    name: str = ""
+
+    def create_collection(self, collection: "TypesenseCollection", name: Optional[str] = None):
+        """Create `collection` under its own name, or under `name` (e.g. a new version of it)."""
+        raise NotImplementedError
+
+    def drop_collection(self, name: str):
+        raise NotImplementedError
+
+    def upsert(self, name: str, documents: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Insert or replace `documents`; returns {id: error} for the rejected ones."""
+        raise NotImplementedError
+
+    def delete(self, name: str, ids: List[str]):
+        raise NotImplementedError
+
+    def search(self, name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a search with Typesense search parameters and return Typesense's response shape."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class TypesenseEngine(SearchEngine):
+    """The Typesense server, through the typesense client."""
+
+    name = "typesense"
+
+    def __init__(self, client: Callable[[], typesense.Client]):
+        self._client = client
+
+    @property
+    def client(self) -> typesense.Client:
+        return self._client()
+
+    def create_collection(self, collection: "TypesenseCollection", name: Optional[str] = None):
+        name = name or collection.name
+        try:
+            self.client.collections.create(
+                {
+                    "name": name,
+                    "fields": collection._get_schema_fields(),
+                    "default_sorting_field": "created_at",
+                }
+            )
+        except Exception as e:
+            print(f"Collection {name} creation: {e}")
+
+    def drop_collection(self, name: str):
+        try:
+            self.client.collections[name].delete()
+        except typesense.exceptions.ObjectNotFound:
+            pass
+
+    def upsert(self, name: str, documents: List[Dict[str, Any]]) -> Dict[str, str]:
+        results = self.client.collections[name].documents.import_(documents, {"action": "upsert"})
+        return {
+            doc["id"]: result.get("error", "import failed")
+            for doc, result in zip(documents, results)
+            if not result.get("success")
+        }
+
+    def delete(self, name: str, ids: List[str]):
+        self.client.collections[name].documents.delete({"filter_by": f"id:[{','.join(ids)}]"})
+
+    def search(self, name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self.client.collections[name].documents.search(params)
+
+    def exists(self, name: str) -> bool:
+        try:
+            self.client.collections[name].retrieve()
+        except typesense.exceptions.ObjectNotFound:
+            return False
+        return True
+
+    def document_ids(self, name: str) -> List[str]:
+        exported = self.client.collections[name].documents.export({"include_fields": "id"})
+        return [json.loads(line)["id"] for line in exported.splitlines() if line]
+
+    def alias_target(self, name: str) -> Optional[str]:
+        """The collection the alias `name` points at; None when `name` is not an alias."""
+        try:
+            return self.client.aliases[name].retrieve()["collection_name"]
+        except typesense.exceptions.ObjectNotFound:
+            return None
+
+    def point_alias(self, name: str, target: str):
+        """Point the alias `name` at the collection `target`, atomically for searches and writes."""
+        self.client.aliases.upsert(name, {"collection_name": target})
 
 
 class TypesenseRegistry:
@@ -17,65 +122,58 @@ class TypesenseRegistry:
     def __init__(self):
         self.collections: Dict[str, "TypesenseCollection"] = {}
         self._client: Optional[typesense.Client] = None
+        self._engine: Optional[SearchEngine] = None
 
     @property
     def client(self) -> typesense.Client:
         if self._client is None:
-            # Check if running inside Docker (typesense hostname resolves)
-            # Otherwise use localhost for host-based connections
-            import socket
-
-            try:
-                socket.gethostbyname("typesense")
-                host = "typesense"
-            except socket.gaierror:
-                host = "localhost"
-
+            config = typesense_config()
             self._client = typesense.Client(
                 {
-                    "api_key": os.getenv("TYPESENSE_API_KEY", "secret"),
-                    "nodes": [
-                        {
-                            "host": host,
-                            "port": os.getenv("TYPESENSE_PORT", "8108"),
-                            "protocol": os.getenv("TYPESENSE_PROTOCOL", "http"),
-                        }
-                    ],
-                    "connection_timeout_seconds": 2,
+                    "api_key": config["api_key"],
+                    "nodes": [{"host": config["host"], "port": str(config["port"]), "protocol": config["protocol"]}],
+                    "connection_timeout_seconds": config["timeout"],
+                    "num_retries": config["retries"],
+                    "retry_interval_seconds": 0.1,
                 }
             )
         return self._client
 
+    @property
+    def engine(self) -> SearchEngine:
+        if self._engine is None:
+            if settings.SEARCH_BACKEND == "embedded":
+                from core.embedded_search import EmbeddedEngine
+
+                self._engine = EmbeddedEngine(settings.SEARCH_EMBEDDED_PATH, settings.SEARCH_EMBEDDED_COMPACT_OPS)
+            else:
+                self._engine = TypesenseEngine(lambda: self.client)
+        return self._engine
+
+    def close(self):
+        """Close the engine; the embedded engine writes its pending changes to a snapshot."""
+        if self._engine is not None:
+            self._engine.close()
+            self._engine = None
+
     def register(self, collection: "TypesenseCollection"):
         """Register a collection for auto-sync."""
         self.collections[collection.name] = collection
 
-    def sync_model(self, instance: models.Model):
-        """Sync a model instance to Typesense."""
-        collection_name = getattr(instance, "_typesense_collection", None)
-        if not collection_name:
-            return
+    def index(self, collection_name: str, ids: List[str]) -> Dict[str, str]:
+        """
+        Bring the documents `ids` of a collection in line with the database: upsert those whose
+        row exists with one upsert and delete the others. Returns {id: error} for the documents
+        the engine rejected; raises if the request itself fails.
+        """
+        coll = self.collections[collection_name]
+        docs = [coll.to_document(instance) for instance in coll.get_queryset().filter(pk__in=ids)]
+        errors = self.engine.upsert(collection_name, docs) if docs else {}
 
-        coll = self.collections.get(collection_name)
-        if not coll:
-            return
-
-        doc = coll.to_document(instance)
-        try:
-            self.client.collections[collection_name].documents.upsert(doc)
-        except Exception as e:
-            print(f"Typesense sync error for {collection_name}: {e}")
-
-    def delete_model(self, instance: models.Model):
-        """Delete a model instance from Typesense."""
-        collection_name = getattr(instance, "_typesense_collection", None)
-        if not collection_name:
-            return
-
-        try:
-            self.client.collections[collection_name].documents[str(instance.id)].delete()
-        except Exception as e:
-            print(f"Typesense delete error for {collection_name}: {e}")
+        missing = sorted(set(ids) - {doc["id"] for doc in docs})
+        if missing:
+            self.engine.delete(collection_name, missing)
+        return errors
 
 
 registry = TypesenseRegistry()
@@ -85,8 +183,16 @@ class TypesenseCollection:
     """Base class for Typesense collections."""
 
     name: str = ""
+    model: Optional[type[models.Model]] = None
     schema: Dict[str, Any] = {}
     query_by_fields: List[str] = []
+    # Schema fields that can be faceted on, and that match substrings (infix) as well as prefixes
+    facet_fields: List[str] = []
+    infix_fields: List[str] = []
+    # Models whose changes alter documents of this collection: label -> lookup from this model
+    related: Dict[str, str] = {}
+    # Relations whose updated_at also dates a document (see changed_since())
+    updated_via: List[str] = []
 
     def to_document(self, instance: models.Model) -> Dict[str, Any]:
         """Convert Django model to Typesense document."""
@@ -95,30 +201,38 @@ class TypesenseCollection:
     def register(self, model_class: type[models.Model]):
         """Register this collection for a Django model."""
         model_class._typesense_collection = self.name
+        self.model = model_class
         registry.register(self)
 
-        # Connect signals
-        post_save.connect(self._handle_save, sender=model_class)
-        post_delete.connect(self._handle_delete, sender=model_class)
+        # Connect signals: changes are queued in the search outbox, not sent from the request
+        post_save.connect(self._handle_change, sender=model_class)
+        post_delete.connect(self._handle_change, sender=model_class)
+        for label in self.related:
+            # pre_delete: once deleted, rows that pointed at the instance can no longer be found
+            post_save.connect(self._handle_related_change, sender=label)
+            pre_delete.connect(self._handle_related_change, sender=label)
 
-    def _handle_save(self, sender, instance, created, **kwargs):
-        registry.sync_model(instance)
+    def _handle_change(self, sender, instance, **kwargs):
+        enqueue(self.name, [instance.pk])
 
-    def _handle_delete(self, sender, instance, **kwargs):
-        registry.delete_model(instance)
+    def _handle_related_change(self, sender, instance, **kwargs):
+        lookup = self.related[sender._meta.label]
+        enqueue(self.name, self.model.objects.filter(**{lookup: instance}).values_list("pk", flat=True))
+
+    def get_queryset(self):
+        """Rows to build documents from; select the relations to_document() reads."""
+        return self.model.objects.all()
+
+    def changed_since(self, since: datetime):
+        """Rows whose document may have changed since `since`, by their or a related row's updated_at."""
+        changed = Q(updated_at__gte=since)
+        for lookup in self.updated_via:
+            changed |= Q(**{f"{lookup}__updated_at__gte": since})
+        return self.model.objects.filter(changed).distinct()
 
     def create_collection(self):
-        """Create the collection in Typesense if it doesn't exist."""
-        try:
-            self.client.collections.create(
-                {
-                    "name": self.name,
-                    "fields": self._get_schema_fields(),
-                    "default_sorting_field": "created_at",
-                }
-            )
-        except Exception as e:
-            print(f"Collection {self.name} creation: {e}")
+        """Create the collection in the search engine if it doesn't exist."""
+        registry.engine.create_collection(self)
 
     def _get_schema_fields(self) -> List[Dict[str, Any]]:
         """Generate schema fields from collection schema."""
@@ -131,14 +245,18 @@ class TypesenseCollection:
                 int: "int64",
                 float: "float",
                 bool: "bool",
+                list: "string[]",
             }
-            fields.append(
-                {
-                    "name": field_name,
-                    "type": type_map.get(field_type, "string"),
-                    "optional": True,
-                }
-            )
+            field = {
+                "name": field_name,
+                "type": type_map.get(field_type, "string"),
+                "optional": True,
+            }
+            if field_name in self.facet_fields:
+                field["facet"] = True
+            if field_name in self.infix_fields:
+                field["infix"] = True
+            fields.append(field)
         # Add created_at as non-optional for default sorting (not in schema dict)
         fields.append({"name": "created_at", "type": "int64", "optional": False})
         return fields
@@ -149,23 +267,124 @@ class TypesenseCollection:
 
 
 class StorageCollection(TypesenseCollection):
-    """Typesense collection for Storage locations."""
+    """
+    Typesense collection for Storage locations, filterable by tags, parent, ancestors and stock.
+    `ancestors` holds the ids on the location's materialized path, so a subtree is `ancestors:=[id]`.
+    """
 
     name = "storage"
     query_by_fields = ["name", "description"]
+    infix_fields = ["name", "description"]
+    updated_via = ["stock_in_location"]
 
     schema = {
         "name": str,
         "description": str,
         "parent_id": str,
+        "ancestors": list,
+        "tags": list,
+        "stock_quantity": int,
+        "has_stock": bool,
     }
 
+    def register(self, model_class: type[models.Model]):
+        super().register(model_class)
+        # A move or delete changes the parent or ancestors of the whole subtree (see Storage.save)
+        pre_delete.connect(self._handle_delete, sender=model_class)
+        post_save.connect(self._handle_stock_change, sender="inventory.Stock")
+        post_delete.connect(self._handle_stock_change, sender="inventory.Stock")
+
+    def _handle_change(self, sender, instance, **kwargs):
+        old_path = getattr(instance, "_old_path", None)
+        if kwargs.get("created") is False and old_path:
+            # Moved: post_save runs before the descendants' paths are rewritten
+            self._enqueue_subtree(instance, old_path)
+        else:
+            super()._handle_change(sender, instance, **kwargs)
+
+    def _handle_delete(self, sender, instance, **kwargs):
+        path = self.model.objects.filter(pk=instance.pk).values_list("path", flat=True).first()
+        self._enqueue_subtree(instance, path)
+
+    def _enqueue_subtree(self, instance, path: Optional[str]):
+        if not path:
+            enqueue(self.name, [instance.pk])
+            return
+        subtree = self.model.objects.filter(Q(pk=instance.pk) | Q(path__startswith=path))  # storage_path_idx
+        enqueue(self.name, subtree.values_list("pk", flat=True))
+
+    def _handle_stock_change(self, sender, instance, **kwargs):
+        previous = getattr(instance, "_loaded_state", None) or {}
+        enqueue(self.name, {instance.storage_id, previous.get("storage_id")} - {None})
+
+    def get_queryset(self):
+        from django.db.models import Exists, OuterRef, Sum
+        from inventory.models import Stock
+
+        return self.model.objects.annotate(
+            stock_quantity=Sum("stock_in_location__quantity", default=0),
+            has_stock=Exists(Stock.objects.filter(storage=OuterRef("pk"), quantity__gt=0)),
+        )
+
     def to_document(self, instance) -> Dict[str, Any]:
+        own = instance.pk.hex
         return {
             "id": str(instance.id),
             "name": instance.name,
             "description": instance.description or "",
             "parent_id": str(instance.parent_id) if instance.parent_id else "",
+            "ancestors": [str(UUID(node)) for node in instance.path.split("/") if node and node != own],
+            "tags": [str(tag) for tag in instance.tags or []],
+            "stock_quantity": getattr(instance, "stock_quantity", 0) or 0,
+            "has_stock": bool(getattr(instance, "has_stock", False)),
+            "created_at": int(instance.created_at.timestamp()) if instance.created_at else 0,
+        }
+
+
+class PartCollection(TypesenseCollection):
+    """Typesense collection for Parts, faceted by manufacturer, designator and part type."""
+
+    name = "parts"
+    query_by_fields = ["name", "mpn", "description", "manufacturer", "designator", "footprint", "tags"]
+    facet_fields = ["manufacturer", "designator", "part_type"]
+    infix_fields = ["name", "mpn"]
+    related = {"core.Company": "manufacturer", "parts.Designator": "designator"}
+    updated_via = ["manufacturer", "designator", "stock_summary"]
+
+    schema = {
+        "name": str,
+        "mpn": str,
+        "description": str,
+        "manufacturer": str,
+        "manufacturer_id": str,
+        "designator": str,
+        "part_type": str,
+        "footprint": str,
+        "tags": list,
+        "total_stock": int,
+    }
+
+    def get_queryset(self):
+        from inventory.summary import total_stock_expression
+
+        return (
+            self.model.objects.select_related("manufacturer", "designator")
+            .annotate(total_stock=total_stock_expression())
+        )
+
+    def to_document(self, instance) -> Dict[str, Any]:
+        return {
+            "id": str(instance.id),
+            "name": instance.name,
+            "mpn": instance.mpn or "",
+            "description": instance.description or "",
+            "manufacturer": instance.manufacturer.name if instance.manufacturer_id else "",
+            "manufacturer_id": str(instance.manufacturer_id) if instance.manufacturer_id else "",
+            "designator": instance.designator.code if instance.designator_id else "",
+            "part_type": instance.part_type,
+            "footprint": instance.footprint or "",
+            "tags": [str(tag) for tag in instance.tags or []],
+            "total_stock": getattr(instance, "total_stock", 0) or 0,
             "created_at": int(instance.created_at.timestamp()) if instance.created_at else 0,
         }
 
@@ -0,0 +1,74 @@
+"""
+Dashboard data: summary counts, inventory valuation, low-stock counts and storage occupancy.
+
+The summary and low-stock counts are scalar subqueries of a single SQL statement. The overview
+combines everything the dashboard shows and is cached for DASHBOARD_CACHE_TTL seconds under the
+current "overview" ETag and day, so a cached overview is never served after the data it was built
+from has changed, nor on the next day; concurrent requests for the same key share one computation
+(see core.singleflight).
+"""
+
+from typing import Any, Dict, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from core.etag import resource_etag
+from core.queries import count_many
+from core.singleflight import SingleFlight
+from inventory.alerts import CRITICAL, WARNING, low_stock_queryset
+from inventory.occupancy import get_occupancy
+from inventory.valuation import valuation, value_history
+from parts.models import Part
+from procurement.models import Order
+from projects.models import Project
+
+CACHE_KEY = "dashboard:overview:{etag}:{day}:{currency}:{trend_days}"
+
+overview_flight = SingleFlight()
+
+
+def counts() -> Dict[str, int]:
+    """Parts, open orders, active projects and low-stock parts per severity, in one query."""
+    return count_many(
+        totalParts=Part.objects.all(),
+        openOrders=Order.objects.filter(status="open"),
+        activeProjects=Project.objects.filter(status="active"),
+        critical=low_stock_queryset(severities=[CRITICAL]),
+        warning=low_stock_queryset(severities=[WARNING]),
+    )
+
+
+def stats(currency: str, trend_days: int) -> Dict[str, Any]:
+    """Inventory value in `currency`, its daily history, and the value per currency and status."""
+    lines = valuation()
+    return {
+        "inventoryValue": float(sum(line["value"] for line in lines if line["currency"] == currency)),
+        "currency": currency,
+        "valueTrends": [float(value) for value in value_history(days=trend_days, currency=currency)],
+        "valuation": [{**line, "value": float(line["value"])} for line in lines],
+    }
+
+
+def compute_overview(currency: str, trend_days: int) -> Dict[str, Any]:
+    summary = counts()
+    occupancy = get_occupancy()
+    return {
+        "summary": {name: summary[name] for name in ("totalParts", "openOrders", "activeProjects")},
+        "stats": stats(currency, trend_days),
+        "lowStock": {"critical": summary["critical"], "warning": summary["warning"]},
+        "occupancy": {name: value for name, value in occupancy.items() if not name.startswith("by_")},
+    }
+
+
+def cached_overview(currency: str, trend_days: int) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """The cache key for the current data, and the overview cached under it (None on a miss)."""
+    etag, day = resource_etag("overview"), timezone.localdate()
+    key = CACHE_KEY.format(etag=etag, day=day.isoformat(), currency=currency, trend_days=trend_days)
+    return key, cache.get(key)
+
+
+def refresh_overview(key: str, currency: str, trend_days: int) -> Dict[str, Any]:
+    """Compute the overview and cache it under `key`."""
+    overview = compute_overview(currency, trend_days)
+    cache.set(key, overview, settings.DASHBOARD_CACHE_TTL)
+    return overview
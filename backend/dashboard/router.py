@@ -1,15 +1,27 @@
-from typing import List
-from fastapi import APIRouter
+from typing import List, Optional
+from django.conf import settings
+from fastapi import APIRouter, Query
 from pydantic import BaseModel
-from asgiref.sync import sync_to_async
+from core.etag import conditional_get
+from core.executor import database_sync_to_async
+from dashboard.overview import counts, cached_overview, overview_flight, refresh_overview, stats
+from inventory.router import StorageOccupancySummary
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 
+class ValuationLine(BaseModel):
+    currency: str
+    status: Optional[str] = None
+    quantity: int
+    value: float
+
+
 class DashboardStats(BaseModel):
     inventoryValue: float
     currency: str = "USD"
-    valueTrends: List[int] = [0, 0, 0, 0, 0, 0, 0]
+    valueTrends: List[float] = [0, 0, 0, 0, 0, 0, 0]
+    valuation: List[ValuationLine] = []
 
 
 class DashboardSummary(BaseModel):
@@ -18,34 +30,57 @@ class DashboardSummary(BaseModel):
     activeProjects: int
 
 
-@router.get("/summary", response_model=DashboardSummary)
-async def get_dashboard_summary():
-    @sync_to_async
-    def _get_summary():
-        from parts.models import Part
-        from procurement.models import Order
-        from projects.models import Project
-
-        total_parts = Part.objects.count()
-        open_orders = Order.objects.filter(status="open").count()
-        active_projects = Project.objects.filter(status="active").count()
-
-        return DashboardSummary(totalParts=total_parts, openOrders=open_orders, activeProjects=active_projects)
+class LowStockCounts(BaseModel):
+    critical: int
+    warning: int
 
-    return await _get_summary()
 
+class DashboardOverview(BaseModel):
+    summary: DashboardSummary
+    stats: DashboardStats
+    lowStock: LowStockCounts
+    occupancy: StorageOccupancySummary
 
-@router.get("/stats", response_model=DashboardStats)
-async def get_dashboard_stats():
-    @sync_to_async
-    def _get_stats():
-        from django.db.models import Sum
-        from inventory.models import Stock
 
-        total_value = Stock.objects.aggregate(total=Sum("quantity") * Sum("price_unit"))["total"] or 0
+@router.get("/summary", response_model=DashboardSummary, dependencies=[conditional_get("dashboard")])
+async def get_dashboard_summary():
+    @database_sync_to_async
+    def _get_summary():
+        summary = counts()
+        return DashboardSummary(
+            totalParts=summary["totalParts"],
+            openOrders=summary["openOrders"],
+            activeProjects=summary["activeProjects"],
+        )
 
-        value_trends = [0, 0, 0, 0, 0, 0, 0]
+    return await _get_summary()
 
-        return DashboardStats(inventoryValue=float(total_value), currency="USD", valueTrends=value_trends)
 
-    return await _get_stats()
+@router.get("/stats", response_model=DashboardStats, dependencies=[conditional_get("dashboard")])
+async def get_dashboard_stats(
+    trend_days: int = Query(7, ge=1, le=90, description="Number of days in valueTrends"),
+    currency: str = Query(None, min_length=3, max_length=3, description="ISO code (default: INVENTORY_CURRENCY)"),
+):
+    """
+    Inventory value in one currency, its daily history, and the value of all stock per currency
+    and status. Values in different currencies are not converted or added together.
+    """
+    code = (currency or settings.INVENTORY_CURRENCY).upper()
+    return await database_sync_to_async(stats)(code, trend_days)
+
+
+@router.get("/overview", response_model=DashboardOverview, dependencies=[conditional_get("overview")])
+async def get_dashboard_overview(
+    trend_days: int = Query(7, ge=1, le=90, description="Number of days in stats.valueTrends"),
+    currency: str = Query(None, min_length=3, max_length=3, description="ISO code (default: INVENTORY_CURRENCY)"),
+):
+    """
+    Summary, stats, low-stock counts and storage occupancy in one response. Cached for
+    DASHBOARD_CACHE_TTL seconds until the data changes; concurrent loads share one computation.
+    """
+    code = (currency or settings.INVENTORY_CURRENCY).upper()
+    key, overview = await database_sync_to_async(cached_overview)(code, trend_days)  # cache I/O, off the loop
+    if overview is None:
+        refresh = database_sync_to_async(refresh_overview)
+        overview = await overview_flight.do(key, lambda: refresh(key, code, trend_days))
+    return overview
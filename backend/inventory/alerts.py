@@ -0,0 +1,87 @@
+"""
+Low-stock alert engine.
+
+All alerts are computed in one query over Part joined to PartStockSummary, so stock levels
+use the same status semantics as total_stock.
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+from django.db.models import Case, F, Max, Q, Value, When
+from django.db.models.lookups import LessThanOrEqual
+from django.utils import timezone
+from parts.models import Part
+from inventory.summary import total_stock_expression
+
+CRITICAL = "Critical"
+WARNING = "Warning"
+OK = "OK"
+
+SEVERITIES = (CRITICAL, WARNING, OK)
+
+# How far a poll cursor stays behind the clock: a write commits after the updated_at it carries
+CURSOR_OVERLAP = timedelta(seconds=5)
+
+
+def low_stock_queryset(severities: Optional[Iterable[str]] = None, changed_since: Optional[datetime] = None):
+    """
+    Parts with a low_stock_threshold, annotated with `stock` and `severity`.
+
+    A part is Critical at or below half its threshold and Warning at or below the threshold.
+    Without `changed_since` only Critical/Warning parts are returned. With it, every part whose
+    stock or threshold changed after that moment is returned, including recovered (OK) parts,
+    so a poller can drop alerts that no longer apply.
+    """
+    queryset = (
+        Part.objects.filter(low_stock_threshold__isnull=False)
+        .annotate(stock=total_stock_expression())
+        .annotate(
+            severity=Case(
+                When(LessThanOrEqual(F("stock") * 2, F("low_stock_threshold")), then=Value(CRITICAL)),
+                When(stock__lte=F("low_stock_threshold"), then=Value(WARNING)),
+                default=Value(OK),
+            )
+        )
+    )
+
+    if changed_since is not None:
+        queryset = queryset.filter(Q(updated_at__gt=changed_since) | Q(stock_summary__updated_at__gt=changed_since))
+    else:
+        queryset = queryset.exclude(severity=OK)
+
+    if severities:
+        queryset = queryset.filter(severity__in=list(severities))
+
+    return queryset.order_by("stock", "name", "id")
+
+
+def poll_cursor(changed_since: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    The changed_since for the next poll: the latest updated_at of a tracked part or its stock
+    summary read now, but no later than CURSOR_OVERLAP ago, so a change that commits after this
+    read with an earlier updated_at is still returned next time. Read it before the alerts;
+    `changed_since` is kept while no part is tracked.
+    """
+    latest = Part.objects.filter(low_stock_threshold__isnull=False).aggregate(
+        part=Max("updated_at"), stock=Max("stock_summary__updated_at")
+    )
+    latest = [moment for moment in latest.values() if moment is not None]
+    if not latest:
+        return changed_since
+    return min(max(latest), timezone.now() - CURSOR_OVERLAP)
+
+
+def parse_severities(value: Optional[str]) -> List[str]:
+    """Parse a comma-separated severity filter (case-insensitive) into canonical names."""
+    if not value:
+        return []
+    lookup = {severity.lower(): severity for severity in SEVERITIES}
+    severities = []
+    for item in value.split(","):
+        item = item.strip().lower()
+        if not item:
+            continue
+        if item not in lookup:
+            raise ValueError(f"Unknown severity: {item}", 400)
+        severities.append(lookup[item])
+    return severities
@@ -9,6 +9,15 @@ class InventoryConfig(AppConfig):
     def ready(self):
         from core.typesense import StorageCollection
         from inventory.models import Storage
+        from inventory.summary import connect_signals as connect_summary_signals
+        from inventory.occupancy import connect_signals as connect_occupancy_signals
+        from inventory.ledger import connect_signals as connect_ledger_signals
+        from inventory.hierarchy import connect_signals as connect_hierarchy_signals
 
         collection = StorageCollection()
         collection.register(Storage)
+
+        connect_summary_signals()
+        connect_occupancy_signals()
+        connect_ledger_signals()
+        connect_hierarchy_signals()
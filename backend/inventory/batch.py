@@ -0,0 +1,159 @@
+"""
+Atomic batch stock adjustments and moves.
+
+All stock rows touched by a batch are locked with SELECT ... FOR UPDATE in primary key order,
+so concurrent batches (and single-entry updates) serialize on the rows they share instead of
+losing updates or deadlocking. Quantities are written as F("quantity") + delta in one UPDATE.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from core.etag import bump_versions
+from core.search_outbox import enqueue
+from core.typesense import StorageCollection
+from inventory.hierarchy import touch_locations
+from inventory.models import Storage, Stock, StockMovement
+from inventory.ledger import movements_for_change
+from inventory.occupancy import invalidate_occupancy
+from inventory.summary import apply_stock_delta
+
+Reason = StockMovement.Reason
+
+ADJUST = "adjust"
+MOVE = "move"
+
+# Fields copied from the source entry when part of it is moved to another location
+SPLIT_FIELDS = ("part_id", "lot_id", "status", "price_unit", "currency", "tags", "custom_fields")
+
+
+def _validate(operations: List[Dict]):
+    for index, operation in enumerate(operations):
+        if operation["op"] == ADJUST and operation.get("delta") is None:
+            raise ValueError(f"Operation {index}: adjust requires delta", 400)
+        if operation["op"] == MOVE:
+            if operation.get("storage_id") is None:
+                raise ValueError(f"Operation {index}: move requires storage_id", 400)
+            if operation.get("quantity") is not None and operation["quantity"] <= 0:
+                raise ValueError(f"Operation {index}: quantity must be positive", 400)
+
+
+def _case(values: Dict, default, output_field=None):
+    return Case(
+        *[When(id=pk, then=Value(value)) for pk, value in values.items()], default=default, output_field=output_field
+    )
+
+
+def apply_stock_batch(operations: List[Dict], allow_negative: bool = False) -> List[Dict]:
+    """
+    Apply `operations` in order, all or nothing.
+
+    Each operation is {"op": "adjust", "stock_id", "delta"} or
+    {"op": "move", "stock_id", "storage_id", "quantity"}; a move without quantity (or with the
+    entry's full quantity) relocates the entry, a partial move splits it into a new entry.
+    Returns the resulting storage and quantity of every touched entry.
+    """
+    _validate(operations)
+    if not operations:
+        return []
+
+    stock_ids = sorted({operation["stock_id"] for operation in operations})
+    storage_ids = {operation["storage_id"] for operation in operations if operation["op"] == MOVE}
+
+    with transaction.atomic():
+        locked = {
+            row["id"]: row
+            for row in Stock.objects.select_for_update()
+            .filter(id__in=stock_ids)
+            .order_by("id")
+            .values("id", "lot_id", "tags", "custom_fields", *Stock.TRACKED_FIELDS)
+        }
+        missing = [str(pk) for pk in stock_ids if pk not in locked]
+        if missing:
+            raise ValueError(f"Stock entry not found: {', '.join(missing)}", 404)
+
+        found_storages = set(Storage.objects.filter(id__in=storage_ids).values_list("id", flat=True))
+        missing = [str(pk) for pk in storage_ids if pk not in found_storages]
+        if missing:
+            raise ValueError(f"Storage location not found: {', '.join(missing)}", 400)
+
+        current = {pk: dict(row) for pk, row in locked.items()}
+        splits: List[Stock] = []
+        split_out = defaultdict(int)
+        for index, operation in enumerate(operations):
+            state = current[operation["stock_id"]]
+            if operation["op"] == ADJUST:
+                state["quantity"] += operation["delta"]
+            else:
+                quantity = operation.get("quantity")
+                if quantity is None or quantity == state["quantity"]:
+                    state["storage_id"] = operation["storage_id"]
+                elif operation["storage_id"] != state["storage_id"]:
+                    state["quantity"] -= quantity
+                    split_out[operation["stock_id"]] += quantity
+                    splits.append(
+                        Stock(
+                            storage_id=operation["storage_id"],
+                            quantity=quantity,
+                            **{field: state[field] for field in SPLIT_FIELDS},
+                        )
+                    )
+            if state["quantity"] < 0 and not allow_negative:
+                raise ValueError(f"Operation {index}: stock entry {operation['stock_id']} would go negative", 409)
+
+        deltas = {pk: current[pk]["quantity"] - locked[pk]["quantity"] for pk in stock_ids}
+        deltas = {pk: delta for pk, delta in deltas.items() if delta}
+        moved = {
+            pk: current[pk]["storage_id"] for pk in stock_ids if current[pk]["storage_id"] != locked[pk]["storage_id"]
+        }
+
+        changes = {}
+        if deltas:
+            changes["quantity"] = F("quantity") + _case(deltas, Value(0), output_field=IntegerField())
+        if moved:
+            changes["storage_id"] = _case(moved, F("storage_id"))
+        if changes:
+            Stock.objects.filter(id__in=set(deltas) | set(moved)).update(updated_at=timezone.now(), **changes)
+        touch_locations(locked[pk]["storage_id"] for pk in moved)
+        created = Stock.objects.bulk_create(splits)
+
+        _record(locked, current, created, split_out)
+        storages = {locked[pk]["storage_id"] for pk in {*deltas, *moved}} | set(moved.values())
+        enqueue(StorageCollection.name, storages | {stock.storage_id for stock in created})
+
+    if deltas or moved or created:
+        invalidate_occupancy()
+        bump_versions(Stock, StockMovement)
+
+    touched = [*stock_ids, *(stock.id for stock in created)]
+    return list(
+        Stock.objects.filter(id__in=touched).order_by("id").values("id", "part_id", "storage_id", "quantity")
+    )
+
+
+def _record(locked: Dict, current: Dict, created: Iterable[Stock], split_out: Dict):
+    """
+    Update PartStockSummary and the ledger for the batch. Quantity split off an entry is recorded
+    as a transfer, separately from the entry's own adjustments.
+    """
+    tracked = Stock.TRACKED_FIELDS
+    summary_deltas = defaultdict(int)
+    movements: List[StockMovement] = []
+
+    for pk, before in locked.items():
+        previous = {field: before[field] for field in tracked}
+        after = {field: current[pk][field] for field in tracked}
+        summary_deltas[(after["part_id"], after["status"])] += after["quantity"] - previous["quantity"]
+        before_split = {**after, "quantity": after["quantity"] + split_out.get(pk, 0)}
+        movements.extend(movements_for_change(pk, previous, before_split))
+        movements.extend(movements_for_change(pk, before_split, after, reason=Reason.TRANSFER))
+
+    for stock in created:
+        summary_deltas[(stock.part_id, stock.status)] += stock.quantity
+        movements.extend(movements_for_change(stock.id, None, stock.tracked_state(), reason=Reason.TRANSFER))
+
+    for (part_id, status), delta in sorted(summary_deltas.items(), key=lambda item: str(item[0])):
+        apply_stock_delta(part_id, status, delta)
+    StockMovement.objects.bulk_create(movements, batch_size=1000)
@@ -0,0 +1,242 @@
+"""
+Bulk stock import.
+
+Rows are read one at a time from the uploaded file and processed in chunks: references to parts,
+storage locations and lots are resolved with one lookup per reference kind per chunk, and valid rows
+are written with bulk_create. Since bulk_create skips model signals, the PartStockSummary, ledger,
+occupancy cache and ETag versions are updated here explicitly.
+"""
+
+import csv
+import io
+import json
+import uuid
+from collections import defaultdict
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from core.etag import bump_versions
+from core.search_outbox import enqueue
+from core.typesense import StorageCollection
+from inventory.models import Storage, Lot, Stock, StockMovement
+from inventory.ledger import movements_for_change
+from inventory.occupancy import invalidate_occupancy
+from inventory.summary import recount_parts
+from parts.models import Part
+
+CHUNK_SIZE = 1000
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+
+STATUS_VALUES = set(Stock.StockStatus.values)
+QUANTITY = Stock._meta.get_field("quantity")
+PRICE_UNIT = Stock._meta.get_field("price_unit")
+
+# Row columns accepted for each reference, in lookup order: (column, model field)
+PART_REFERENCES = (("part_id", "id"), ("part_mpn", "mpn"), ("part_name", "name"))
+STORAGE_REFERENCES = (("storage_id", "id"), ("storage", "name"))
+LOT_REFERENCES = (("lot_id", "id"), ("lot", "name"))
+
+
+def iter_csv_rows(stream: IO[bytes]) -> Iterator[Dict]:
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    for row in reader:
+        yield {key.strip(): (value or "").strip() for key, value in row.items() if key}
+
+
+def iter_ndjson_rows(stream: IO[bytes]) -> Iterator[Dict]:
+    for line in io.TextIOWrapper(stream, encoding="utf-8-sig"):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            row = {"__error__": f"Invalid JSON: {e.msg}"}
+        if not isinstance(row, dict):
+            row = {"__error__": "Each line must be a JSON object"}
+        yield row
+
+
+def _chunks(rows: Iterable[Dict], size: int) -> Iterator[List[Tuple[int, Dict]]]:
+    chunk = []
+    for number, row in enumerate(rows, start=1):
+        chunk.append((number, row))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _text(row: Dict, column: str) -> str:
+    value = row.get(column)
+    return "" if value is None else str(value).strip()
+
+
+class _Resolver:
+    """Resolves one kind of reference (part, storage, lot) for a chunk of rows in batched queries."""
+
+    def __init__(self, model, references, label: str):
+        self.model = model
+        self.references = references
+        self.label = label
+        self.found: Dict[str, Dict[str, List]] = {}
+
+    def load(self, rows: List[Tuple[int, Dict]]):
+        wanted = defaultdict(set)
+        for _, row in rows:
+            for column, field in self.references:
+                value = _text(row, column)
+                if value:
+                    wanted[field].add(value)
+
+        self.found = {}
+        for field, values in wanted.items():
+            if field == "id":
+                values = {value for value in values if _is_uuid(value)}
+            matches = defaultdict(list)
+            for key, pk in self.model.objects.filter(**{f"{field}__in": values}).values_list(field, "id"):
+                matches[str(key)].append(pk)
+            self.found[field] = matches
+
+    def resolve(self, row: Dict, required: bool) -> Tuple[Optional[uuid.UUID], Optional[str]]:
+        for column, field in self.references:
+            value = _text(row, column)
+            if not value:
+                continue
+            if field == "id" and not _is_uuid(value):
+                return None, f"{column} is not a valid UUID"
+            matches = self.found.get(field, {}).get(str(uuid.UUID(value)) if field == "id" else value, [])
+            if not matches:
+                return None, f"{self.label} not found: {value}"
+            if len(matches) > 1:
+                return None, f"{self.label} is ambiguous: {value}"
+            return matches[0], None
+        if required:
+            return None, f"{self.label} is required"
+        return None, None
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _clean(field, value: str) -> Tuple[Any, Optional[str]]:
+    """
+    `value` converted by the model field and checked against its database limits (integer range,
+    max_digits and decimal_places, no NaN or Infinity), or None and an error for the row.
+    """
+    try:
+        return field.clean(value, None), None
+    except ValidationError as e:
+        return None, f"{field.name}: {' '.join(e.messages)}"
+
+
+def _build_stock(row: Dict, parts: _Resolver, storages: _Resolver, lots: _Resolver) -> Tuple[Optional[Stock], List]:
+    errors = []
+    if "__error__" in row:
+        return None, [row["__error__"]]
+
+    part_id, error = parts.resolve(row, required=True)
+    if error:
+        errors.append(error)
+    storage_id, error = storages.resolve(row, required=True)
+    if error:
+        errors.append(error)
+    lot_id, error = lots.resolve(row, required=False)
+    if error:
+        errors.append(error)
+
+    quantity, error = _clean(QUANTITY, _text(row, "quantity") or 0)
+    if error:
+        errors.append(error)
+
+    status = _text(row, "status") or None
+    if status is not None and status not in STATUS_VALUES:
+        errors.append(f"Unknown status: {status}")
+
+    price_unit = None
+    if _text(row, "price_unit"):
+        price_unit, error = _clean(PRICE_UNIT, _text(row, "price_unit"))
+        if error:
+            errors.append(error)
+
+    currency = _text(row, "currency").upper()
+    if len(currency) > 3:
+        errors.append("currency must be an ISO 4217 code")
+
+    if errors:
+        return None, errors
+
+    stock = Stock(
+        part_id=part_id,
+        storage_id=storage_id,
+        lot_id=lot_id,
+        quantity=quantity,
+        status=status,
+        price_unit=price_unit,
+        currency=currency,
+    )
+    return stock, []
+
+
+def import_stock_rows(rows: Iterable[Dict], dry_run: bool = False, chunk_size: int = CHUNK_SIZE) -> Dict:
+    """
+    Validate and insert stock rows. Invalid rows are reported and skipped; valid rows are written
+    in one transaction. With `dry_run` nothing is written.
+    """
+    parts = _Resolver(Part, PART_REFERENCES, "Part")
+    storages = _Resolver(Storage, STORAGE_REFERENCES, "Storage location")
+    lots = _Resolver(Lot, LOT_REFERENCES, "Lot")
+
+    total = valid_rows = created = 0
+    errors = []
+
+    with transaction.atomic():
+        for chunk in _chunks(rows, chunk_size):
+            total += len(chunk)
+            for resolver in (parts, storages, lots):
+                resolver.load(chunk)
+
+            valid = []
+            for number, row in chunk:
+                stock, row_errors = _build_stock(row, parts, storages, lots)
+                if row_errors:
+                    errors.append({"row": number, "errors": row_errors})
+                else:
+                    valid.append(stock)
+
+            valid_rows += len(valid)
+            if dry_run or not valid:
+                continue
+
+            stocks = Stock.objects.bulk_create(valid, batch_size=chunk_size)
+            StockMovement.objects.bulk_create(
+                [
+                    movement
+                    for stock in stocks
+                    for movement in movements_for_change(stock.id, None, stock.tracked_state())
+                ],
+                batch_size=chunk_size,
+            )
+            recount_parts({stock.part_id for stock in stocks})
+            enqueue(StorageCollection.name, {stock.storage_id for stock in stocks})
+            created += len(stocks)
+
+        if created and not dry_run:
+            invalidate_occupancy()
+            bump_versions(Stock, StockMovement)
+
+    return {
+        "dry_run": dry_run,
+        "total_rows": total,
+        "valid_rows": valid_rows,
+        "created": created,
+        "failed": len(errors),
+        "errors": errors,
+    }
@@ -0,0 +1,139 @@
+"""
+Bulk storage location generator (see docs/dev-planning/bulk_locations_spec.md).
+
+Names are expanded from a prefix and one (row) or two (grid) letter/number ranges. Locations are
+written with a single bulk_create and indexed with batched Typesense imports, since bulk_create
+skips the per-instance save() and post_save hooks.
+"""
+
+import string
+from typing import Dict, List
+from django.db import transaction
+from core import reference_cache
+from core.etag import bump_versions
+from core.search_outbox import enqueue
+from core.typesense import StorageCollection
+from inventory.models import Storage
+from inventory.occupancy import invalidate_occupancy
+
+MAX_LOCATIONS = 1000
+
+LETTERS = "letters"
+NUMBERS = "numbers"
+
+
+def _letters_to_number(value: str) -> int:
+    """Bijective base-26: A=1, Z=26, AA=27."""
+    number = 0
+    for char in value.upper():
+        number = number * 26 + string.ascii_uppercase.index(char) + 1
+    return number
+
+
+def _number_to_letters(number: int) -> str:
+    letters = ""
+    while number:
+        number, remainder = divmod(number - 1, 26)
+        letters = string.ascii_uppercase[remainder] + letters
+    return letters
+
+
+def parse_range(start: str, end: str, range_type: str) -> List[str]:
+    """
+    Expand an inclusive range, e.g. ("A", "C") -> A, B, C or ("001", "003") -> 001, 002, 003.
+    Reversed ranges are swapped; letter case and number zero-padding follow the input.
+    """
+    start, end = (start or "").strip(), (end or "").strip()
+    if not start or not end:
+        raise ValueError("Range start and end are required", 400)
+
+    if range_type == LETTERS:
+        if not (start.isascii() and start.isalpha() and end.isascii() and end.isalpha()):
+            raise ValueError(f"Invalid letter range: {start}-{end}", 400)
+        first, last = sorted((_letters_to_number(start), _letters_to_number(end)))
+        if last - first + 1 > MAX_LOCATIONS:
+            raise ValueError(f"Range too large (more than {MAX_LOCATIONS} locations)", 400)
+        lower = start.islower()
+        values = [_number_to_letters(number) for number in range(first, last + 1)]
+        return [value.lower() for value in values] if lower else values
+
+    if range_type == NUMBERS:
+        if not (start.isdigit() and end.isdigit()):
+            raise ValueError(f"Invalid number range: {start}-{end}", 400)
+        first, last = sorted((int(start), int(end)))
+        if last - first + 1 > MAX_LOCATIONS:
+            raise ValueError(f"Range too large (more than {MAX_LOCATIONS} locations)", 400)
+        padded = [value for value in (start, end) if len(value) > 1 and value.startswith("0")]
+        width = max(len(value) for value in padded) if padded else 0
+        return [str(number).zfill(width) for number in range(first, last + 1)]
+
+    raise ValueError(f"Unknown range type: {range_type}", 400)
+
+
+def generate_location_names(config: Dict) -> List[str]:
+    """Expand a row or grid configuration into location names, row-major for grids."""
+    prefix = config.get("prefix") or ""
+    if config["mode"] == "row":
+        values = parse_range(config.get("range_start"), config.get("range_end"), config.get("range_type"))
+        return [f"{prefix}{value}" for value in values]
+
+    rows = parse_range(config.get("row_range_start"), config.get("row_range_end"), config.get("row_range_type"))
+    columns = parse_range(config.get("col_range_start"), config.get("col_range_end"), config.get("col_range_type"))
+    if len(rows) * len(columns) > MAX_LOCATIONS:
+        raise ValueError(f"Range too large (more than {MAX_LOCATIONS} locations)", 400)
+    return [f"{prefix}{row}{column}" for row in rows for column in columns]
+
+
+def preview_locations(names: List[str]) -> Dict:
+    """Names plus the warnings from the spec: duplicates within the batch and existing names."""
+    seen, duplicates = set(), []
+    for name in names:
+        if name in seen and name not in duplicates:
+            duplicates.append(name)
+        seen.add(name)
+
+    conflicts = sorted(Storage.objects.filter(name__in=seen).values_list("name", flat=True).distinct())
+    return {"count": len(names), "names": names, "duplicates": duplicates, "conflicts": conflicts}
+
+
+def create_locations(config: Dict, dry_run: bool = False) -> Dict:
+    """
+    Generate and create the locations described by `config` in one transaction.
+    Refuses (409) to create names that are duplicated or already exist.
+    """
+    names = generate_location_names(config)
+    parent_id = config.get("parent_id")
+    result = {**preview_locations(names), "dry_run": dry_run, "created": 0, "locations": []}
+    if dry_run:
+        return result
+    if result["duplicates"] or result["conflicts"]:
+        raise ValueError("Some location names are duplicated or already exist", 409)
+
+    with transaction.atomic():
+        parent_path = ""
+        if parent_id is not None:
+            parent_path = Storage.objects.filter(id=parent_id).values_list("path", flat=True).first()
+            if parent_path is None:
+                raise ValueError("Parent location not found", 400)
+
+        locations = [
+            Storage(
+                name=name,
+                description=config.get("description") or "",
+                parent_id=parent_id,
+                tags=config.get("tags") or [],
+            )
+            for name in names
+        ]
+        for location in locations:
+            location.path = f"{parent_path}{location.id.hex}/"
+        locations = Storage.objects.bulk_create(locations, batch_size=MAX_LOCATIONS)
+
+        invalidate_occupancy()
+        bump_versions(Storage)
+        reference_cache.invalidate(Storage._meta.label)
+        enqueue(StorageCollection.name, [location.id for location in locations])
+
+    result["created"] = len(locations)
+    result["locations"] = [{"id": location.id, "name": location.name} for location in locations]
+    return result
@@ -0,0 +1,113 @@
+"""
+Storage hierarchy queries backed by the materialized Storage.path.
+
+Storage.save() keeps the path of a location and its descendants up to date when `parent`
+changes; deleting a location re-roots its children (parent is SET_NULL) via the handler below.
+Subtree queries are a single `path LIKE 'prefix%'` scan on the storage_path_idx index.
+
+Both rewrites also set `updated_at`, as does stock leaving a location (see touch_locations()), so
+incremental search syncs (sync_typesense --since) see every change to a location's document.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+from django.db.models import Count, Sum
+from django.db.models.functions import Collate, Substr
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from inventory.models import Stock, Storage
+
+
+def subtree_path(storage_id: UUID) -> Optional[str]:
+    """Return the materialized path of a location, or None if it does not exist."""
+    return Storage.objects.filter(id=storage_id).values_list("path", flat=True).first()
+
+
+def filter_descendants(queryset, storage_id: UUID, include_self: bool = False, prefix: str = ""):
+    """
+    Restrict `queryset` to rows under the location `storage_id`.
+    `prefix` is the lookup path to the storage, e.g. "storage__" when filtering Stock.
+    """
+    path = subtree_path(storage_id)
+    if path is None:
+        return queryset.none()
+    queryset = queryset.filter(**{f"{prefix}path__startswith": path})
+    if not include_self:
+        queryset = queryset.exclude(**{f"{prefix}id": storage_id})
+    return queryset
+
+
+def subtree_rollup(storage_id: UUID) -> Optional[Dict[str, Any]]:
+    """
+    Every location under `storage_id` (inclusive) with its own stock quantity and the quantity
+    rolled up over its descendants, in depth-first order. Returns None if the location does not exist.
+    """
+    path = subtree_path(storage_id)
+    if path is None:
+        return None
+
+    rows = list(
+        Storage.objects.filter(path__startswith=path)
+        .values("id", "name", "parent_id", "path")
+        .order_by(Collate("path", "C"))
+        .annotate(quantity=Sum("stock_in_location__quantity", default=0), stock_entries=Count("stock_in_location"))
+    )
+
+    root_depth = path.count("/")
+    totals: Dict[str, int] = {}
+    for row in rows:
+        for segment in row["path"].split("/")[root_depth - 1 : -1]:
+            totals[segment] = totals.get(segment, 0) + row["quantity"]
+
+    nodes: List[Dict[str, Any]] = []
+    for row in rows:
+        path_of_row = row.pop("path")
+        nodes.append(
+            {
+                **row,
+                "depth": path_of_row.count("/") - root_depth,
+                "total_quantity": totals[row["id"].hex],
+            }
+        )
+
+    return {
+        "id": storage_id,
+        "total_locations": len(nodes),
+        "used_locations": sum(1 for node in nodes if node["quantity"] > 0),
+        "total_quantity": totals.get(storage_id.hex, 0),
+        "locations": nodes,
+    }
+
+
+def touch_locations(storage_ids: Iterable):
+    """
+    Set updated_at of locations that stock left. A Stock row dates the location it is in now, so
+    stock deleted or moved away would otherwise change a location without dating it.
+    """
+    storage_ids = {storage_id for storage_id in storage_ids if storage_id is not None}
+    if storage_ids:
+        Storage.objects.filter(pk__in=storage_ids).update(updated_at=timezone.now())
+
+
+def _handle_storage_delete(sender, instance, **kwargs):
+    # Children were detached by SET_NULL; drop the deleted location's prefix from their subtrees.
+    if instance.path:
+        Storage.objects.filter(path__startswith=instance.path).update(
+            path=Substr("path", len(instance.path) + 1), updated_at=timezone.now()
+        )
+
+
+def _handle_stock_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_loaded_state", None) or {}
+    if not created and previous.get("storage_id") != instance.storage_id:
+        touch_locations([previous.get("storage_id")])
+
+
+def _handle_stock_delete(sender, instance, **kwargs):
+    touch_locations([instance.storage_id])
+
+
+def connect_signals():
+    post_delete.connect(_handle_storage_delete, sender=Storage, dispatch_uid="inventory.hierarchy.storage_delete")
+    post_save.connect(_handle_stock_save, sender=Stock, dispatch_uid="inventory.hierarchy.stock_save")
+    post_delete.connect(_handle_stock_delete, sender=Stock, dispatch_uid="inventory.hierarchy.stock_delete")
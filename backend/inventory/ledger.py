@@ -0,0 +1,158 @@
+"""
+Stock movement ledger and snapshots.
+
+Every Stock write is recorded as StockMovement rows (see the signal handlers below). Snapshots
+compact the ledger into positions at a point in time, so "stock as of X" is the latest snapshot
+before X plus the movements between the snapshot and X.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+from core.etag import bump_versions
+from inventory.models import Stock, StockMovement, StockSnapshot, StockSnapshotLine
+
+Reason = StockMovement.Reason
+
+# Columns identifying a stock position in movements and snapshot lines.
+POSITION_FIELDS = ("part_id", "storage_id", "status", "currency")
+
+
+def _value(state: Dict) -> Decimal:
+    if state["price_unit"] is None:
+        return Decimal(0)
+    return Decimal(state["quantity"] or 0) * Decimal(state["price_unit"])
+
+
+def _position(state: Dict) -> Tuple:
+    return (state["part_id"], state["storage_id"], state["status"] or None, state["currency"] or "")
+
+
+def _movement(stock_id, state: Dict, sign: int, reason: str, quantity=None, value=None) -> StockMovement:
+    part_id, storage_id, status, currency = _position(state)
+    return StockMovement(
+        stock_id=stock_id,
+        part_id=part_id,
+        storage_id=storage_id,
+        status=status,
+        currency=currency,
+        quantity_delta=sign * (state["quantity"] or 0) if quantity is None else quantity,
+        value_delta=sign * _value(state) if value is None else value,
+        reason=reason,
+    )
+
+
+def movements_for_change(
+    stock_id, previous: Optional[Dict], current: Optional[Dict], reason: Optional[str] = None
+) -> List[StockMovement]:
+    """
+    Turn a Stock state transition into ledger rows.
+    `previous` is None for a newly created entry and `current` is None for a deleted one.
+    `reason` overrides the reason inferred from the transition (e.g. a split move is a transfer).
+    """
+    if previous is None and current is None:
+        return []
+    if previous is None:
+        return [_movement(stock_id, current, 1, reason or Reason.CREATE)]
+    if current is None:
+        return [_movement(stock_id, previous, -1, reason or Reason.DELETE)]
+    if previous == current:
+        return []
+
+    if _position(previous) == _position(current):
+        quantity = (current["quantity"] or 0) - (previous["quantity"] or 0)
+        value = _value(current) - _value(previous)
+        reason = reason or (Reason.ADJUST if quantity else Reason.EDIT)
+        return [_movement(stock_id, current, 1, reason, quantity=quantity, value=value)]
+
+    if reason is None:
+        if (previous["status"] or None) != (current["status"] or None):
+            reason = Reason.STATUS
+        elif previous["storage_id"] != current["storage_id"]:
+            reason = Reason.TRANSFER
+        else:
+            reason = Reason.EDIT
+    return [_movement(stock_id, previous, -1, reason), _movement(stock_id, current, 1, reason)]
+
+
+def record_change(stock_id, previous: Optional[Dict], current: Optional[Dict]):
+    """Append the movements for one Stock state transition to the ledger."""
+    movements = movements_for_change(stock_id, previous, current)
+    if movements:
+        StockMovement.objects.bulk_create(movements)
+        bump_versions(StockMovement)
+
+
+def positions_at(at: datetime, part_id=None) -> Dict[Tuple, List]:
+    """Net [quantity, value] per position at `at`: latest snapshot plus the movement tail."""
+    positions: Dict[Tuple, List] = defaultdict(lambda: [0, Decimal(0)])
+
+    snapshot = StockSnapshot.objects.filter(taken_at__lte=at).order_by("-taken_at").first()
+    movements = StockMovement.objects.filter(created_at__lte=at)
+    if snapshot is not None:
+        lines = snapshot.lines.all()
+        if part_id is not None:
+            lines = lines.filter(part_id=part_id)
+        for line in lines.values(*POSITION_FIELDS, "quantity", "value"):
+            position = positions[tuple(line[field] for field in POSITION_FIELDS)]
+            position[0] += line["quantity"]
+            position[1] += line["value"]
+        movements = movements.filter(created_at__gt=snapshot.taken_at)
+
+    if part_id is not None:
+        movements = movements.filter(part_id=part_id)
+    tail = movements.values(*POSITION_FIELDS).order_by().annotate(
+        quantity=Sum("quantity_delta"), value=Sum("value_delta")
+    )
+    for row in tail:
+        position = positions[tuple(row[field] for field in POSITION_FIELDS)]
+        position[0] += row["quantity"]
+        position[1] += row["value"]
+
+    return positions
+
+
+def stock_as_of(at: datetime, part_id=None) -> List[Dict]:
+    """Stock positions (part, storage, status, currency) with non-zero quantity at `at`."""
+    return [
+        {**dict(zip(POSITION_FIELDS, key)), "quantity": quantity, "value": value}
+        for key, (quantity, value) in positions_at(at, part_id=part_id).items()
+        if quantity or value
+    ]
+
+
+def take_snapshot(taken_at: Optional[datetime] = None) -> StockSnapshot:
+    """Compact the ledger into a new snapshot at `taken_at` (default: now)."""
+    taken_at = taken_at or timezone.now()
+    with transaction.atomic():
+        positions = positions_at(taken_at)
+        snapshot = StockSnapshot.objects.create(taken_at=taken_at)
+        StockSnapshotLine.objects.bulk_create(
+            [
+                StockSnapshotLine(snapshot=snapshot, quantity=quantity, value=value, **dict(zip(POSITION_FIELDS, key)))
+                for key, (quantity, value) in positions.items()
+                if quantity or value
+            ],
+            batch_size=1000,
+        )
+    return snapshot
+
+
+def _handle_stock_save(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, "_loaded_state", None)
+    record_change(instance.id, previous, instance.tracked_state())
+
+
+def _handle_stock_delete(sender, instance, **kwargs):
+    previous = getattr(instance, "_loaded_state", None) or instance.tracked_state()
+    record_change(instance.id, previous, None)
+
+
+def connect_signals():
+    post_save.connect(_handle_stock_save, sender=Stock, dispatch_uid="inventory.ledger.stock_save")
+    post_delete.connect(_handle_stock_delete, sender=Stock, dispatch_uid="inventory.ledger.stock_delete")
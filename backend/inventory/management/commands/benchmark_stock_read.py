@@ -0,0 +1,112 @@
+import json
+import time
+import tracemalloc
+from typing import List
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from pydantic import TypeAdapter
+from core.models import Attachment, Company
+from inventory.models import Storage, Stock
+from inventory.projections import STOCK_PROJECTION
+from inventory.schemas import StockSchema
+from inventory.summary import recount_parts, total_stock_expression
+from parts.models import Part
+
+STOCK_LIST = TypeAdapter(List[StockSchema])
+
+
+def orm_page(limit: int):
+    """The model-instance read path list_stock used before projections."""
+    stock_items = list(
+        Stock.objects.select_related("part__manufacturer", "storage", "lot")
+        .prefetch_related("part__attachments", "storage__attachments", "lot__attachments")
+        .annotate(part_total_stock=total_stock_expression("part__"))
+        .order_by("created_at", "id")[:limit]
+    )
+    for stock in stock_items:
+        stock.storage.__dict__["attachments"] = list(stock.storage.attachments.all())
+        if stock.lot:
+            stock.lot.__dict__["attachments"] = list(stock.lot.attachments.all())
+        stock.part.__dict__["attachments"] = list(stock.part.attachments.all())
+        stock.part.total_stock = stock.part_total_stock
+    return stock_items
+
+
+def projection_page(limit: int):
+    return STOCK_PROJECTION.fetch(Stock.objects.order_by("created_at", "id")[:limit])
+
+
+class Command(BaseCommand):
+    help = "Compare throughput and memory of the ORM and projection read paths for a list_stock page"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=1000, help="Page size")
+        parser.add_argument("--iterations", type=int, default=20, help="Timed iterations per path")
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Create this many stock rows (with parts, locations and attachments) for the run; rolled back after",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["seed"]:
+                self._seed(options["seed"])
+            results = [
+                self._measure("orm", orm_page, options["limit"], options["iterations"]),
+                self._measure("projection", projection_page, options["limit"], options["iterations"]),
+            ]
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{'path':<12}{'rows':>6}{'pages/s':>10}{'ms/page':>10}{'peak MiB':>10}")
+        for name, rows, per_second, peak in results:
+            self.stdout.write(f"{name:<12}{rows:>6}{per_second:>10.1f}{1000 / per_second:>10.1f}{peak:>10.1f}")
+        speedup = results[1][2] / results[0][2]
+        self.stdout.write(self.style.SUCCESS(f"projection is {speedup:.1f}x the ORM path throughput"))
+
+    def _measure(self, name, page, limit, iterations):
+        def run():
+            items = page(limit)
+            # FastAPI validates against the response model and serializes to JSON for every response
+            payload = STOCK_LIST.dump_json(STOCK_LIST.validate_python(items, from_attributes=True), by_alias=True)
+            json.loads(payload)
+            return len(items)
+
+        rows = run()  # warm up
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            run()
+        per_second = iterations / (time.perf_counter() - started)
+        return name, rows, per_second, peak
+
+    def _seed(self, count):
+        manufacturer = Company.objects.create(name="Benchmark Manufacturer", is_manufacturer=True)
+        parts = Part.objects.bulk_create(
+            [
+                Part(name=f"Benchmark part {index}", part_type="local", manufacturer=manufacturer)
+                for index in range(max(count // 4, 1))
+            ]
+        )
+        storages = [Storage(name=f"Benchmark bin {index}") for index in range(max(count // 10, 1))]
+        for storage in storages:
+            storage.path = f"{storage.id.hex}/"
+        storages = Storage.objects.bulk_create(storages)
+
+        datasheet = Attachment.objects.create(filename="datasheet.pdf", content_type="application/pdf", size=1)
+        Part.attachments.through.objects.bulk_create(
+            [Part.attachments.through(part_id=part.id, attachment_id=datasheet.id) for part in parts]
+        )
+        Stock.objects.bulk_create(
+            [
+                Stock(part=parts[index % len(parts)], storage=storages[index % len(storages)], quantity=index)
+                for index in range(count)
+            ],
+            batch_size=1000,
+        )
+        recount_parts(part.id for part in parts)
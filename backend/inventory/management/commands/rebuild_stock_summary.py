@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from inventory.summary import check_summaries, rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or check) the per-part stock totals in PartStockSummary"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report parts whose summary disagrees with the Stock table; do not write",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            mismatches = check_summaries()
+            for mismatch in mismatches:
+                self.stdout.write(
+                    f"Part {mismatch['part_id']}: expected {mismatch['expected']}, stored {mismatch['stored']}"
+                )
+            if mismatches:
+                self.stdout.write(self.style.ERROR(f"{len(mismatches)} inconsistent part summaries"))
+                raise SystemExit(1)
+            self.stdout.write(self.style.SUCCESS("Part stock summaries are consistent"))
+            return
+
+        self.stdout.write("Rebuilding part stock summaries...")
+        count = rebuild_summaries()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} part stock summaries"))
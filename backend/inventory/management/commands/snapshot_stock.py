@@ -0,0 +1,22 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from inventory.ledger import take_snapshot
+
+
+class Command(BaseCommand):
+    help = "Compact the stock movement ledger into a snapshot (run periodically, e.g. nightly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lag",
+            type=int,
+            default=300,
+            help="Take the snapshot this many seconds in the past so in-flight transactions have committed",
+        )
+
+    def handle(self, *args, **options):
+        taken_at = timezone.now() - timedelta(seconds=options["lag"])
+        snapshot = take_snapshot(taken_at)
+        message = f"Created snapshot at {snapshot.taken_at:%Y-%m-%d %H:%M} with {snapshot.lines.count()} positions"
+        self.stdout.write(self.style.SUCCESS(message))
@@ -1,43 +1,162 @@
-from django.core.management.base import BaseCommand
-from inventory.models import Storage
-from core.typesense import StorageCollection, registry
+"""
+Reindex the registered search collections (storage locations, parts) without search downtime.
+
+A full sync builds a new version of each collection (e.g. `parts_20261017034500123456`) while searches
+keep using the current one, then points the collection's alias at it and drops the old version.
+Rows are read through a server-side cursor and imported in parallel batches. Changes made during
+the build are indexed into the old version by the outbox, so after the swap the rows updated since
+the build started are synced again and documents whose row is gone are deleted.
+
+`--since` syncs only the rows updated from a point in time into the live collection, then deletes
+documents whose row is gone. It takes an ISO datetime, a duration back from now (30m, 12h, 7d) or
+`last`: the watermark of the previous successful sync (core.models.SearchSyncState).
+"""
+
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from core.models import SearchSyncState
+from core.search_outbox import enqueue
+from core.typesense import TypesenseCollection, registry
+
+DURATION = re.compile(r"^(\d+)([mhd])$")
+UNITS = {"m": "minutes", "h": "hours", "d": "days"}
 
 
 class Command(BaseCommand):
-    help = "Sync Storage locations to Typesense"
+    help = "Reindex the registered search collections (storage locations, parts) without search downtime"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--collection",
+            action="append",
+            choices=sorted(registry.collections),
+            help="Collection to sync (repeatable; default: all)",
+        )
+        parser.add_argument(
+            "--since",
+            help="Only sync rows updated since an ISO datetime, a duration (30m, 12h, 7d) or the last sync ('last')",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Documents per import_ call")
+        parser.add_argument("--workers", type=int, default=4, help="import_ calls in flight at once")
+        parser.add_argument(
+            "--keep-old", action="store_true", help="Keep the previous collection version after a full sync"
+        )
 
     def handle(self, *args, **options):
-        # Explicitly register and create the collection
-        collection = StorageCollection()
-        registry.register(collection)
-
-        self.stdout.write("Creating Typesense collection...")
-        collection.create_collection()
-
-        self.stdout.write("Syncing existing Storage locations...")
-        count = 0
-        batch = []
-
-        for storage in Storage.objects.all().iterator():
-            doc = collection.to_document(storage)
-            batch.append(doc)
-
-            if len(batch) >= 100:
-                # Upsert batch
-                try:
-                    registry.client.collections["storage"].documents.import_(batch)
-                    count += len(batch)
-                    self.stdout.write(f"Synced {count} locations...")
+        for name in options["collection"] or sorted(registry.collections):
+            collection = registry.collections[name]
+            since = self._since(name, options["since"]) if options["since"] else None
+            started = timezone.now()
+            if settings.SEARCH_BACKEND == "embedded":
+                self._queue_embedded(collection, since, options)
+            elif since is None:
+                self._full(collection, started, options)
+            else:
+                self._incremental(collection, since, options)
+            SearchSyncState.objects.update_or_create(collection=name, defaults={"synced_at": started})
+
+    def _since(self, name: str, value: str) -> datetime:
+        if value == "last":
+            state = SearchSyncState.objects.filter(collection=name).first()
+            if state is None:
+                raise CommandError(f"{name} has not been synced yet; run a full sync first")
+            return state.synced_at
+        if match := DURATION.match(value):
+            return timezone.now() - timedelta(**{UNITS[match[2]]: int(match[1])})
+        since = parse_datetime(value)
+        if since is None:
+            raise CommandError("--since takes an ISO datetime, a duration such as 30m, 12h or 7d, or 'last'")
+        return since if timezone.is_aware(since) else timezone.make_aware(since)
+
+    def _full(self, collection: TypesenseCollection, started: datetime, options):
+        engine, name = registry.engine, collection.name
+        version = f"{name}_{started:%Y%m%d%H%M%S%f}"
+        self.stdout.write(f"Building {version}...")
+        engine.create_collection(collection, version)
+        count, failed = self._import(collection, version, collection.get_queryset().order_by("pk"), options)
+        if failed:
+            engine.drop_collection(version)
+            raise CommandError(f"{failed} {name} documents failed; {name} still serves the previous version")
+
+        previous = engine.alias_target(name)
+        if previous is None and engine.exists(name):
+            # A collection from before versioning: it makes way for the alias of the same name
+            self.stdout.write(f"Replacing collection {name} with an alias...")
+            engine.drop_collection(name)
+        engine.point_alias(name, version)
+        self.stdout.write(self.style.SUCCESS(f"{name} now serves {version} ({count} documents)"))
+
+        self._incremental(collection, started, options)
+        if previous and not options["keep_old"]:
+            engine.drop_collection(previous)
+
+    def _incremental(self, collection: TypesenseCollection, since: datetime, options):
+        engine, name = registry.engine, collection.name
+        changed = collection.get_queryset().filter(pk__in=collection.changed_since(since).values("pk"))
+        count, failed = self._import(collection, name, changed.order_by("pk"), options)
+
+        # Read the index before the table, so a row created in between is never taken for deleted
+        indexed = set(engine.document_ids(name))
+        existing = {str(pk) for pk in collection.model.objects.values_list("pk", flat=True).iterator()}
+        gone = sorted(indexed - existing)
+        for start in range(0, len(gone), options["batch_size"]):
+            engine.delete(name, gone[start : start + options["batch_size"]])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Synced {count - failed} {name} documents updated since {since:%Y-%m-%d %H:%M:%S}")
+        )
+        if gone:
+            self.stdout.write(f"Deleted {len(gone)} {name} documents whose row is gone")
+        if failed:
+            raise CommandError(f"{failed} {name} documents failed")
+
+    def _import(self, collection: TypesenseCollection, target: str, queryset, options) -> Tuple[int, int]:
+        """Upsert the documents of `queryset` into `target` in parallel batches; returns (documents, failed)."""
+        batch_size, workers = options["batch_size"], options["workers"]
+        count = failed = 0
+
+        def collect(done):
+            nonlocal count, failed
+            for future in done:
+                size, errors = future.result()
+                count += size
+                failed += len(errors)
+                for document_id, error in errors.items():
+                    self.stderr.write(f"{collection.name}/{document_id}: {error}")
+            self.stdout.write(f"Imported {count} {collection.name} documents...")
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending, batch = set(), []
+            for instance in queryset.iterator(chunk_size=batch_size):  # a server-side cursor on Postgres
+                batch.append(collection.to_document(instance))
+                if len(batch) >= batch_size:
+                    pending.add(pool.submit(self._upsert, target, batch))
                     batch = []
-                except Exception as e:
-                    self.stderr.write(f"Batch sync error: {e}")
-
-        # Final batch
-        if batch:
-            try:
-                registry.client.collections["storage"].documents.import_(batch)
-                count += len(batch)
-            except Exception as e:
-                self.stderr.write(f"Final batch sync error: {e}")
-
-        self.stdout.write(self.style.SUCCESS(f"Successfully synced {count} locations to Typesense"))
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+            if batch:
+                pending.add(pool.submit(self._upsert, target, batch))
+            if pending:
+                collect(wait(pending).done)
+        return count, failed
+
+    def _upsert(self, target: str, documents: List[Dict]) -> Tuple[int, Dict[str, str]]:
+        try:
+            return len(documents), registry.engine.upsert(target, documents)
+        except Exception as e:
+            return len(documents), {document["id"]: f"batch failed: {e}" for document in documents}
+
+    def _queue_embedded(self, collection: TypesenseCollection, since: Optional[datetime], options):
+        # The embedded index belongs to the API process: queue the documents for its outbox worker
+        rows = collection.model.objects.all() if since is None else collection.changed_since(since)
+        ids = rows.values_list("pk", flat=True)
+        enqueue(collection.name, ids.iterator(chunk_size=options["batch_size"]))
+        message = f"Queued {ids.count()} {collection.name} documents for the embedded index"
+        self.stdout.write(self.style.SUCCESS(message))
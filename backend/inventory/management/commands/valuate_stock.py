@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from inventory.valuation import record_valuations
+
+
+class Command(BaseCommand):
+    help = "Record the stock valuation of every finished day that is missing (run daily, e.g. after midnight)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=90, help="Record at most this many past days")
+        parser.add_argument(
+            "--lag",
+            type=int,
+            default=300,
+            help="Consider a day finished this many seconds after midnight so in-flight transactions have committed",
+        )
+
+    def handle(self, *args, **options):
+        recorded = record_valuations(days=options["days"], lag=options["lag"])
+        if not recorded:
+            self.stdout.write("No finished days to record")
+            return
+        message = f"Recorded valuations for {len(recorded)} days ({recorded[0].day} to {recorded[-1].day})"
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,51 @@
+# Generated by Django 6.0.1 on 2026-10-17 02:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+
+def backfill_summaries(apps, schema_editor):
+    Stock = apps.get_model("inventory", "Stock")
+    PartStockSummary = apps.get_model("inventory", "PartStockSummary")
+
+    buckets = {
+        "available": Q(status__isnull=True) | Q(status="available"),
+        "reserved": Q(status="reserved"),
+        "allocated": Q(status="allocated"),
+        "ordered": Q(status__in=["ordered", "being-ordered", "in-transit"]),
+    }
+    rows = Stock.objects.values("part_id").order_by().annotate(
+        **{name: Sum("quantity", filter=condition, default=0) for name, condition in buckets.items()}
+    )
+    PartStockSummary.objects.bulk_create(
+        [PartStockSummary(**row) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_storage_parent'),
+        ('parts', '0006_part_designator'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartStockSummary',
+            fields=[
+                ('part', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stock_summary', serialize=False, to='parts.part')),
+                ('available', models.IntegerField(default=0)),
+                ('reserved', models.IntegerField(default=0)),
+                ('allocated', models.IntegerField(default=0)),
+                ('ordered', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Part Stock Summary',
+                'verbose_name_plural': 'Part Stock Summaries',
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
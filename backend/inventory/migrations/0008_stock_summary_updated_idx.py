@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-17 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_partstocksummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='partstocksummary',
+            index=models.Index(fields=['updated_at'], name='stock_summary_updated_idx'),
+        ),
+    ]
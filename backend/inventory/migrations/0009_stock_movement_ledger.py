@@ -0,0 +1,87 @@
+# Generated by Django 6.0.1 on 2026-10-17 02:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def record_opening_balances(apps, schema_editor):
+    Stock = apps.get_model("inventory", "Stock")
+    StockMovement = apps.get_model("inventory", "StockMovement")
+
+    now = timezone.now()
+    movements = []
+    for stock in Stock.objects.all().iterator():
+        value = stock.quantity * stock.price_unit if stock.price_unit is not None else 0
+        movements.append(
+            StockMovement(
+                created_at=now,
+                stock_id=stock.id,
+                part_id=stock.part_id,
+                storage_id=stock.storage_id,
+                status=stock.status or None,
+                currency=stock.currency or "",
+                quantity_delta=stock.quantity,
+                value_delta=value,
+                reason="opening",
+            )
+        )
+    StockMovement.objects.bulk_create(movements, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_stock_summary_updated_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('taken_at', models.DateTimeField(unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-taken_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('stock_id', models.UUIDField()),
+                ('part_id', models.UUIDField()),
+                ('storage_id', models.UUIDField()),
+                ('status', models.CharField(blank=True, choices=[('ordered', 'Ordered'), ('reserved', 'Reserved'), ('allocated', 'Allocated'), ('in-production', 'In Production'), ('in-transit', 'In Transit'), ('planned', 'Planned'), ('rejected', 'Rejected'), ('being-ordered', 'Being Ordered'), ('available', 'Available')], max_length=20, null=True)),
+                ('currency', models.CharField(blank=True, max_length=3)),
+                ('quantity_delta', models.IntegerField()),
+                ('value_delta', models.DecimalField(decimal_places=4, default=0, max_digits=19)),
+                ('reason', models.CharField(choices=[('opening', 'Opening Balance'), ('create', 'Created'), ('adjust', 'Adjusted'), ('transfer', 'Transferred'), ('status', 'Status Change'), ('edit', 'Edited'), ('delete', 'Deleted')], max_length=20)),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['created_at'], name='stock_movement_created_idx'), models.Index(fields=['part_id', 'created_at'], name='stock_movement_part_idx'), models.Index(fields=['stock_id', 'created_at'], name='stock_movement_stock_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshotLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('part_id', models.UUIDField()),
+                ('storage_id', models.UUIDField()),
+                ('status', models.CharField(blank=True, choices=[('ordered', 'Ordered'), ('reserved', 'Reserved'), ('allocated', 'Allocated'), ('in-production', 'In Production'), ('in-transit', 'In Transit'), ('planned', 'Planned'), ('rejected', 'Rejected'), ('being-ordered', 'Being Ordered'), ('available', 'Available')], max_length=20, null=True)),
+                ('currency', models.CharField(blank=True, max_length=3)),
+                ('quantity', models.IntegerField()),
+                ('value', models.DecimalField(decimal_places=4, default=0, max_digits=19)),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='inventory.stocksnapshot')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['snapshot', 'part_id'], name='stock_snapshot_part_idx')],
+            },
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 6.0.1 on 2026-10-17 02:27
+
+from django.db import migrations, models
+
+
+def backfill_paths(apps, schema_editor):
+    Storage = apps.get_model("inventory", "Storage")
+
+    parents = dict(Storage.objects.values_list("id", "parent_id"))
+    paths = {}
+
+    def path_for(storage_id, seen=()):
+        if storage_id not in paths:
+            parent_id = parents.get(storage_id)
+            # Unknown parents and cycles are treated as roots
+            if parent_id is None or parent_id not in parents or parent_id in seen:
+                prefix = ""
+            else:
+                prefix = path_for(parent_id, (*seen, storage_id))
+            paths[storage_id] = f"{prefix}{storage_id.hex}/"
+        return paths[storage_id]
+
+    storages = list(Storage.objects.only("id"))
+    for storage in storages:
+        storage.path = path_for(storage.id)
+    Storage.objects.bulk_update(storages, ["path"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_stock_movement_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storage',
+            name='path',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='storage',
+            index=models.Index(fields=['path'], name='storage_path_idx', opclasses=['text_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-17 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_storage_path'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lot',
+            index=models.Index(fields=['created_at', 'id'], name='lot_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(fields=['created_at', 'id'], name='stock_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='storage',
+            index=models.Index(fields=['name', 'id'], name='storage_name_id_idx'),
+        ),
+    ]
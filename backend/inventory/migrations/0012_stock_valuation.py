@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_keyset_pagination_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockValuation',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField(unique=True)),
+                ('taken_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockValuationLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(blank=True, choices=[('ordered', 'Ordered'), ('reserved', 'Reserved'), ('allocated', 'Allocated'), ('in-production', 'In Production'), ('in-transit', 'In Transit'), ('planned', 'Planned'), ('rejected', 'Rejected'), ('being-ordered', 'Being Ordered'), ('available', 'Available')], max_length=20, null=True)),
+                ('currency', models.CharField(blank=True, max_length=3)),
+                ('quantity', models.BigIntegerField()),
+                ('value', models.DecimalField(decimal_places=4, default=0, max_digits=19)),
+                ('valuation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='inventory.stockvaluation')),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:34
+
+import core.search_indexes
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_search_vectors'),
+        ('inventory', '0012_stock_valuation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storage',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('name', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector('description', config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='storage',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='storage_search_vector_idx'),
+        ),
+        core.search_indexes.AddIndexIfExtension(
+            model_name='storage',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='storage_name_trgm_idx'),
+        ),
+    ]
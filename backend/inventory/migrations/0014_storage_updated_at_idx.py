@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0013_storage_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='storage',
+            index=models.Index(fields=['updated_at'], name='storage_updated_at_idx'),
+        ),
+    ]
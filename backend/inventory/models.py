@@ -1,5 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+from django.utils import timezone
+from django.contrib.postgres.indexes import GinIndex
 from core.models import GlobalOpsBase, Attachment
+from core.search_indexes import search_vector_field, trigram_index
 
 
 class Storage(GlobalOpsBase):
@@ -11,14 +16,56 @@ class Storage(GlobalOpsBase):
     description = models.TextField(blank=True)
     parent = models.ForeignKey("self", on_delete=models.SET_NULL, null=True, blank=True, related_name="children")
 
+    # Materialized path: hex ids from the root down to and including this location, each followed by "/".
+    # A subtree is every row whose path starts with the root's path (see inventory.hierarchy).
+    path = models.TextField(default="", editable=False)
+
     attachments = models.ManyToManyField(Attachment, blank=True, related_name="storages")
 
+    # Full-text search (see core.search_indexes)
+    search_vector = search_vector_field(name="A", description="B")
+
     class Meta(GlobalOpsBase.Meta):
         verbose_name_plural = "Storage"
+        indexes = [
+            models.Index(fields=["path"], name="storage_path_idx", opclasses=["text_pattern_ops"]),
+            # Keyset pagination order (core.pagination.BY_NAME)
+            models.Index(fields=["name", "id"], name="storage_name_id_idx"),
+            # Incremental search syncs (sync_typesense --since)
+            models.Index(fields=["updated_at"], name="storage_updated_at_idx"),
+            GinIndex(fields=["search_vector"], name="storage_search_vector_idx"),
+            trigram_index("name", "storage_name_trgm_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
+    def save(self, *args, **kwargs):
+        # The path and the paths of all descendants are rewritten in the same transaction as the write.
+        with transaction.atomic(using=kwargs.get("using")):
+            parent_path = ""
+            if self.parent_id is not None:
+                parent_path = type(self).objects.filter(pk=self.parent_id).values_list("path", flat=True).first() or ""
+                if self.parent_id == self.pk or self.pk.hex in parent_path.split("/"):
+                    raise ValueError("A storage location cannot be placed inside itself", 400)
+
+            old_path = None
+            if not self._state.adding:
+                old_path = type(self).objects.filter(pk=self.pk).values_list("path", flat=True).first()
+
+            self.path = f"{parent_path}{self.pk.hex}/"
+            # For post_save handlers: the descendants keep the old path until the rewrite below
+            self._old_path = old_path if old_path != self.path else None
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "path"}
+            super().save(*args, **kwargs)
+
+            if old_path and old_path != self.path:
+                # updated_at too: the descendants' ancestors changed (sync_typesense --since)
+                type(self).objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                    path=Concat(Value(self.path), Substr("path", len(old_path) + 1)), updated_at=timezone.now()
+                )
+
 
 class Lot(GlobalOpsBase):
     """
@@ -37,6 +84,12 @@ class Lot(GlobalOpsBase):
         "procurement.Order", on_delete=models.SET_NULL, null=True, blank=True, related_name="lots"
     )
 
+    class Meta(GlobalOpsBase.Meta):
+        indexes = [
+            # Keyset pagination order (core.pagination.BY_CREATED)
+            models.Index(fields=["created_at", "id"], name="lot_created_id_idx"),
+        ]
+
     def __str__(self) -> str:
         return self.name
 
@@ -78,5 +131,165 @@ class Stock(GlobalOpsBase):
     currency = models.CharField(max_length=3, blank=True)  # ISO code
 
     class Meta(GlobalOpsBase.Meta):
-        indexes = []
+        indexes = [
+            # Keyset pagination order (core.pagination.BY_CREATED)
+            models.Index(fields=["created_at", "id"], name="stock_created_id_idx"),
+        ]
         verbose_name_plural = "Stock"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_state()
+        return instance
+
+    # Fields whose persisted values are remembered so writes can be turned into deltas
+    # (PartStockSummary maintenance and the StockMovement ledger).
+    TRACKED_FIELDS = ("part_id", "storage_id", "status", "quantity", "price_unit", "currency")
+
+    def tracked_state(self) -> dict:
+        return {field: getattr(self, field) for field in self.TRACKED_FIELDS}
+
+    def _remember_loaded_state(self):
+        # Left unset when a tracked field was deferred, which forces a recount instead of a delta.
+        if self.get_deferred_fields() & set(self.TRACKED_FIELDS):
+            self._loaded_state = None
+        else:
+            self._loaded_state = self.tracked_state()
+
+    def save(self, *args, **kwargs):
+        # post_save handlers (PartStockSummary, StockMovement ledger) must run in the same transaction as the write.
+        with transaction.atomic(using=kwargs.get("using")):
+            if getattr(self, "_loaded_state", None) is None and not self._state.adding:
+                self._loaded_state = type(self).objects.filter(pk=self.pk).values(*self.TRACKED_FIELDS).first()
+            super().save(*args, **kwargs)
+        self._remember_loaded_state()
+
+
+class PartStockSummary(models.Model):
+    """
+    Read model holding per-part stock totals, one row per part.
+    Maintained incrementally from Stock writes (see inventory.summary).
+    """
+
+    part = models.OneToOneField("parts.Part", on_delete=models.CASCADE, primary_key=True, related_name="stock_summary")
+
+    available = models.IntegerField(default=0)
+    reserved = models.IntegerField(default=0)
+    allocated = models.IntegerField(default=0)
+    ordered = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Part Stock Summary"
+        verbose_name_plural = "Part Stock Summaries"
+        indexes = [
+            models.Index(fields=["updated_at"], name="stock_summary_updated_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.part_id}: {self.available} available"
+
+
+class StockMovement(models.Model):
+    """
+    Append-only ledger of Stock changes.
+    Each row is a signed delta against one (part, storage, status, currency) position.
+    Ids are stored as plain UUIDs so the history survives deletion of the referenced rows.
+    """
+
+    class Reason(models.TextChoices):
+        OPENING = "opening", "Opening Balance"
+        CREATE = "create", "Created"
+        ADJUST = "adjust", "Adjusted"
+        TRANSFER = "transfer", "Transferred"
+        STATUS = "status", "Status Change"
+        EDIT = "edit", "Edited"
+        DELETE = "delete", "Deleted"
+
+    id = models.BigAutoField(primary_key=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    stock_id = models.UUIDField()
+    part_id = models.UUIDField()
+    storage_id = models.UUIDField()
+    status = models.CharField(max_length=20, choices=Stock.StockStatus.choices, null=True, blank=True)
+    currency = models.CharField(max_length=3, blank=True)
+
+    quantity_delta = models.IntegerField()
+    value_delta = models.DecimalField(max_digits=19, decimal_places=4, default=0)
+    reason = models.CharField(max_length=20, choices=Reason.choices)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(fields=["created_at"], name="stock_movement_created_idx"),
+            models.Index(fields=["part_id", "created_at"], name="stock_movement_part_idx"),
+            models.Index(fields=["stock_id", "created_at"], name="stock_movement_stock_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.reason} {self.quantity_delta:+d} ({self.part_id})"
+
+
+class StockSnapshot(models.Model):
+    """
+    Compacted stock positions as of `taken_at`.
+    Historical queries start from the latest snapshot and replay only the movements after it.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    taken_at = models.DateTimeField(unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-taken_at"]
+
+    def __str__(self) -> str:
+        return f"Snapshot {self.taken_at:%Y-%m-%d %H:%M}"
+
+
+class StockSnapshotLine(models.Model):
+    snapshot = models.ForeignKey(StockSnapshot, on_delete=models.CASCADE, related_name="lines")
+
+    part_id = models.UUIDField()
+    storage_id = models.UUIDField()
+    status = models.CharField(max_length=20, choices=Stock.StockStatus.choices, null=True, blank=True)
+    currency = models.CharField(max_length=3, blank=True)
+
+    quantity = models.IntegerField()
+    value = models.DecimalField(max_digits=19, decimal_places=4, default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["snapshot", "part_id"], name="stock_snapshot_part_idx"),
+        ]
+
+
+class StockValuation(models.Model):
+    """
+    Stock value at the end of `day` (local time), per currency and status.
+    Recorded daily; the dashboard value history reads one row per day instead of the stock table.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    day = models.DateField(unique=True)
+    taken_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-day"]
+
+    def __str__(self) -> str:
+        return f"Valuation {self.day:%Y-%m-%d}"
+
+
+class StockValuationLine(models.Model):
+    valuation = models.ForeignKey(StockValuation, on_delete=models.CASCADE, related_name="lines")
+
+    status = models.CharField(max_length=20, choices=Stock.StockStatus.choices, null=True, blank=True)
+    currency = models.CharField(max_length=3, blank=True)
+
+    quantity = models.BigIntegerField()
+    value = models.DecimalField(max_digits=19, decimal_places=4, default=0)
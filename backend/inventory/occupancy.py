@@ -0,0 +1,108 @@
+"""
+Storage occupancy summary for the dashboard.
+
+The summary is computed with a single grouped query and cached. Stock and Storage writes bump a
+version number on commit, so a cached summary is never served after the data it was built from
+has changed (in this process's cache backend; other backends are bounded by the TTL).
+"""
+
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.signals import post_save, post_delete
+from inventory.models import Storage, Stock
+
+CACHE_KEY = "inventory:occupancy"
+VERSION_KEY = "inventory:occupancy:version"
+
+TOP_LOCATIONS = 5
+TOP_LEVEL = "(top level)"
+UNTAGGED = "(untagged)"
+
+
+def _percentage(used: int, total: int) -> float:
+    return round((used / total * 100), 1) if total > 0 else 0
+
+
+def _group(rows: List[Dict[str, Any]], keys_for_row, name_for_key) -> List[Dict[str, Any]]:
+    groups: Dict[Any, Dict[str, int]] = defaultdict(lambda: {"total_locations": 0, "used_locations": 0, "quantity": 0})
+    for row in rows:
+        for key in keys_for_row(row):
+            group = groups[key]
+            group["total_locations"] += 1
+            group["used_locations"] += 1 if row["quantity"] > 0 else 0
+            group["quantity"] += row["quantity"]
+
+    breakdown = [
+        {
+            "key": str(key) if key is not None else None,
+            "name": name_for_key(key),
+            "used_percentage": _percentage(group["used_locations"], group["total_locations"]),
+            **group,
+        }
+        for key, group in groups.items()
+    ]
+    return sorted(breakdown, key=lambda item: (-item["quantity"], item["name"]))
+
+
+def compute_occupancy() -> Dict[str, Any]:
+    """Build the occupancy summary and both breakdowns from one grouped query."""
+    rows = list(
+        Storage.objects.values("id", "name", "parent_id", "tags")
+        .order_by()
+        .annotate(quantity=Sum("stock_in_location__quantity", default=0))
+    )
+
+    total_locations = len(rows)
+    used_locations = sum(1 for row in rows if row["quantity"] > 0)
+    top_locations = sorted(rows, key=lambda row: row["quantity"], reverse=True)[:TOP_LOCATIONS]
+
+    storage_names = {row["id"]: row["name"] for row in rows}
+
+    return {
+        "total_locations": total_locations,
+        "used_locations": used_locations,
+        "empty_locations": total_locations - used_locations,
+        "used_percentage": _percentage(used_locations, total_locations),
+        "top_locations": [{"name": row["name"], "quantity": row["quantity"]} for row in top_locations],
+        "by_parent": _group(rows, lambda row: [row["parent_id"]], lambda key: storage_names.get(key, TOP_LEVEL)),
+        "by_tag": _group(rows, lambda row: row["tags"] or [None], lambda key: key or UNTAGGED),
+    }
+
+
+def _current_version() -> int:
+    return cache.get_or_set(VERSION_KEY, time.time_ns, None)
+
+
+def get_occupancy() -> Dict[str, Any]:
+    """Return the cached occupancy summary, recomputing it if the data changed."""
+    version = _current_version()
+    key = f"{CACHE_KEY}:{version}"
+    occupancy = cache.get(key)
+    if occupancy is None:
+        occupancy = compute_occupancy()
+        cache.set(key, occupancy, settings.INVENTORY_OCCUPANCY_CACHE_TTL)
+    return occupancy
+
+
+def _bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def invalidate_occupancy(**kwargs):
+    transaction.on_commit(_bump_version)
+
+
+def connect_signals():
+    for model in (Storage, Stock):
+        post_save.connect(invalidate_occupancy, sender=model, dispatch_uid=f"inventory.occupancy.{model.__name__}_save")
+        post_delete.connect(
+            invalidate_occupancy, sender=model, dispatch_uid=f"inventory.occupancy.{model.__name__}_delete"
+        )
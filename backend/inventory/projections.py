@@ -0,0 +1,16 @@
+"""Projections (see core.projection) for storage, lot and stock responses."""
+
+from core.projection import Projection
+from inventory.models import Storage, Lot, Stock
+from inventory.schemas import StorageSchema, LotSchema, StockSchema
+from parts.projections import PART_PROJECTION
+
+STORAGE_PROJECTION = Projection.for_schema(Storage, StorageSchema)
+
+LOT_PROJECTION = Projection.for_schema(Lot, LotSchema)
+
+STOCK_PROJECTION = Projection.for_schema(
+    Stock,
+    StockSchema,
+    related={"part": PART_PROJECTION, "storage": STORAGE_PROJECTION, "lot": LOT_PROJECTION},
+)
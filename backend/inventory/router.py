@@ -1,8 +1,9 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, Query
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Response, UploadFile, File
 from uuid import UUID
 from pydantic import BaseModel
-from inventory.models import Storage, Lot, Stock
+from inventory.models import Storage, Lot, Stock, StockMovement
 from inventory.schemas import (
     StorageSchema,
     StorageCreate,
@@ -13,12 +14,33 @@ from inventory.schemas import (
     StockSchema,
     StockCreate,
     StockUpdate,
+    StockMovementSchema,
+    StockPositionSchema,
+    StorageSubtree,
+    BulkLocationCreate,
+    BulkLocationResult,
+    BulkStockImportResult,
+    StockBatchRequest,
+    StockBatchEntry,
 )
+from inventory.alerts import low_stock_queryset, parse_severities, poll_cursor
+from inventory.batch import apply_stock_batch
+from inventory.bulk import NDJSON_CONTENT_TYPES, import_stock_rows, iter_csv_rows, iter_ndjson_rows
+from inventory.generator import create_locations
+from inventory.hierarchy import filter_descendants, subtree_rollup
+from inventory.ledger import stock_as_of
+from inventory.occupancy import get_occupancy
+from inventory.projections import LOT_PROJECTION, STOCK_PROJECTION, STORAGE_PROJECTION
+from inventory.summary import total_stock_expression
+from core.etag import conditional_get
+from core.pagination import BY_CREATED, BY_NAME, count_total, paginate, set_page_headers
+from core.projection import parse_fields, projected_response
 from parts.models import Part
 from procurement.models import Order
-from asgiref.sync import sync_to_async
+from core.executor import database_sync_to_async
 from django.db import transaction
-from django.db.models import Exists, OuterRef, Sum
+from django.db.models import Exists, OuterRef
+import csv
 import logging
 
 
@@ -36,12 +58,22 @@ class StorageOccupancyItem(BaseModel):
     quantity: int
 
 
+class StorageOccupancyGroup(BaseModel):
+    key: Optional[str] = None
+    name: str
+    total_locations: int
+    used_locations: int
+    used_percentage: float
+    quantity: int
+
+
 class StorageOccupancySummary(BaseModel):
     total_locations: int
     used_locations: int
     empty_locations: int
     used_percentage: float
     top_locations: List[StorageOccupancyItem]
+    breakdown: Optional[List[StorageOccupancyGroup]] = None
 
 
 logger = logging.getLogger(__name__)
@@ -56,12 +88,17 @@ def _get_storage_queryset():
     return Storage.objects.prefetch_related("attachments")
 
 
-@router.get("/locations", response_model=List[StorageSchema])
+@router.get("/locations", response_model=List[StorageSchema], dependencies=[conditional_get("locations")])
 async def list_locations(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Cursor from the X-Next-Cursor header of the previous page (replaces skip)"),
+    total: bool = Query(False, description="Return the number of matching rows in the X-Total-Count header"),
+    estimate: bool = Query(False, description="Like total, but unfiltered large lists may use a planner estimate"),
     has_stock: bool = Query(None, description="Filter by stock status (true=has stock, false=empty)"),
     parent_id: UUID = Query(None, description="Filter by parent location"),
+    descendants_of: UUID = Query(None, description="Filter to locations anywhere below this location"),
     tags: str = Query(None, description="Filter by tags (comma-separated)"),
 ):
     """
@@ -69,7 +106,7 @@ async def list_locations(
     For search, use /search/locations endpoint instead.
     """
 
-    @sync_to_async
+    @database_sync_to_async
     def _list_locations():
         queryset = _get_storage_queryset()
 
@@ -86,27 +123,35 @@ async def list_locations(
         if parent_id:
             queryset = queryset.filter(parent_id=parent_id)
 
+        if descendants_of:
+            queryset = filter_descendants(queryset, descendants_of)
+
         if tags:
             tag_list = [tag.strip() for tag in tags.split(",") if tag.strip()]
             for tag in tag_list:
                 queryset = queryset.filter(tags__contains=[tag])
 
-        locations = list(queryset[skip : skip + limit])
-
-        # Eagerly convert attachments to lists
-        for location in locations:
-            location.__dict__['attachments'] = list(location.attachments.all())
-
-        return locations
+        rows, next_cursor, page_total = paginate(
+            STORAGE_PROJECTION.values(queryset),
+            BY_NAME,
+            limit,
+            cursor=cursor,
+            skip=skip,
+            total=total,
+            estimate=estimate,
+        )
+        return STORAGE_PROJECTION.build(rows), next_cursor, page_total
 
-    locations = await _list_locations()
+    locations, next_cursor, page_total = await _list_locations()
+    set_page_headers(response, next_cursor, page_total)
     return locations
 
 
-@router.get("/locations/count", response_model=dict)
+@router.get("/locations/count", response_model=dict, dependencies=[conditional_get("locations")])
 async def count_locations(
     has_stock: bool = Query(None, description="Filter by stock status (true=has stock, false=empty)"),
     parent_id: UUID = Query(None, description="Filter by parent location"),
+    descendants_of: UUID = Query(None, description="Filter to locations anywhere below this location"),
     tags: str = Query(None, description="Filter by tags (comma-separated)"),
 ):
     """
@@ -114,7 +159,7 @@ async def count_locations(
     For search, use /search/locations endpoint which includes count in response.
     """
 
-    @sync_to_async
+    @database_sync_to_async
     def _count_locations():
         queryset = _get_storage_queryset()
 
@@ -129,6 +174,9 @@ async def count_locations(
         if parent_id:
             queryset = queryset.filter(parent_id=parent_id)
 
+        if descendants_of:
+            queryset = filter_descendants(queryset, descendants_of)
+
         if tags:
             tag_list = [tag.strip() for tag in tags.split(",") if tag.strip()]
             for tag in tag_list:
@@ -140,9 +188,9 @@ async def count_locations(
     return {"count": count}
 
 
-@router.get("/locations/{location_id}", response_model=StorageSchema)
+@router.get("/locations/{location_id}", response_model=StorageSchema, dependencies=[conditional_get("locations")])
 async def get_location(location_id: UUID):
-    @sync_to_async
+    @database_sync_to_async
     def _get():
         try:
             location = _get_storage_queryset().get(id=location_id)
@@ -158,27 +206,63 @@ async def get_location(location_id: UUID):
     return location
 
 
+@router.get("/locations/{location_id}/subtree", response_model=StorageSubtree, dependencies=[conditional_get("stock")])
+async def get_location_subtree(location_id: UUID):
+    """
+    Get a location and everything below it, with stock quantities rolled up the tree.
+    Each node's `total_quantity` includes the stock held in all of its descendants.
+    """
+    subtree = await database_sync_to_async(subtree_rollup)(location_id)
+    if subtree is None:
+        raise HTTPException(status_code=404, detail="Storage location not found")
+    return subtree
+
+
 @router.post("/locations", response_model=StorageSchema, status_code=201)
 async def create_location(data: StorageCreate):
     """Create a new storage location."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _create():
+        if data.parent_id and not Storage.objects.filter(id=data.parent_id).exists():
+            raise ValueError("Parent location not found", 400)
+
         location = Storage.objects.create(**data.model_dump())
         location = _get_storage_queryset().get(id=location.id)
         # Eagerly convert attachments to lists
         location.__dict__['attachments'] = list(location.attachments.all())
         return location
 
-    location = await _create()
-    return location
+    try:
+        location = await _create()
+        return location
+    except ValueError as e:
+        args = e.args
+        raise HTTPException(status_code=args[1] if len(args) > 1 else 400, detail=args[0])
+
+
+@router.post("/locations/bulk", response_model=BulkLocationResult)
+async def bulk_create_locations(
+    data: BulkLocationCreate,
+    dry_run: bool = Query(False, description="Only preview the generated names and warnings"),
+):
+    """
+    Generate a row or grid of storage locations from letter/number ranges (max 1000).
+    With dry_run the names are previewed with duplicate and existing-name warnings; otherwise
+    the locations are created in one batch, which fails with 409 if any name conflicts.
+    """
+    try:
+        return await database_sync_to_async(create_locations)(data.model_dump(), dry_run=dry_run)
+    except ValueError as e:
+        args = e.args
+        raise HTTPException(status_code=args[1] if len(args) > 1 else 400, detail=args[0])
 
 
 @router.put("/locations/{location_id}", response_model=StorageSchema)
 async def update_location(location_id: UUID, data: StorageUpdate):
     """Update a storage location."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _update():
         try:
             logger.info(f"Starting atomic update for location {location_id}")
@@ -192,6 +276,10 @@ async def update_location(location_id: UUID, data: StorageUpdate):
                 update_data = data.model_dump(exclude_unset=True)
                 logger.info(f"Updating location {location_id} with data: {update_data}")
 
+                parent_id = update_data.get("parent_id")
+                if parent_id and not Storage.objects.filter(id=parent_id).exists():
+                    raise ValueError("Parent location not found", 400)
+
                 for field, value in update_data.items():
                     setattr(location, field, value)
 
@@ -222,7 +310,7 @@ async def update_location(location_id: UUID, data: StorageUpdate):
 async def delete_location(location_id: UUID):
     """Delete a storage location."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _delete():
         try:
             location = Storage.objects.get(id=location_id)
@@ -257,128 +345,117 @@ def _get_stock_queryset():
         "storage__attachments",
         "lot__attachments",
         "part__attachments"
-    )
+    ).annotate(part_total_stock=total_stock_expression("part__"))
 
 
-@router.get("/stock", response_model=List[StockSchema])
-async def list_stock(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
-    @sync_to_async
+@router.get("/stock", response_model=List[StockSchema], dependencies=[conditional_get("stock")])
+async def list_stock(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Cursor from the X-Next-Cursor header of the previous page (replaces skip)"),
+    total: bool = Query(False, description="Return the number of matching rows in the X-Total-Count header"),
+    estimate: bool = Query(False, description="Like total, but unfiltered large lists may use a planner estimate"),
+    fields: str = Query(None, description="Comma-separated fields to return, dotted for nested ones (e.g. part.name)"),
+    expand: str = Query(None, description="Comma-separated relations to embed; others are returned as <name>_id"),
+):
+    @database_sync_to_async
     def _list():
-        from django.db.models import Sum
-
-        stock_items = list(_get_stock_queryset().all()[skip : skip + limit])
-
-        # Calculate total_stock for all parts at once
-        part_ids = [stock.part_id for stock in stock_items if stock.part_id]
-        if part_ids:
-            part_totals = dict(
-                Stock.objects.filter(
-                    part_id__in=part_ids,
-                    status__isnull=True
-                )
-                .values('part_id')
-                .annotate(total=Sum('quantity'))
-                .values_list('part_id', 'total')
-            )
-        else:
-            part_totals = {}
-
-        # Eagerly convert attachments and add total_stock
-        for stock in stock_items:
-            if stock.storage:
-                stock.storage.__dict__['attachments'] = list(stock.storage.attachments.all())
-            if stock.lot:
-                stock.lot.__dict__['attachments'] = list(stock.lot.attachments.all())
-            if stock.part:
-                stock.part.__dict__['attachments'] = list(stock.part.attachments.all())
-                stock.part.total_stock = part_totals.get(stock.part.id, 0)
-
-        return stock_items
+        projection = STOCK_PROJECTION.select(parse_fields(fields), parse_fields(expand), keep=BY_CREATED)
+        queryset = projection.values(Stock.objects.all())
+        rows, next_cursor, page_total = paginate(
+            queryset, BY_CREATED, limit, cursor=cursor, skip=skip, total=total, estimate=estimate
+        )
+        return projection.build(rows), next_cursor, page_total
 
-    return await _list()
+    try:
+        stock_items, next_cursor, page_total = await _list()
+    except ValueError as e:
+        args = e.args
+        raise HTTPException(status_code=args[1] if len(args) > 1 else 400, detail=args[0])
+    set_page_headers(response, next_cursor, page_total)
+    return projected_response(stock_items, response, fields, expand)
 
 
-@router.get("/locations/{location_id}/stock", response_model=List[StockSchema])
-async def get_stock_by_location(location_id: UUID):
+@router.get("/locations/{location_id}/stock", response_model=List[StockSchema], dependencies=[conditional_get("stock")])
+async def get_stock_by_location(
+    location_id: UUID,
+    response: Response,
+    include_descendants: bool = Query(False, description="Include stock in all locations below this one"),
+    fields: str = Query(None, description="Comma-separated fields to return, dotted for nested ones (e.g. part.name)"),
+    expand: str = Query(None, description="Comma-separated relations to embed; others are returned as <name>_id"),
+):
     """Get all stock entries for a specific location."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _get_stock():
-        from django.db.models import Sum, Q
-
         try:
             location = Storage.objects.get(id=location_id)
         except Storage.DoesNotExist:
             return None
 
-        stock_items = list(
-            Stock.objects.filter(storage=location)
-            .select_related(
-                "part__manufacturer",
-                "part__default_storage",
-                "part__project",
-                "storage",
-                "lot"
-            )
-            .prefetch_related(
-                "storage__attachments",
-                "lot__attachments",
-                "part__attachments"
-            )
-            .all()
-        )
-
-        # Calculate total_stock for all parts at once (avoid N+1 queries)
-        part_ids = [stock.part_id for stock in stock_items if stock.part_id]
-        if part_ids:
-            part_totals = dict(
-                Stock.objects.filter(
-                    part_id__in=part_ids,
-                    status__isnull=True
-                )
-                .values('part_id')
-                .annotate(total=Sum('quantity'))
-                .values_list('part_id', 'total')
-            )
+        if include_descendants:
+            queryset = Stock.objects.filter(storage__path__startswith=location.path)
         else:
-            part_totals = {}
-
-        # Eagerly convert attachments to lists to avoid async context issues
-        # We replace the ManyRelatedManager with a list so Pydantic doesn't try to query it
-        for stock in stock_items:
-            if stock.storage:
-                attachments_list = list(stock.storage.attachments.all())
-                stock.storage.__dict__['attachments'] = attachments_list
-            if stock.lot:
-                attachments_list = list(stock.lot.attachments.all())
-                stock.lot.__dict__['attachments'] = attachments_list
-            if stock.part:
-                attachments_list = list(stock.part.attachments.all())
-                stock.part.__dict__['attachments'] = attachments_list
-                # Add total_stock from pre-calculated totals
-                stock.part.total_stock = part_totals.get(stock.part.id, 0)
-
-        return stock_items
-
-    stock = await _get_stock()
+            queryset = Stock.objects.filter(storage=location)
+
+        projection = STOCK_PROJECTION.select(parse_fields(fields), parse_fields(expand))
+        return projection.fetch(queryset.order_by(*BY_CREATED))
+
+    try:
+        stock = await _get_stock()
+    except ValueError as e:
+        args = e.args
+        raise HTTPException(status_code=args[1] if len(args) > 1 else 400, detail=args[0])
     if stock is None:
         raise HTTPException(status_code=404, detail="Storage location not found")
 
-    return stock
+    return projected_response(stock, response, fields, expand)
 
 
-@router.get("/stock/count", response_model=dict)
-async def count_stock():
-    count = await sync_to_async(_get_stock_queryset().count)()
-    return {"count": count}
+@router.get("/stock/count", response_model=dict, dependencies=[conditional_get("stock")])
+async def count_stock(estimate: bool = Query(False, description="Allow a planner estimate for large tables")):
+    total = await database_sync_to_async(count_total)(Stock.objects.all(), estimate=estimate)
+    return {"count": total.count, "estimated": total.estimated}
+
+
+@router.get("/stock/as-of", response_model=List[StockPositionSchema])
+async def get_stock_as_of(
+    at: datetime = Query(..., description="Point in time to reconstruct stock for"),
+    part_id: UUID = Query(None, description="Restrict to one part"),
+):
+    """Reconstruct stock positions at a past point in time from the movement ledger."""
+    return await database_sync_to_async(stock_as_of)(at, part_id=part_id)
+
+
+@router.get("/movements", response_model=List[StockMovementSchema], dependencies=[conditional_get("movements")])
+async def list_movements(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    part_id: UUID = Query(None, description="Filter by part"),
+    stock_id: UUID = Query(None, description="Filter by stock entry"),
+    since: datetime = Query(None, description="Only movements after this time"),
+):
+    """List stock movements from the ledger, newest first."""
+
+    @database_sync_to_async
+    def _list():
+        queryset = StockMovement.objects.order_by("-created_at", "-id")
+        if part_id:
+            queryset = queryset.filter(part_id=part_id)
+        if stock_id:
+            queryset = queryset.filter(stock_id=stock_id)
+        if since:
+            queryset = queryset.filter(created_at__gt=since)
+        return list(queryset[skip : skip + limit])
+
+    return await _list()
 
 
-@router.get("/stock/{stock_id}", response_model=StockSchema)
+@router.get("/stock/{stock_id}", response_model=StockSchema, dependencies=[conditional_get("stock")])
 async def get_stock(stock_id: UUID):
-    @sync_to_async
+    @database_sync_to_async
     def _get():
-        from django.db.models import Sum
-
         try:
             stock = _get_stock_queryset().get(id=stock_id)
         except Stock.DoesNotExist:
@@ -391,12 +468,7 @@ async def get_stock(stock_id: UUID):
             stock.lot.__dict__['attachments'] = list(stock.lot.attachments.all())
         if stock.part:
             stock.part.__dict__['attachments'] = list(stock.part.attachments.all())
-            # Calculate total_stock for this part
-            total = Stock.objects.filter(
-                part=stock.part,
-                status__isnull=True
-            ).aggregate(total=Sum('quantity'))['total'] or 0
-            stock.part.total_stock = total
+            stock.part.total_stock = stock.part_total_stock
 
         return stock
 
@@ -410,7 +482,7 @@ async def get_stock(stock_id: UUID):
 async def create_stock(data: StockCreate):
     """Create a new stock entry."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _create():
         # Validate part exists
         try:
@@ -432,8 +504,6 @@ async def create_stock(data: StockCreate):
             except Lot.DoesNotExist:
                 raise ValueError("Lot not found", 400)
 
-        from django.db.models import Sum
-
         stock_data = data.model_dump(exclude={"part_id", "storage_id", "lot_id"})
         stock = Stock.objects.create(part=part, storage=storage, lot=lot, **stock_data)
         stock = _get_stock_queryset().get(id=stock.id)
@@ -445,12 +515,7 @@ async def create_stock(data: StockCreate):
             stock.lot.__dict__['attachments'] = list(stock.lot.attachments.all())
         if stock.part:
             stock.part.__dict__['attachments'] = list(stock.part.attachments.all())
-            # Calculate total_stock
-            total = Stock.objects.filter(
-                part=stock.part,
-                status__isnull=True
-            ).aggregate(total=Sum('quantity'))['total'] or 0
-            stock.part.total_stock = total
+            stock.part.total_stock = stock.part_total_stock
 
         return stock
 
@@ -462,14 +527,60 @@ async def create_stock(data: StockCreate):
         raise HTTPException(status_code=args[1] if len(args) > 1 else 400, detail=args[0])
 
 
+@router.post("/stock/bulk", response_model=BulkStockImportResult)
+async def bulk_import_stock(
+    file: UploadFile = File(...),
+    dry_run: bool = Query(False, description="Validate every row without writing anything"),
+    format: str = Query(None, pattern="^(csv|ndjson)$", description="File format (default: from file name)"),
+):
+    """
+    Import stock entries from a CSV or NDJSON file.
+
+    Columns: part_id | part_mpn | part_name, storage_id | storage, lot_id | lot (optional),
+    quantity, status, price_unit, currency. Invalid rows are reported and skipped.
+    """
+    if format is None:
+        filename = (file.filename or "").lower()
+        is_ndjson = filename.endswith((".ndjson", ".jsonl")) or file.content_type in NDJSON_CONTENT_TYPES
+    else:
+        is_ndjson = format == "ndjson"
+    rows = iter_ndjson_rows(file.file) if is_ndjson else iter_csv_rows(file.file)
+
+    try:
+        return await database_sync_to_async(import_stock_rows)(rows, dry_run=dry_run)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    except csv.Error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV: {e}")
+
+
+@router.post("/stock/batch", response_model=List[StockBatchEntry])
+async def batch_update_stock(data: StockBatchRequest):
+    """
+    Apply many stock adjustments and moves in one transaction.
+
+    Operations run in order and either all apply or none do. A move without `quantity` relocates
+    the whole entry; a partial move splits it into a new entry at the destination.
+    """
+    try:
+        return await database_sync_to_async(apply_stock_batch)(
+            [operation.model_dump() for operation in data.operations], allow_negative=data.allow_negative
+        )
+    except ValueError as e:
+        args = e.args
+        raise HTTPException(status_code=args[1] if len(args) > 1 else 400, detail=args[0])
+
+
 @router.put("/stock/{stock_id}", response_model=StockSchema)
 async def update_stock(stock_id: UUID, data: StockUpdate):
     """Update a stock entry (adjust quantity, change status, etc.)."""
 
-    @sync_to_async
+    @database_sync_to_async
+    @transaction.atomic
     def _update():
+        # Lock the row so concurrent updates and batches can't interleave with this read-modify-write
         try:
-            stock = Stock.objects.get(id=stock_id)
+            stock = Stock.objects.select_for_update().get(id=stock_id)
         except Stock.DoesNotExist:
             raise ValueError("Stock entry not found", 404)
 
@@ -501,20 +612,13 @@ async def update_stock(stock_id: UUID, data: StockUpdate):
         stock = _get_stock_queryset().get(id=stock.id)
 
         # Eagerly convert attachments
-        from django.db.models import Sum
-
         if stock.storage:
             stock.storage.__dict__['attachments'] = list(stock.storage.attachments.all())
         if stock.lot:
             stock.lot.__dict__['attachments'] = list(stock.lot.attachments.all())
         if stock.part:
             stock.part.__dict__['attachments'] = list(stock.part.attachments.all())
-            # Calculate total_stock
-            total = Stock.objects.filter(
-                part=stock.part,
-                status__isnull=True
-            ).aggregate(total=Sum('quantity'))['total'] or 0
-            stock.part.total_stock = total
+            stock.part.total_stock = stock.part_total_stock
 
         return stock
 
@@ -530,7 +634,7 @@ async def update_stock(stock_id: UUID, data: StockUpdate):
 async def delete_stock(stock_id: UUID):
     """Delete a stock entry."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _delete():
         try:
             stock = Stock.objects.get(id=stock_id)
@@ -551,29 +655,42 @@ def _get_lot_queryset():
     return Lot.objects.prefetch_related("attachments").select_related("order")
 
 
-@router.get("/lots", response_model=List[LotSchema])
-async def list_lots(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
-    @sync_to_async
+@router.get("/lots", response_model=List[LotSchema], dependencies=[conditional_get("lots")])
+async def list_lots(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Cursor from the X-Next-Cursor header of the previous page (replaces skip)"),
+    total: bool = Query(False, description="Return the number of matching rows in the X-Total-Count header"),
+    estimate: bool = Query(False, description="Like total, but unfiltered large lists may use a planner estimate"),
+):
+    @database_sync_to_async
     def _list():
-        lots = list(_get_lot_queryset().all()[skip : skip + limit])
-        # Eagerly convert attachments to lists
-        for lot in lots:
-            lot.__dict__['attachments'] = list(lot.attachments.all())
-        return lots
+        rows, next_cursor, page_total = paginate(
+            LOT_PROJECTION.values(Lot.objects.all()),
+            BY_CREATED,
+            limit,
+            cursor=cursor,
+            skip=skip,
+            total=total,
+            estimate=estimate,
+        )
+        return LOT_PROJECTION.build(rows), next_cursor, page_total
 
-    lots = await _list()
+    lots, next_cursor, page_total = await _list()
+    set_page_headers(response, next_cursor, page_total)
     return lots
 
 
-@router.get("/lots/count", response_model=dict)
-async def count_lots():
-    count = await sync_to_async(_get_lot_queryset().count)()
-    return {"count": count}
+@router.get("/lots/count", response_model=dict, dependencies=[conditional_get("lots")])
+async def count_lots(estimate: bool = Query(False, description="Allow a planner estimate for large tables")):
+    total = await database_sync_to_async(count_total)(Lot.objects.all(), estimate=estimate)
+    return {"count": total.count, "estimated": total.estimated}
 
 
-@router.get("/lots/{lot_id}", response_model=LotSchema)
+@router.get("/lots/{lot_id}", response_model=LotSchema, dependencies=[conditional_get("lots")])
 async def get_lot(lot_id: UUID):
-    @sync_to_async
+    @database_sync_to_async
     def _get():
         try:
             lot = _get_lot_queryset().get(id=lot_id)
@@ -593,7 +710,7 @@ async def get_lot(lot_id: UUID):
 async def create_lot(data: LotCreate):
     """Create a new lot/batch."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _create():
         lot_data = data.model_dump(exclude={"order_id"})
 
@@ -623,7 +740,7 @@ async def create_lot(data: LotCreate):
 async def update_lot(lot_id: UUID, data: LotUpdate):
     """Update a lot/batch."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _update():
         try:
             lot = Lot.objects.get(id=lot_id)
@@ -661,56 +778,64 @@ async def update_lot(lot_id: UUID, data: LotUpdate):
         raise HTTPException(status_code=args[1] if len(args) > 1 else 400, detail=args[0])
 
 
-@router.get("/low-stock", response_model=List[LowStockAlert])
-async def get_low_stock_alerts():
-    @sync_to_async
+@router.get("/low-stock", response_model=List[LowStockAlert], dependencies=[conditional_get("parts")])
+async def get_low_stock_alerts(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    severity: str = Query(None, description="Filter by severity (comma-separated: critical, warning, ok)"),
+    changed_since: datetime = Query(
+        None, description="Only parts whose stock or threshold changed after this time (use X-Low-Stock-Cursor)"
+    ),
+):
+    """
+    List low-stock alerts, most depleted first.
+    The X-Low-Stock-Cursor response header holds the value to pass as changed_since on the next poll
+    (absent while no part has a low_stock_threshold).
+    """
+
+    @database_sync_to_async
     def _get_low_stock():
-        alerts = []
-        parts = Part.objects.filter(low_stock_threshold__isnull=False).prefetch_related("stock_entries")
-        for part in parts:
-            total_stock = part.stock_entries.aggregate(total=Sum("quantity"))["total"] or 0
-            if total_stock <= part.low_stock_threshold:
-                status = "Critical" if total_stock <= (part.low_stock_threshold * 0.5) else "Warning"
-                alerts.append(
-                    LowStockAlert(
-                        id=part.id,
-                        name=part.name,
-                        mpn=part.mpn or "",
-                        stock=total_stock,
-                        min=part.low_stock_threshold,
-                        status=status,
-                    )
-                )
-        return sorted(alerts, key=lambda x: x.stock)
-
-    return await _get_low_stock()
-
-
-@router.get("/occupancy", response_model=StorageOccupancySummary)
-async def get_storage_occupancy():
-    @sync_to_async
-    def _get_occupancy():
-        locations = list(Storage.objects.all())
-        total_locations = len(locations)
-        used_locations = 0
-        location_quantities = []
-
-        for location in locations:
-            total_items = location.stock_in_location.aggregate(total=Sum("quantity", default=0))["total"] or 0
-            if total_items > 0:
-                used_locations += 1
-            location_quantities.append((location.name, total_items))
-
-        top_locations = sorted(location_quantities, key=lambda x: x[1], reverse=True)[:5]
-        empty_locations = total_locations - used_locations
-        used_percentage = round((used_locations / total_locations * 100), 1) if total_locations > 0 else 0
-
-        return StorageOccupancySummary(
-            total_locations=total_locations,
-            used_locations=used_locations,
-            empty_locations=empty_locations,
-            used_percentage=used_percentage,
-            top_locations=[StorageOccupancyItem(name=name, quantity=qty) for name, qty in top_locations],
-        )
+        cursor = poll_cursor(changed_since)
+        queryset = low_stock_queryset(severities=parse_severities(severity), changed_since=changed_since)
+        rows = queryset.values("id", "name", "mpn", "stock", "low_stock_threshold", "severity")[skip : skip + limit]
+        alerts = [
+            LowStockAlert(
+                id=row["id"],
+                name=row["name"],
+                mpn=row["mpn"] or "",
+                stock=row["stock"],
+                min=row["low_stock_threshold"],
+                status=row["severity"],
+            )
+            for row in rows
+        ]
+        return alerts, cursor
 
-    return await _get_occupancy()
+    try:
+        alerts, cursor = await _get_low_stock()
+    except ValueError as e:
+        args = e.args
+        raise HTTPException(status_code=args[1] if len(args) > 1 else 400, detail=args[0])
+
+    if cursor is not None:
+        response.headers["X-Low-Stock-Cursor"] = cursor.isoformat()
+    return alerts
+
+
+@router.get("/occupancy", response_model=StorageOccupancySummary, dependencies=[conditional_get("stock")])
+async def get_storage_occupancy(
+    group_by: str = Query(None, pattern="^(parent|tag)$", description="Add a breakdown by parent location or tag"),
+):
+    occupancy = await database_sync_to_async(get_occupancy)()
+
+    summary = StorageOccupancySummary(
+        total_locations=occupancy["total_locations"],
+        used_locations=occupancy["used_locations"],
+        empty_locations=occupancy["empty_locations"],
+        used_percentage=occupancy["used_percentage"],
+        top_locations=[StorageOccupancyItem(**item) for item in occupancy["top_locations"]],
+    )
+    if group_by:
+        summary.breakdown = [StorageOccupancyGroup(**item) for item in occupancy[f"by_{group_by}"]]
+    return summary
@@ -13,6 +13,7 @@ class StorageCreate(BaseModel):
     """Schema for creating a storage location."""
     name: str
     description: Optional[str] = ""
+    parent_id: Optional[UUID] = None
     tags: List[str] = Field(default_factory=list)
     custom_fields: Dict[str, Any] = Field(default_factory=dict)
 
@@ -21,6 +22,7 @@ class StorageUpdate(BaseModel):
     """Schema for updating a storage location."""
     name: Optional[str] = None
     description: Optional[str] = None
+    parent_id: Optional[UUID] = None
     tags: Optional[List[str]] = None
     custom_fields: Optional[Dict[str, Any]] = None
 
@@ -30,9 +32,62 @@ class StorageUpdate(BaseModel):
 class StorageSchema(GlobalOpsSchema):
     name: str
     description: Optional[str] = ""
+    parent_id: Optional[UUID] = None
     attachments: Annotated[List[AttachmentSchema], BeforeValidator(convert_m2m_to_list)] = Field(default_factory=list)
 
 
+class BulkLocationCreate(BaseModel):
+    """Row (`range_*`) or grid (`row_range_*` x `col_range_*`) of locations to generate."""
+    mode: str = Field(pattern="^(row|grid)$")
+    prefix: str = ""
+    range_type: Optional[str] = Field(None, pattern="^(letters|numbers)$")
+    range_start: Optional[str] = None
+    range_end: Optional[str] = None
+    row_range_type: Optional[str] = Field(None, pattern="^(letters|numbers)$")
+    row_range_start: Optional[str] = None
+    row_range_end: Optional[str] = None
+    col_range_type: Optional[str] = Field(None, pattern="^(letters|numbers)$")
+    col_range_start: Optional[str] = None
+    col_range_end: Optional[str] = None
+    parent_id: Optional[UUID] = None
+    description: Optional[str] = ""
+    tags: List[str] = Field(default_factory=list)
+
+
+class BulkLocationItem(BaseModel):
+    id: UUID
+    name: str
+
+
+class BulkLocationResult(BaseModel):
+    dry_run: bool
+    count: int
+    names: List[str]
+    duplicates: List[str] = Field(default_factory=list)
+    conflicts: List[str] = Field(default_factory=list)
+    created: int
+    locations: List[BulkLocationItem] = Field(default_factory=list)
+
+
+class StorageSubtreeNode(BaseModel):
+    """A location in a subtree; `total_quantity` includes the stock of all its descendants."""
+    id: UUID
+    name: str
+    parent_id: Optional[UUID] = None
+    depth: int
+    quantity: int
+    stock_entries: int
+    total_quantity: int
+
+
+class StorageSubtree(BaseModel):
+    id: UUID
+    total_locations: int
+    used_locations: int
+    total_quantity: int
+    locations: List[StorageSubtreeNode]
+
+
 # --- Lot Schemas ---
 
 class LotCreate(BaseModel):
@@ -106,3 +161,69 @@ class StockSchema(GlobalOpsSchema):
     status: Optional[str] = None
     price_unit: Optional[float] = None
     currency: Optional[str] = ""
+
+
+
+class BulkStockRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class BulkStockImportResult(BaseModel):
+    """Outcome of a bulk stock import; `row` numbers are 1-based data rows."""
+    dry_run: bool
+    total_rows: int
+    valid_rows: int
+    created: int
+    failed: int
+    errors: List[BulkStockRowError] = Field(default_factory=list)
+
+class StockBatchOperation(BaseModel):
+    """One step of a batch: `adjust` adds `delta`; `move` relocates `quantity` (default: all) to `storage_id`."""
+    op: str = Field(pattern="^(adjust|move)$")
+    stock_id: UUID
+    delta: Optional[int] = None
+    storage_id: Optional[UUID] = None
+    quantity: Optional[int] = None
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class StockBatchRequest(BaseModel):
+    operations: List[StockBatchOperation] = Field(min_length=1, max_length=10000)
+    allow_negative: bool = False
+
+
+class StockBatchEntry(BaseModel):
+    """Resulting location and quantity of a stock entry touched (or created) by a batch."""
+    id: UUID
+    part_id: UUID
+    storage_id: UUID
+    quantity: int
+
+
+# --- Ledger Schemas ---
+
+class StockMovementSchema(BaseModel):
+    id: int
+    created_at: datetime
+    stock_id: UUID
+    part_id: UUID
+    storage_id: UUID
+    status: Optional[str] = None
+    currency: Optional[str] = ""
+    quantity_delta: int
+    value_delta: float
+    reason: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StockPositionSchema(BaseModel):
+    """Net stock for one (part, storage, status, currency) position at a point in time."""
+    part_id: UUID
+    storage_id: UUID
+    status: Optional[str] = None
+    currency: Optional[str] = ""
+    quantity: int
+    value: float
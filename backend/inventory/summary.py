@@ -0,0 +1,173 @@
+"""
+Incremental maintenance of the PartStockSummary read model.
+
+Stock writes go through Stock.save()/delete(), which fire the signal handlers below inside
+the same transaction, so the summary never drifts from the Stock table on committed data.
+Bulk paths that bypass signals (QuerySet.update, bulk_create) must call apply_stock_delta()
+or recount_parts() themselves. Changes to available stock also queue the part's search document,
+which carries total_stock.
+"""
+
+from typing import Dict, Iterable, List, Optional
+from django.db import transaction
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+from core.etag import bump_versions
+from core.search_outbox import enqueue
+from core.typesense import PartCollection
+from inventory.models import Stock, PartStockSummary
+
+StockStatus = Stock.StockStatus
+
+# Stock status -> PartStockSummary column. Statuses not listed are not counted anywhere.
+STATUS_BUCKETS: Dict[Optional[str], str] = {
+    None: "available",
+    StockStatus.AVAILABLE: "available",
+    StockStatus.RESERVED: "reserved",
+    StockStatus.ALLOCATED: "allocated",
+    StockStatus.ORDERED: "ordered",
+    StockStatus.BEING_ORDERED: "ordered",
+    StockStatus.IN_TRANSIT: "ordered",
+}
+
+SUMMARY_FIELDS = ("available", "reserved", "allocated", "ordered")
+
+
+def bucket_for_status(status: Optional[str]) -> Optional[str]:
+    """Return the summary column a stock status counts towards, or None."""
+    return STATUS_BUCKETS.get(status or None)
+
+
+def total_stock_expression(prefix: str = ""):
+    """
+    Expression reading a part's total_stock from PartStockSummary.
+    `prefix` is the lookup path to the part, e.g. "part__" when annotating Stock rows.
+    """
+    return Coalesce(F(f"{prefix}stock_summary__available"), Value(0))
+
+
+def _bucket_filter(bucket: str) -> Q:
+    statuses = [status for status, name in STATUS_BUCKETS.items() if name == bucket]
+    condition = Q(status__in=[s for s in statuses if s is not None])
+    if None in statuses:
+        condition |= Q(status__isnull=True)
+    return condition
+
+
+def apply_stock_delta(part_id, status: Optional[str], delta: int, create: bool = True):
+    """
+    Add `delta` to the summary column for `status` on `part_id`.
+    When `create` is False a missing summary row is left alone (used on delete, where the
+    part itself may be in the middle of being cascaded away).
+    """
+    bucket = bucket_for_status(status)
+    if bucket is None or not delta:
+        return
+
+    changes = {bucket: F(bucket) + delta, "updated_at": timezone.now()}
+    updated = PartStockSummary.objects.filter(part_id=part_id).update(**changes)
+    if not updated and create:
+        PartStockSummary.objects.get_or_create(part_id=part_id)
+        PartStockSummary.objects.filter(part_id=part_id).update(**changes)
+    bump_versions(PartStockSummary)
+    if bucket == "available":
+        enqueue(PartCollection.name, [part_id])
+
+
+def _aggregate_totals(part_ids: Optional[Iterable] = None) -> Dict:
+    """Compute summary totals from the Stock table in one grouped query."""
+    queryset = Stock.objects.all()
+    if part_ids is not None:
+        queryset = queryset.filter(part_id__in=list(part_ids))
+
+    annotations = {
+        bucket: Sum("quantity", filter=_bucket_filter(bucket), default=0) for bucket in SUMMARY_FIELDS
+    }
+    rows = queryset.values("part_id").order_by().annotate(**annotations)
+    return {row["part_id"]: {bucket: row[bucket] for bucket in SUMMARY_FIELDS} for row in rows}
+
+
+def recount_parts(part_ids: Iterable):
+    """Recompute summary rows for the given parts from the Stock table."""
+    part_ids = list(part_ids)
+    if not part_ids:
+        return
+
+    totals = _aggregate_totals(part_ids)
+    with transaction.atomic():
+        PartStockSummary.objects.filter(part_id__in=part_ids).exclude(part_id__in=list(totals)).delete()
+        PartStockSummary.objects.bulk_create(
+            [PartStockSummary(part_id=part_id, **values) for part_id, values in totals.items()],
+            update_conflicts=True,
+            unique_fields=["part"],
+            update_fields=[*SUMMARY_FIELDS, "updated_at"],
+        )
+        bump_versions(PartStockSummary)
+        enqueue(PartCollection.name, part_ids)
+
+
+def rebuild_summaries(batch_size: int = 1000) -> int:
+    """Rebuild the whole PartStockSummary table from Stock. Returns the number of rows written."""
+    totals = _aggregate_totals()
+    now = timezone.now()
+    with transaction.atomic():
+        previous = set(PartStockSummary.objects.values_list("part_id", flat=True))
+        PartStockSummary.objects.all().delete()
+        PartStockSummary.objects.bulk_create(
+            [PartStockSummary(part_id=part_id, updated_at=now, **values) for part_id, values in totals.items()],
+            batch_size=batch_size,
+        )
+        bump_versions(PartStockSummary)
+        enqueue(PartCollection.name, previous | set(totals))
+    return len(totals)
+
+
+def check_summaries() -> List[Dict]:
+    """
+    Compare PartStockSummary against the Stock table.
+    Returns one entry per inconsistent part with the expected and stored totals.
+    """
+    expected = _aggregate_totals()
+    stored = {
+        row["part_id"]: {bucket: row[bucket] for bucket in SUMMARY_FIELDS}
+        for row in PartStockSummary.objects.values("part_id", *SUMMARY_FIELDS)
+    }
+    empty = dict.fromkeys(SUMMARY_FIELDS, 0)
+
+    mismatches = []
+    for part_id in expected.keys() | stored.keys():
+        want = expected.get(part_id, empty)
+        have = stored.get(part_id, empty)
+        if want != have:
+            mismatches.append({"part_id": part_id, "expected": want, "stored": have})
+    return mismatches
+
+
+def _handle_stock_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_loaded_state", None)
+
+    if created:
+        apply_stock_delta(instance.part_id, instance.status, instance.quantity)
+    elif previous is None:
+        # Unknown prior state (deferred fields or an unloaded instance): recount from scratch.
+        recount_parts([instance.part_id])
+    else:
+        old_quantity = previous["quantity"] or 0
+        same_bucket = bucket_for_status(previous["status"]) == bucket_for_status(instance.status)
+        if previous["part_id"] == instance.part_id and same_bucket:
+            apply_stock_delta(instance.part_id, instance.status, instance.quantity - old_quantity)
+        else:
+            apply_stock_delta(previous["part_id"], previous["status"], -old_quantity)
+            apply_stock_delta(instance.part_id, instance.status, instance.quantity)
+
+
+def _handle_stock_delete(sender, instance, **kwargs):
+    previous = getattr(instance, "_loaded_state", None) or instance.tracked_state()
+    apply_stock_delta(previous["part_id"], previous["status"], -(previous["quantity"] or 0), create=False)
+
+
+def connect_signals():
+    post_save.connect(_handle_stock_save, sender=Stock, dispatch_uid="inventory.summary.stock_save")
+    post_delete.connect(_handle_stock_delete, sender=Stock, dispatch_uid="inventory.summary.stock_delete")
@@ -0,0 +1,201 @@
+"""
+Inventory valuation.
+
+Stock is valued as SUM(quantity * price_unit) per (currency, status). Stock without a unit price is
+worth nothing and stock without a currency is counted in INVENTORY_CURRENCY; values in different
+currencies are never added together.
+
+A StockValuation records the totals at the end of one day. The current valuation is the latest
+recorded day plus the movements since (about a day of ledger rows instead of the stock table), and
+the value history reads one recorded day per point. Days that have not been recorded yet are
+replayed from the movement ledger. `record_valuations()` (the valuate_stock command, run daily)
+records every finished day that is missing.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from inventory.ledger import positions_at
+from inventory.models import Stock, StockMovement, StockValuation, StockValuationLine
+
+# (currency, status) as stored: the currency may be blank
+Key = Tuple[str, Optional[str]]
+
+
+def _day_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def _stored_currencies(currency: str) -> List[str]:
+    """Currency codes stored for stock valued in `currency`."""
+    return [currency, ""] if currency == settings.INVENTORY_CURRENCY else [currency]
+
+
+def _add(totals: Dict[Key, List], rows):
+    for row in rows:
+        total = totals[(row["currency"] or "", row["status"] or None)]
+        total[0] += row["quantity"] or 0
+        total[1] += row["value"] or Decimal(0)
+
+
+def stock_totals() -> Dict[Key, List]:
+    """[quantity, value] per (currency, status), aggregated from the stock table."""
+    totals: Dict[Key, List] = defaultdict(lambda: [0, Decimal(0)])
+    _add(
+        totals,
+        Stock.objects.values("currency", "status")
+        .order_by()
+        # value first: once annotated, "quantity" refers to the aggregate
+        .annotate(value=Sum(F("quantity") * F("price_unit")), quantity=Sum("quantity")),
+    )
+    return totals
+
+
+def totals_at(at: Optional[datetime] = None) -> Dict[Key, List]:
+    """
+    [quantity, value] per (currency, status) at `at` (default: now): the latest recorded valuation
+    before it plus the movement tail. Without a recorded valuation, past points are replayed from
+    the ledger and the present is aggregated from the stock table.
+    """
+    valuation = StockValuation.objects.filter(taken_at__lte=at or timezone.now()).order_by("-taken_at").first()
+    if valuation is None:
+        if at is None:
+            return stock_totals()
+        totals: Dict[Key, List] = defaultdict(lambda: [0, Decimal(0)])
+        _add(
+            totals,
+            (
+                {"currency": currency, "status": status, "quantity": quantity, "value": value}
+                for (_, _, status, currency), (quantity, value) in positions_at(at).items()
+            ),
+        )
+        return totals
+
+    totals = defaultdict(lambda: [0, Decimal(0)])
+    _add(totals, valuation.lines.values("currency", "status", "quantity", "value"))
+    movements = StockMovement.objects.filter(created_at__gt=valuation.taken_at)
+    if at is not None:
+        movements = movements.filter(created_at__lte=at)
+    _add(
+        totals,
+        movements.values("currency", "status")
+        .order_by()
+        .annotate(quantity=Sum("quantity_delta"), value=Sum("value_delta")),
+    )
+    return totals
+
+
+def valuation(at: Optional[datetime] = None) -> List[Dict]:
+    """Non-zero totals at `at` (default: now) per currency and status, blank currencies resolved."""
+    merged: Dict[Key, List] = defaultdict(lambda: [0, Decimal(0)])
+    for (currency, status), (quantity, value) in totals_at(at).items():
+        total = merged[(currency or settings.INVENTORY_CURRENCY, status)]
+        total[0] += quantity
+        total[1] += value
+    lines = [
+        {"currency": currency, "status": status, "quantity": quantity, "value": value}
+        for (currency, status), (quantity, value) in merged.items()
+        if quantity or value
+    ]
+    return sorted(lines, key=lambda line: (line["currency"], line["status"] or ""))
+
+
+def record_valuation(day: date) -> StockValuation:
+    """Record (or re-record) the totals at the end of `day`."""
+    taken_at = _day_start(day + timedelta(days=1))
+    with transaction.atomic():
+        StockValuation.objects.filter(day=day).delete()
+        totals = totals_at(taken_at)
+        recorded = StockValuation.objects.create(day=day, taken_at=taken_at)
+        StockValuationLine.objects.bulk_create(
+            [
+                StockValuationLine(valuation=recorded, currency=currency, status=status, quantity=quantity, value=value)
+                for (currency, status), (quantity, value) in totals.items()
+                if quantity or value
+            ]
+        )
+    return recorded
+
+
+def record_valuations(now: Optional[datetime] = None, days: int = 90, lag: int = 300) -> List[StockValuation]:
+    """
+    Record every finished day after the latest recorded one, at most the last `days` days.
+    A day counts as finished `lag` seconds after midnight, so in-flight transactions have committed.
+    """
+    now = now or timezone.now()
+    last_day = timezone.localtime(now - timedelta(seconds=lag)).date() - timedelta(days=1)
+    day = last_day - timedelta(days=days - 1)
+
+    latest = StockValuation.objects.order_by("-day").values_list("day", flat=True).first()
+    if latest is not None:
+        day = max(day, latest + timedelta(days=1))
+    else:
+        first_movement = StockMovement.objects.order_by("created_at").values_list("created_at", flat=True).first()
+        if first_movement is None:
+            return []
+        day = max(day, timezone.localtime(first_movement).date())
+
+    recorded = []
+    while day <= last_day:
+        recorded.append(record_valuation(day))
+        day += timedelta(days=1)
+    return recorded
+
+
+def value_history(days: int = 7, currency: Optional[str] = None, now: Optional[datetime] = None) -> List[Decimal]:
+    """
+    Value in `currency` (default: INVENTORY_CURRENCY) at the end of each of the last `days` days,
+    oldest first; the last point is `now`. Recorded days are read from their valuation, the others
+    are replayed from the daily movements after the closest earlier point.
+    """
+    currency = currency or settings.INVENTORY_CURRENCY
+    currencies = _stored_currencies(currency)
+    now = now or timezone.now()
+    today = timezone.localtime(now).date()
+    first_day = today - timedelta(days=days - 1)
+
+    window = StockValuation.objects.filter(day__gte=first_day, day__lt=today, taken_at__lte=now)
+    recorded_days = set(window.values_list("day", flat=True))
+    recorded = dict(
+        StockValuationLine.objects.filter(valuation__day__in=recorded_days, currency__in=currencies)
+        .values("valuation__day")
+        .order_by()
+        .annotate(value=Sum("value"))
+        .values_list("valuation__day", "value")
+    )
+
+    replayed = [first_day + timedelta(days=offset) for offset in range(days)]
+    replayed = [day for day in replayed if day not in recorded_days]
+    daily = {}
+    if replayed:
+        daily = dict(
+            StockMovement.objects.filter(
+                created_at__gt=_day_start(replayed[0]), created_at__lte=now, currency__in=currencies
+            )
+            .annotate(day=TruncDate("created_at"))
+            .values("day")
+            .order_by()
+            .annotate(value=Sum("value_delta"))
+            .values_list("day", "value")
+        )
+
+    running = Decimal(0)
+    if first_day not in recorded_days:
+        opening = totals_at(_day_start(first_day))
+        running = sum((value for (code, _), (_, value) in opening.items() if code in currencies), Decimal(0))
+
+    history = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        if day in recorded_days:
+            running = recorded.get(day, Decimal(0))
+        else:
+            running += daily.get(day, Decimal(0))
+        history.append(running)
+    return history
@@ -1,10 +1,15 @@
 from fastapi import FastAPI
+from core.executor import database_sync_to_async, db_executor, pool_stats
+from core.reference_cache import CACHES as REFERENCE_CACHES
+from core.search_client import search_client
+from core.search_outbox import outbox_stats
 from parts.router import router as parts_router
 from inventory.router import router as inventory_router
 from projects.router import router as projects_router
 from procurement.router import router as procurement_router
 from core.router import router as core_router
 from dashboard.router import router as dashboard_router
+from search.backends import search
 from search.router import router as search_router
 
 app = FastAPI(title="MakerDB API", version="0.1.0")
@@ -21,3 +26,21 @@ app.include_router(search_router)
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/health/db")
+async def database_health():
+    return {
+        "executor": db_executor.stats(),
+        "pool": pool_stats(),
+        "reference_cache": {label: cache.stats() for label, cache in REFERENCE_CACHES.items()},
+    }
+
+
+@app.get("/health/search")
+async def search_health():
+    return {
+        "backend": search.stats(),
+        "client": search_client.stats(),
+        "outbox": await database_sync_to_async(outbox_stats)(),
+    }
@@ -3,6 +3,7 @@ ASGI config for makerdb project.
 """
 
 import os
+from contextlib import asynccontextmanager
 from django.core.asgi import get_asgi_application
 from fastapi import FastAPI
 
@@ -10,9 +11,36 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "makerdb.settings")
 
 django_app = get_asgi_application()
 
+from django.conf import settings
+from core import etag, reference_cache
+from core.executor import database_sync_to_async, db_executor
+from core.search_client import search_client
+from core.search_outbox import indexing_enabled, worker as search_outbox_worker
+from core.typesense import registry as search_registry
 from makerdb.api import app as fastapi_app
 
-application = FastAPI(openapi_url=None, docs_url=None, redoc_url=None)
+
+@asynccontextmanager
+async def lifespan(app):
+    if settings.SEARCH_BACKEND == "embedded":
+        from core.embedded_search import queue_unindexed_collections
+
+        # The embedded index lives in this process: build missing collections through the outbox
+        await database_sync_to_async(queue_unindexed_collections)()
+    # Before serving: listen() blocks until its LISTEN is in place
+    await database_sync_to_async(etag.start_listener)()
+    await database_sync_to_async(reference_cache.start_listener)()
+    if settings.SEARCH_OUTBOX_WORKER and indexing_enabled():
+        search_outbox_worker.start()
+    await search_client.start()
+    yield
+    await search_client.aclose()
+    search_outbox_worker.stop()
+    search_registry.close()
+    db_executor.shutdown()
+
+
+application = FastAPI(openapi_url=None, docs_url=None, redoc_url=None, lifespan=lifespan)
 
 application.mount("/api", fastapi_app)
 
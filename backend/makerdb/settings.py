@@ -37,6 +37,35 @@ DEBUG = env("DEBUG")
 
 # Typesense configuration
 TYPESENSE_API_KEY = env("TYPESENSE_API_KEY", default="secret")
+# Empty host: "typesense" when that name resolves (Docker), else "localhost"; resolved once per process
+TYPESENSE_HOST = env("TYPESENSE_HOST", default="")
+TYPESENSE_PORT = env.int("TYPESENSE_PORT", default=8108)
+TYPESENSE_PROTOCOL = env("TYPESENSE_PROTOCOL", default="http")
+# Shared Typesense client (core.search_client): seconds to connect and per request, retries after a
+# transport error, and pooled keep-alive connections with the seconds an idle one is kept
+TYPESENSE_CONNECT_TIMEOUT = env.float("TYPESENSE_CONNECT_TIMEOUT", default=2.0)
+TYPESENSE_TIMEOUT = env.float("TYPESENSE_TIMEOUT", default=5.0)
+TYPESENSE_RETRIES = env.int("TYPESENSE_RETRIES", default=2)
+TYPESENSE_MAX_CONNECTIONS = env.int("TYPESENSE_MAX_CONNECTIONS", default=20)
+TYPESENSE_KEEPALIVE_EXPIRY = env.float("TYPESENSE_KEEPALIVE_EXPIRY", default=30.0)
+
+# Search backend of the /search endpoints (search.backends): "typesense", "postgres" or "embedded".
+# With the fallback, Postgres answers while Typesense is unreachable, which is then skipped for the cooldown.
+SEARCH_BACKEND = env("SEARCH_BACKEND", default="typesense")
+SEARCH_FALLBACK = env.bool("SEARCH_FALLBACK", default=True)
+SEARCH_FALLBACK_COOLDOWN = env.float("SEARCH_FALLBACK_COOLDOWN", default=30.0)
+
+# Embedded search engine (core.embedded_search): directory of its index files, and the number of
+# journaled changes after which a collection is written to a new snapshot
+SEARCH_EMBEDDED_PATH = env("SEARCH_EMBEDDED_PATH", default=str(BASE_DIR / "search_index"))
+SEARCH_EMBEDDED_COMPACT_OPS = env.int("SEARCH_EMBEDDED_COMPACT_OPS", default=10000)
+
+# Search outbox (core.search_outbox): run the indexing worker in the API process, rows per
+# documents.import_ batch, seconds between polls when idle, and the longest retry backoff
+SEARCH_OUTBOX_WORKER = env.bool("SEARCH_OUTBOX_WORKER", default=True)
+SEARCH_OUTBOX_BATCH_SIZE = env.int("SEARCH_OUTBOX_BATCH_SIZE", default=500)
+SEARCH_OUTBOX_POLL_INTERVAL = env.float("SEARCH_OUTBOX_POLL_INTERVAL", default=1.0)
+SEARCH_OUTBOX_MAX_BACKOFF = env.int("SEARCH_OUTBOX_MAX_BACKOFF", default=300)
 
 ALLOWED_HOSTS = []
 
@@ -51,6 +80,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_extensions",
     # Local Apps
     "core",
@@ -101,6 +131,52 @@ ASGI_APPLICATION = "makerdb.asgi.application"
 DATABASES = {
     "default": env.db(),
 }
+# Check connections before use: a pre-ping when handed out by the pool, or on reuse without it
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# psycopg 3 connection pool, shared by every thread of the process. Connections are replaced
+# after DB_POOL_MAX_LIFETIME seconds, or DB_POOL_MAX_IDLE seconds unused above the minimum size.
+DB_POOL = env.bool("DB_POOL", default=True)
+DB_POOL_MAX_SIZE = env.int("DB_POOL_MAX_SIZE", default=10)
+if DB_POOL:
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": env.int("DB_POOL_MIN_SIZE", default=2),
+        "max_size": DB_POOL_MAX_SIZE,
+        "max_lifetime": env.float("DB_POOL_MAX_LIFETIME", default=3600.0),
+        "max_idle": env.float("DB_POOL_MAX_IDLE", default=600.0),
+        "timeout": env.float("DB_POOL_TIMEOUT", default=30.0),
+    }
+else:
+    # Keep each thread's connection open between calls instead of reconnecting every time
+    DATABASES["default"]["CONN_MAX_AGE"] = env.int("DB_CONN_MAX_AGE", default=60)
+
+# Threads the API runs ORM work on (see core.executor), sized to the connection pool
+DB_EXECUTOR_WORKERS = env.int("DB_EXECUTOR_WORKERS", default=DB_POOL_MAX_SIZE)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
+# Rows kept per model by the in-process reference data cache (core.reference_cache), and whether
+# to LISTEN for invalidations from other processes
+REFERENCE_CACHE_SIZE = env.int("REFERENCE_CACHE_SIZE", default=1000)
+REFERENCE_CACHE_LISTEN = env.bool("REFERENCE_CACHE_LISTEN", default=True)
+
+# Bump ETag versions (core.etag) on writes from other processes, notified through Postgres LISTEN
+ETAG_LISTEN = env.bool("ETAG_LISTEN", default=True)
+
+# Seconds a computed storage occupancy summary may be served from cache
+INVENTORY_OCCUPANCY_CACHE_TTL = env.int("INVENTORY_OCCUPANCY_CACHE_TTL", default=300)
+
+# Seconds a computed dashboard overview may be served from cache (it is also replaced on any change)
+DASHBOARD_CACHE_TTL = env.int("DASHBOARD_CACHE_TTL", default=30)
+
+# ISO code the dashboard reports inventory value in; stock without a currency is counted in it
+INVENTORY_CURRENCY = env("INVENTORY_CURRENCY", default="USD")
 
 
 # Password validation
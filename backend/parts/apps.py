@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class PartsConfig(AppConfig):
     name = "parts"
+
+    def ready(self):
+        from core.typesense import PartCollection
+        from parts.models import Part
+
+        collection = PartCollection()
+        collection.register(Part)
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-17 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parts', '0006_part_designator'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='part',
+            index=models.Index(condition=models.Q(('low_stock_threshold__isnull', False)), fields=['low_stock_threshold'], name='part_low_stock_idx'),
+        ),
+    ]
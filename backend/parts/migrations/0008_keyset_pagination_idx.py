@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-17 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parts', '0007_part_low_stock_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='part',
+            index=models.Index(fields=['name', 'id'], name='part_name_id_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parts', '0009_part_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='part',
+            index=models.Index(fields=['updated_at'], name='part_updated_at_idx'),
+        ),
+    ]
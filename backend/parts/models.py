@@ -1,6 +1,8 @@
 from django.db import models
 from django.db.models import Sum
+from django.contrib.postgres.indexes import GinIndex
 from core.models import GlobalOpsBase, Attachment
+from core.search_indexes import search_vector_field, trigram_index
 
 
 class Designator(GlobalOpsBase):
@@ -75,5 +77,26 @@ class Part(GlobalOpsBase):
 
     attachments = models.ManyToManyField(Attachment, blank=True, related_name="parts")
 
+    # Full-text search (see core.search_indexes)
+    search_vector = search_vector_field(name="A", mpn="A", description="B", footprint="C")
+
+    class Meta(GlobalOpsBase.Meta):
+        indexes = [
+            # Low-stock alerts only ever scan parts that have a threshold.
+            models.Index(
+                fields=["low_stock_threshold"],
+                condition=models.Q(low_stock_threshold__isnull=False),
+                name="part_low_stock_idx",
+            ),
+            # Keyset pagination order (core.pagination.BY_NAME)
+            models.Index(fields=["name", "id"], name="part_name_id_idx"),
+            # Incremental search syncs (sync_typesense --since)
+            models.Index(fields=["updated_at"], name="part_updated_at_idx"),
+            GinIndex(fields=["search_vector"], name="part_search_vector_idx"),
+            trigram_index("name", "part_name_trgm_idx"),
+            trigram_index("mpn", "part_mpn_trgm_idx"),
+            trigram_index("description", "part_description_trgm_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.name} ({self.mpn})" if self.mpn else self.name
@@ -0,0 +1,17 @@
+"""Projections (see core.projection) for part responses."""
+
+from core.models import Company
+from core.projection import Projection
+from core.schemas import CompanySchema
+from inventory.summary import total_stock_expression
+from parts.models import Part
+from parts.schemas import PartSchema
+
+COMPANY_PROJECTION = Projection.for_schema(Company, CompanySchema)
+
+PART_PROJECTION = Projection.for_schema(
+    Part,
+    PartSchema,
+    related={"manufacturer": COMPANY_PROJECTION},
+    annotations={"total_stock": total_stock_expression},
+)
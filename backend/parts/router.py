@@ -1,8 +1,9 @@
 from typing import List, Optional
-from django.db.models import Sum, Q
-from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from django.db.models import Q
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Response
 from uuid import UUID
 from parts.models import Part, Designator
+from parts.projections import PART_PROJECTION
 from parts.schemas import (
     PartSchema,
     PartCreate,
@@ -12,57 +13,71 @@ from parts.schemas import (
     DesignatorCreate,
     DesignatorUpdate,
 )
-from core.models import Company, Attachment
-from inventory.models import Storage
+from core.models import Attachment
+from core.etag import conditional_get
+from core.reference_cache import companies, designators, storage_locations
+from core.pagination import BY_NAME, count_total, paginate, set_page_headers
+from core.projection import parse_fields, projected_response
+from inventory.summary import total_stock_expression
 from projects.models import Project
-from asgiref.sync import sync_to_async
+from core.executor import database_sync_to_async
 
 router = APIRouter(prefix="/parts", tags=["Parts"])
 
 
 def _get_part_queryset():
-    from django.db.models import Sum, Q
-
     return (
         Part.objects.select_related("manufacturer", "default_storage")
         .prefetch_related("attachments")
-        .annotate(total_stock=Sum("stock_entries__quantity", filter=Q(stock_entries__status__isnull=True)))
+        .annotate(total_stock=total_stock_expression())
     )
 
 
-@router.get("/", response_model=List[PartSchema])
+@router.get("/", response_model=List[PartSchema], dependencies=[conditional_get("parts")])
 async def list_parts(
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    cursor: str = Query(None, description="Cursor from the X-Next-Cursor header of the previous page (replaces skip)"),
+    total: bool = Query(False, description="Return the number of matching rows in the X-Total-Count header"),
+    estimate: bool = Query(False, description="Like total, but unfiltered large lists may use a planner estimate"),
     search: str = Query(None, description="Search term for filtering parts"),
+    fields: str = Query(None, description="Comma-separated fields to return, dotted for nested ones (e.g. part.name)"),
+    expand: str = Query(None, description="Comma-separated relations to embed; others are returned as <name>_id"),
 ):
     """
     List parts with pagination and optional search support.
     """
-    @sync_to_async
+    @database_sync_to_async
     def _list():
-        queryset = _get_part_queryset()
+        queryset = Part.objects.all()
 
         if search:
             queryset = queryset.filter(
                 Q(name__icontains=search) | Q(mpn__icontains=search) | Q(description__icontains=search)
             )
 
-        parts = list(queryset.all()[skip : skip + limit])
-        # Eagerly convert attachments to lists
-        for part in parts:
-            part.__dict__['attachments'] = list(part.attachments.all())
-        return parts
+        projection = PART_PROJECTION.select(parse_fields(fields), parse_fields(expand), keep=BY_NAME)
+        rows, next_cursor, page_total = paginate(
+            projection.values(queryset), BY_NAME, limit, cursor=cursor, skip=skip, total=total, estimate=estimate
+        )
+        return projection.build(rows), next_cursor, page_total
 
-    return await _list()
+    try:
+        parts, next_cursor, page_total = await _list()
+    except ValueError as e:
+        args = e.args
+        raise HTTPException(status_code=args[1] if len(args) > 1 else 400, detail=args[0])
+    set_page_headers(response, next_cursor, page_total)
+    return projected_response(parts, response, fields, expand)
 
 
-@router.get("/search", response_model=List[PartSchema])
+@router.get("/search", response_model=List[PartSchema], dependencies=[conditional_get("parts")])
 async def search_parts(q: str = Query(..., min_length=1, description="Search query")):
     """
     Search parts by name, MPN, or description.
     """
-    @sync_to_async
+    @database_sync_to_async
     def _search():
         parts = list(
             _get_part_queryset().filter(Q(name__icontains=q) | Q(mpn__icontains=q) | Q(description__icontains=q))[:20]
@@ -75,18 +90,18 @@ async def search_parts(q: str = Query(..., min_length=1, description="Search que
     return await _search()
 
 
-@router.get("/count", response_model=dict)
-async def count_parts():
+@router.get("/count", response_model=dict, dependencies=[conditional_get("parts")])
+async def count_parts(estimate: bool = Query(False, description="Allow a planner estimate for large tables")):
     """
     Get total count of parts.
     """
-    count = await sync_to_async(_get_part_queryset().count)()
-    return {"count": count}
+    total = await database_sync_to_async(count_total)(Part.objects.all(), estimate=estimate)
+    return {"count": total.count, "estimated": total.estimated}
 
 
-@router.get("/{part_id}", response_model=PartSchema)
+@router.get("/{part_id}", response_model=PartSchema, dependencies=[conditional_get("parts")])
 async def get_part(part_id: UUID):
-    @sync_to_async
+    @database_sync_to_async
     def _get():
         try:
             part = _get_part_queryset().get(id=part_id)
@@ -106,21 +121,19 @@ async def get_part(part_id: UUID):
 async def create_part(data: PartCreate):
     """Create a new part."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _create():
         part_data = data.model_dump(exclude={"manufacturer_id", "default_storage_id", "project_id"})
         part = Part(**part_data)
 
         if data.manufacturer_id:
-            try:
-                part.manufacturer = Company.objects.get(id=data.manufacturer_id, is_manufacturer=True)
-            except Company.DoesNotExist:
+            part.manufacturer = companies.get(id=data.manufacturer_id, is_manufacturer=True)
+            if part.manufacturer is None:
                 raise ValueError("Manufacturer not found")
 
         if data.default_storage_id:
-            try:
-                part.default_storage = Storage.objects.get(id=data.default_storage_id)
-            except Storage.DoesNotExist:
+            part.default_storage = storage_locations.get(id=data.default_storage_id)
+            if part.default_storage is None:
                 raise ValueError("Storage location not found")
 
         if data.project_id:
@@ -146,7 +159,7 @@ async def create_part(data: PartCreate):
 async def update_part(part_id: UUID, data: PartUpdate):
     """Update an existing part."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _update():
         try:
             part = Part.objects.get(id=part_id)
@@ -161,9 +174,8 @@ async def update_part(part_id: UUID, data: PartUpdate):
             if mfr_id is None:
                 part.manufacturer = None
             else:
-                try:
-                    part.manufacturer = Company.objects.get(id=mfr_id, is_manufacturer=True)
-                except Company.DoesNotExist:
+                part.manufacturer = companies.get(id=mfr_id, is_manufacturer=True)
+                if part.manufacturer is None:
                     raise ValueError("Manufacturer not found", 400)
 
         if "default_storage_id" in update_data:
@@ -171,9 +183,8 @@ async def update_part(part_id: UUID, data: PartUpdate):
             if storage_id is None:
                 part.default_storage = None
             else:
-                try:
-                    part.default_storage = Storage.objects.get(id=storage_id)
-                except Storage.DoesNotExist:
+                part.default_storage = storage_locations.get(id=storage_id)
+                if part.default_storage is None:
                     raise ValueError("Storage location not found", 400)
 
         if "project_id" in update_data:
@@ -210,7 +221,7 @@ async def update_part(part_id: UUID, data: PartUpdate):
 async def delete_part(part_id: UUID):
     """Delete a part."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _delete():
         try:
             part = Part.objects.get(id=part_id)
@@ -231,7 +242,7 @@ async def delete_part(part_id: UUID):
 async def upload_attachment(part_id: UUID, file: UploadFile = File(...)):
     """Upload an attachment to a part."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _upload():
         try:
             part = Part.objects.get(id=part_id)
@@ -268,7 +279,7 @@ async def upload_attachment(part_id: UUID, file: UploadFile = File(...)):
 async def remove_attachment(part_id: UUID, attachment_id: UUID):
     """Remove an attachment from a part."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _remove():
         try:
             part = Part.objects.get(id=part_id)
@@ -299,7 +310,7 @@ async def remove_attachment(part_id: UUID, attachment_id: UUID):
 async def add_tags(part_id: UUID, data: TagsInput):
     """Add tags to a part."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _add_tags():
         try:
             part = Part.objects.get(id=part_id)
@@ -325,7 +336,7 @@ async def add_tags(part_id: UUID, data: TagsInput):
 async def remove_tag(part_id: UUID, tag: str):
     """Remove a tag from a part."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _remove_tag():
         try:
             part = Part.objects.get(id=part_id)
@@ -352,28 +363,28 @@ async def remove_tag(part_id: UUID, tag: str):
 designator_router = APIRouter(prefix="/designators", tags=["Designators"])
 
 
-@designator_router.get("/", response_model=List[DesignatorSchema])
+@designator_router.get("/", response_model=List[DesignatorSchema], dependencies=[conditional_get("designators")])
 async def list_designators():
     """List all designators."""
-    designators = await sync_to_async(list)(Designator.objects.all())
-    return designators
+    return await database_sync_to_async(designators.all)()
 
 
-@designator_router.get("/{designator_id}", response_model=DesignatorSchema)
+@designator_router.get(
+    "/{designator_id}", response_model=DesignatorSchema, dependencies=[conditional_get("designators")]
+)
 async def get_designator(designator_id: UUID):
     """Get a single designator by ID."""
-    try:
-        designator = await sync_to_async(Designator.objects.get)(id=designator_id)
-        return designator
-    except Designator.DoesNotExist:
+    designator = await database_sync_to_async(designators.get)(id=designator_id)
+    if designator is None:
         raise HTTPException(status_code=404, detail="Designator not found")
+    return designator
 
 
 @designator_router.post("/", response_model=DesignatorSchema, status_code=201)
 async def create_designator(data: DesignatorCreate):
     """Create a new designator."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _create():
         if Designator.objects.filter(code=data.code).exists():
             raise ValueError("Designator with this code already exists")
@@ -391,7 +402,7 @@ async def create_designator(data: DesignatorCreate):
 async def update_designator(designator_id: UUID, data: DesignatorUpdate):
     """Update a designator."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _update():
         try:
             designator = Designator.objects.get(id=designator_id)
@@ -418,7 +429,7 @@ async def update_designator(designator_id: UUID, data: DesignatorUpdate):
 async def delete_designator(designator_id: UUID):
     """Delete a designator."""
 
-    @sync_to_async
+    @database_sync_to_async
     def _delete():
         try:
             designator = Designator.objects.get(id=designator_id)
@@ -29,7 +29,13 @@ class Order(GlobalOpsBase):
     status = models.CharField(max_length=20, choices=OrderStatus.choices, default=OrderStatus.OPEN)
     
     attachments = models.ManyToManyField(Attachment, blank=True, related_name="orders")
-    
+
+    class Meta(GlobalOpsBase.Meta):
+        indexes = [
+            # Keyset pagination order (core.pagination.BY_CREATED)
+            models.Index(fields=["created_at", "id"], name="order_created_id_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.vendor.name} #{self.number}"
 
@@ -84,5 +90,11 @@ class Offer(GlobalOpsBase):
 
     attachments = models.ManyToManyField(Attachment, blank=True, related_name="offers")
 
+    class Meta(GlobalOpsBase.Meta):
+        indexes = [
+            # Keyset pagination order (core.pagination.BY_CREATED)
+            models.Index(fields=["created_at", "id"], name="offer_created_id_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.vendor.name}: {self.sku}" if self.vendor else f"Unknown Vendor: {self.sku}"
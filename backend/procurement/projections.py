@@ -0,0 +1,12 @@
+"""Projections (see core.projection) for procurement responses."""
+
+from core.projection import Projection
+from parts.projections import COMPANY_PROJECTION, PART_PROJECTION
+from procurement.models import Offer
+from procurement.schemas import OfferSchema
+
+OFFER_PROJECTION = Projection.for_schema(
+    Offer,
+    OfferSchema,
+    related={"vendor": COMPANY_PROJECTION, "part": PART_PROJECTION},
+)
@@ -1,47 +1,85 @@
 from typing import List
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from uuid import UUID
+from core.etag import conditional_get
+from core.pagination import BY_CREATED, count_total, paginate, set_page_headers
+from core.projection import parse_fields, projected_response
 from procurement.models import Order, Offer
+from procurement.projections import OFFER_PROJECTION
 from procurement.schemas import OrderSchema, OfferSchema
-from asgiref.sync import sync_to_async
+from core.executor import database_sync_to_async
 
 router = APIRouter(prefix="/procurement", tags=["Procurement"])
 
 
-@router.get("/orders", response_model=List[OrderSchema])
-async def list_orders(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
-    orders = await sync_to_async(list)(
-        Order.objects.select_related("vendor").prefetch_related("attachments").all()[skip : skip + limit]
+@router.get("/orders", response_model=List[OrderSchema], dependencies=[conditional_get("orders")])
+async def list_orders(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Cursor from the X-Next-Cursor header of the previous page (replaces skip)"),
+    total: bool = Query(False, description="Return the number of matching rows in the X-Total-Count header"),
+    estimate: bool = Query(False, description="Like total, but unfiltered large lists may use a planner estimate"),
+):
+    orders, next_cursor, page_total = await database_sync_to_async(paginate)(
+        Order.objects.select_related("vendor").prefetch_related("attachments"),
+        BY_CREATED,
+        limit,
+        cursor=cursor,
+        skip=skip,
+        total=total,
+        estimate=estimate,
     )
+    set_page_headers(response, next_cursor, page_total)
     return orders
 
 
-@router.get("/orders/count", response_model=dict)
-async def count_orders():
-    count = await sync_to_async(Order.objects.count)()
-    return {"count": count}
+@router.get("/orders/count", response_model=dict, dependencies=[conditional_get("orders")])
+async def count_orders(estimate: bool = Query(False, description="Allow a planner estimate for large tables")):
+    total = await database_sync_to_async(count_total)(Order.objects.all(), estimate=estimate)
+    return {"count": total.count, "estimated": total.estimated}
 
 
-@router.get("/orders/{order_id}", response_model=OrderSchema)
+@router.get("/orders/{order_id}", response_model=OrderSchema, dependencies=[conditional_get("orders")])
 async def get_order(order_id: UUID):
     try:
-        order = await sync_to_async(Order.objects.select_related("vendor").prefetch_related("attachments").get)(
-            id=order_id
-        )
+        queryset = Order.objects.select_related("vendor").prefetch_related("attachments")
+        order = await database_sync_to_async(queryset.get)(id=order_id)
         return order
     except Order.DoesNotExist:
         raise HTTPException(status_code=404, detail="Order not found")
 
 
-@router.get("/offers", response_model=List[OfferSchema])
-async def list_offers(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
-    offers = await sync_to_async(list)(
-        Offer.objects.select_related("vendor", "part").prefetch_related("attachments").all()[skip : skip + limit]
-    )
-    return offers
+@router.get("/offers", response_model=List[OfferSchema], dependencies=[conditional_get("offers")])
+async def list_offers(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Cursor from the X-Next-Cursor header of the previous page (replaces skip)"),
+    total: bool = Query(False, description="Return the number of matching rows in the X-Total-Count header"),
+    estimate: bool = Query(False, description="Like total, but unfiltered large lists may use a planner estimate"),
+    fields: str = Query(None, description="Comma-separated fields to return, dotted for nested ones (e.g. part.name)"),
+    expand: str = Query(None, description="Comma-separated relations to embed; others are returned as <name>_id"),
+):
+    @database_sync_to_async
+    def _list():
+        projection = OFFER_PROJECTION.select(parse_fields(fields), parse_fields(expand), keep=BY_CREATED)
+        queryset = projection.values(Offer.objects.all())
+        rows, next_cursor, page_total = paginate(
+            queryset, BY_CREATED, limit, cursor=cursor, skip=skip, total=total, estimate=estimate
+        )
+        return projection.build(rows), next_cursor, page_total
+
+    try:
+        offers, next_cursor, page_total = await _list()
+    except ValueError as e:
+        args = e.args
+        raise HTTPException(status_code=args[1] if len(args) > 1 else 400, detail=args[0])
+    set_page_headers(response, next_cursor, page_total)
+    return projected_response(offers, response, fields, expand)
 
 
-@router.get("/offers/count", response_model=dict)
+@router.get("/offers/count", response_model=dict, dependencies=[conditional_get("offers")])
 async def count_offers():
-    count = await sync_to_async(Offer.objects.count)()
+    count = await database_sync_to_async(Offer.objects.count)()
     return {"count": count}
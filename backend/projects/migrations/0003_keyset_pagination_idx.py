@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-17 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_revision_project_status_bomitem'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bomitem',
+            index=models.Index(fields=['project', 'created_at', 'id'], name='bomitem_project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['name', 'id'], name='project_name_id_idx'),
+        ),
+    ]
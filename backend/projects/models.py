@@ -19,6 +19,12 @@ class Project(GlobalOpsBase):
     
     attachments = models.ManyToManyField(Attachment, blank=True, related_name="projects")
 
+    class Meta(GlobalOpsBase.Meta):
+        indexes = [
+            # Keyset pagination order (core.pagination.BY_NAME)
+            models.Index(fields=["name", "id"], name="project_name_id_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.name} (Rev {self.revision})"
 
@@ -38,6 +44,10 @@ class BOMItem(GlobalOpsBase):
     class Meta(GlobalOpsBase.Meta):
         verbose_name = "BOM Item"
         verbose_name_plural = "BOM Items"
+        indexes = [
+            # BOM listing: one project's items in keyset pagination order (core.pagination.BY_CREATED)
+            models.Index(fields=["project", "created_at", "id"], name="bomitem_project_created_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.part.name} (x{self.quantity}) for {self.project.name}"
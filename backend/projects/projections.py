@@ -0,0 +1,13 @@
+"""Projections (see core.projection) for project responses."""
+
+from core.projection import Projection
+from parts.projections import PART_PROJECTION
+from projects.models import BOMItem
+from projects.schemas import BOMItemSchema
+
+BOM_ITEM_PROJECTION = Projection.for_schema(
+    BOMItem,
+    BOMItemSchema,
+    related={"part": PART_PROJECTION},
+    many={"substitutes": PART_PROJECTION},
+)
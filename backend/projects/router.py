@@ -1,9 +1,13 @@
 from typing import List
 import csv
 import io
-from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Response
 from uuid import UUID
+from core.etag import conditional_get
+from core.pagination import BY_CREATED, BY_NAME, paginate, set_page_headers
+from core.projection import parse_fields, projected_response
 from projects.models import Project, BOMItem
+from projects.projections import BOM_ITEM_PROJECTION
 from projects.schemas import (
     ProjectSchema,
     ProjectCreate,
@@ -15,30 +19,57 @@ from projects.schemas import (
     BOMMatchResult,
 )
 from parts.models import Part
-from asgiref.sync import sync_to_async
+from inventory.summary import total_stock_expression
+from django.db.models import Prefetch
+from core.executor import database_sync_to_async
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
 
-@router.get("/", response_model=List[ProjectSchema])
+def _get_bom_queryset():
+    part_queryset = (
+        Part.objects.select_related("manufacturer")
+        .prefetch_related("attachments")
+        .annotate(total_stock=total_stock_expression())
+    )
+    return BOMItem.objects.prefetch_related(
+        Prefetch("part", queryset=part_queryset),
+        Prefetch("substitutes", queryset=part_queryset),
+    )
+
+
+@router.get("/", response_model=List[ProjectSchema], dependencies=[conditional_get("projects")])
 async def list_projects(
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    cursor: str = Query(None, description="Cursor from the X-Next-Cursor header of the previous page (replaces skip)"),
+    total: bool = Query(False, description="Return the number of matching rows in the X-Total-Count header"),
+    estimate: bool = Query(False, description="Like total, but unfiltered large lists may use a planner estimate"),
 ):
-    projects = await sync_to_async(list)(Project.objects.prefetch_related("attachments").all()[skip : skip + limit])
+    projects, next_cursor, page_total = await database_sync_to_async(paginate)(
+        Project.objects.prefetch_related("attachments"),
+        BY_NAME,
+        limit,
+        cursor=cursor,
+        skip=skip,
+        total=total,
+        estimate=estimate,
+    )
+    set_page_headers(response, next_cursor, page_total)
     return projects
 
 
-@router.get("/count", response_model=dict)
+@router.get("/count", response_model=dict, dependencies=[conditional_get("projects")])
 async def count_projects():
-    count = await sync_to_async(Project.objects.count)()
+    count = await database_sync_to_async(Project.objects.count)()
     return {"count": count}
 
 
-@router.get("/{project_id}", response_model=ProjectSchema)
+@router.get("/{project_id}", response_model=ProjectSchema, dependencies=[conditional_get("projects")])
 async def get_project(project_id: UUID):
     try:
-        project = await sync_to_async(Project.objects.prefetch_related("attachments").get)(id=project_id)
+        project = await database_sync_to_async(Project.objects.prefetch_related("attachments").get)(id=project_id)
         return project
     except Project.DoesNotExist:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -47,8 +78,8 @@ async def get_project(project_id: UUID):
 @router.post("/", response_model=ProjectSchema, status_code=201)
 async def create_project(data: ProjectCreate):
     try:
-        project = await sync_to_async(lambda: Project.objects.create(**data.model_dump()))()
-        project = await sync_to_async(lambda: Project.objects.prefetch_related("attachments").get(id=project.id))()
+        project = await database_sync_to_async(lambda: Project.objects.create(**data.model_dump()))()
+        project = await database_sync_to_async(Project.objects.prefetch_related("attachments").get)(id=project.id)
         return project
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -57,7 +88,7 @@ async def create_project(data: ProjectCreate):
 @router.put("/{project_id}", response_model=ProjectSchema)
 async def update_project(project_id: UUID, data: ProjectUpdate):
     try:
-        project = await sync_to_async(Project.objects.get)(id=project_id)
+        project = await database_sync_to_async(Project.objects.get)(id=project_id)
     except Project.DoesNotExist:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -65,44 +96,63 @@ async def update_project(project_id: UUID, data: ProjectUpdate):
     for field, value in update_data.items():
         setattr(project, field, value)
 
-    await sync_to_async(project.save)()
-    project = await sync_to_async(Project.objects.prefetch_related("attachments").get)(id=project_id)
+    await database_sync_to_async(project.save)()
+    project = await database_sync_to_async(Project.objects.prefetch_related("attachments").get)(id=project_id)
     return project
 
 
 @router.delete("/{project_id}", status_code=204)
 async def delete_project(project_id: UUID):
     try:
-        project = await sync_to_async(Project.objects.get)(id=project_id)
-        await sync_to_async(project.delete)()
+        project = await database_sync_to_async(Project.objects.get)(id=project_id)
+        await database_sync_to_async(project.delete)()
     except Project.DoesNotExist:
         raise HTTPException(status_code=404, detail="Project not found")
 
 
-@router.get("/{project_id}/bom", response_model=List[BOMItemSchema])
-async def list_bom_items(project_id: UUID, skip: int = Query(0, ge=0), limit: int = Query(500, ge=1, le=1000)):
-    bom_items = await sync_to_async(list)(
-        BOMItem.objects.filter(project_id=project_id)
-        .select_related("part", "part__manufacturer")
-        .prefetch_related("substitutes")
-        .all()[skip : skip + limit]
-    )
-    return bom_items
+@router.get("/{project_id}/bom", response_model=List[BOMItemSchema], dependencies=[conditional_get("bom")])
+async def list_bom_items(
+    project_id: UUID,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=1000),
+    cursor: str = Query(None, description="Cursor from the X-Next-Cursor header of the previous page (replaces skip)"),
+    total: bool = Query(False, description="Return the number of matching rows in the X-Total-Count header"),
+    estimate: bool = Query(False, description="Like total, but unfiltered large lists may use a planner estimate"),
+    fields: str = Query(None, description="Comma-separated fields to return, dotted for nested ones (e.g. part.name)"),
+    expand: str = Query(None, description="Comma-separated relations to embed; others are returned as <name>_id"),
+):
+    @database_sync_to_async
+    def _list():
+        projection = BOM_ITEM_PROJECTION.select(parse_fields(fields), parse_fields(expand), keep=BY_CREATED)
+        queryset = projection.values(BOMItem.objects.filter(project_id=project_id))
+        rows, next_cursor, page_total = paginate(
+            queryset, BY_CREATED, limit, cursor=cursor, skip=skip, total=total, estimate=estimate
+        )
+        return projection.build(rows), next_cursor, page_total
+
+    try:
+        bom_items, next_cursor, page_total = await _list()
+    except ValueError as e:
+        args = e.args
+        raise HTTPException(status_code=args[1] if len(args) > 1 else 400, detail=args[0])
+    set_page_headers(response, next_cursor, page_total)
+    return projected_response(bom_items, response, fields, expand)
 
 
 @router.post("/{project_id}/bom", response_model=BOMItemSchema, status_code=201)
 async def add_bom_item(project_id: UUID, data: BOMItemCreate):
     try:
-        project = await sync_to_async(Project.objects.get)(id=project_id)
+        project = await database_sync_to_async(Project.objects.get)(id=project_id)
     except Project.DoesNotExist:
         raise HTTPException(status_code=404, detail="Project not found")
 
     try:
-        part = await sync_to_async(Part.objects.get)(id=data.part_id)
+        part = await database_sync_to_async(Part.objects.get)(id=data.part_id)
     except Part.DoesNotExist:
         raise HTTPException(status_code=404, detail="Part not found")
 
-    @sync_to_async
+    @database_sync_to_async
     def _create():
         bom_item = BOMItem.objects.create(
             project=project, part=part, quantity=data.quantity, designators=data.designators or ""
@@ -110,11 +160,7 @@ async def add_bom_item(project_id: UUID, data: BOMItemCreate):
         if data.substitute_ids:
             substitutes = Part.objects.filter(id__in=data.substitute_ids)
             bom_item.substitutes.set(list(substitutes))
-        return (
-            BOMItem.objects.select_related("part", "part__manufacturer")
-            .prefetch_related("substitutes")
-            .get(id=bom_item.id)
-        )
+        return _get_bom_queryset().get(id=bom_item.id)
 
     try:
         bom_item = await _create()
@@ -126,7 +172,7 @@ async def add_bom_item(project_id: UUID, data: BOMItemCreate):
 @router.put("/{project_id}/bom/{item_id}", response_model=BOMItemSchema)
 async def update_bom_item(project_id: UUID, item_id: UUID, data: BOMItemUpdate):
     try:
-        bom_item = await sync_to_async(BOMItem.objects.select_related("part", "project").get)(
+        bom_item = await database_sync_to_async(BOMItem.objects.select_related("part", "project").get)(
             id=item_id, project_id=project_id
         )
     except BOMItem.DoesNotExist:
@@ -136,7 +182,7 @@ async def update_bom_item(project_id: UUID, item_id: UUID, data: BOMItemUpdate):
 
     if "part_id" in update_data and update_data["part_id"]:
         try:
-            new_part = await sync_to_async(Part.objects.get)(id=update_data["part_id"])
+            new_part = await database_sync_to_async(Part.objects.get)(id=update_data["part_id"])
             bom_item.part = new_part
         except Part.DoesNotExist:
             raise HTTPException(status_code=404, detail="Part not found")
@@ -145,18 +191,16 @@ async def update_bom_item(project_id: UUID, item_id: UUID, data: BOMItemUpdate):
     for field, value in update_data.items():
         setattr(bom_item, field, value)
 
-    await sync_to_async(bom_item.save)()
-    bom_item = await sync_to_async(
-        BOMItem.objects.select_related("part", "part__manufacturer").prefetch_related("substitutes").get
-    )(id=item_id)
+    await database_sync_to_async(bom_item.save)()
+    bom_item = await database_sync_to_async(_get_bom_queryset().get)(id=item_id)
     return bom_item
 
 
 @router.delete("/{project_id}/bom/{item_id}", status_code=204)
 async def delete_bom_item(project_id: UUID, item_id: UUID):
     try:
-        bom_item = await sync_to_async(BOMItem.objects.get)(id=item_id, project_id=project_id)
-        await sync_to_async(bom_item.delete)()
+        bom_item = await database_sync_to_async(BOMItem.objects.get)(id=item_id, project_id=project_id)
+        await database_sync_to_async(bom_item.delete)()
     except BOMItem.DoesNotExist:
         raise HTTPException(status_code=404, detail="BOM item not found")
 
@@ -164,7 +208,7 @@ async def delete_bom_item(project_id: UUID, item_id: UUID):
 @router.post("/{project_id}/bom/import", response_model=List[BOMItemSchema])
 async def import_bom_csv(project_id: UUID, file: UploadFile = File(...)):
     try:
-        project = await sync_to_async(Project.objects.get)(id=project_id)
+        project = await database_sync_to_async(Project.objects.get)(id=project_id)
     except Project.DoesNotExist:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -181,22 +225,18 @@ async def import_bom_csv(project_id: UUID, file: UploadFile = File(...)):
 
         if part_number:
             try:
-                part = await sync_to_async(Part.objects.get)(mpn=part_number)
+                part = await database_sync_to_async(Part.objects.get)(mpn=part_number)
             except Part.DoesNotExist:
                 part = None
         else:
             part = None
 
-        @sync_to_async
+        @database_sync_to_async
         def _create():
             bom_item = BOMItem.objects.create(
                 project=project, part=part, quantity=quantity, designators=reference or ""
             )
-            return (
-                BOMItem.objects.select_related("part", "part__manufacturer")
-                .prefetch_related("substitutes")
-                .get(id=bom_item.id)
-            )
+            return _get_bom_queryset().get(id=bom_item.id)
 
         if part:
             bom_item = await _create()
@@ -214,7 +254,7 @@ async def match_bom_items(project_id: UUID, items: List[BOMImportItem]):
 
         if item.part_number:
             try:
-                part = await sync_to_async(Part.objects.filter(mpn__icontains=item.part_number).first)()
+                part = await database_sync_to_async(Part.objects.filter(mpn__icontains=item.part_number).first)()
                 if part:
                     result.matched = True
                     result.part_id = part.id
@@ -235,11 +275,11 @@ async def match_bom_items(project_id: UUID, items: List[BOMImportItem]):
 async def list_project_attachments(project_id: UUID):
     """List all attachments for a project."""
     try:
-        project = await sync_to_async(Project.objects.prefetch_related("attachments").get)(id=project_id)
+        project = await database_sync_to_async(Project.objects.prefetch_related("attachments").get)(id=project_id)
     except Project.DoesNotExist:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    attachments = await sync_to_async(lambda: list(project.attachments.all()))()
+    attachments = await database_sync_to_async(lambda: list(project.attachments.all()))()
     return attachments
 
 
@@ -247,11 +287,11 @@ async def list_project_attachments(project_id: UUID):
 async def upload_project_attachment(project_id: UUID, file: UploadFile = File(...)):
     """Upload a new attachment for a project."""
     try:
-        project = await sync_to_async(Project.objects.get)(id=project_id)
+        project = await database_sync_to_async(Project.objects.get)(id=project_id)
     except Project.DoesNotExist:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    @sync_to_async
+    @database_sync_to_async
     def _create():
         content = file.file.read() if hasattr(file, "file") else b""
         file.file.seek(0)
@@ -276,14 +316,14 @@ async def upload_project_attachment(project_id: UUID, file: UploadFile = File(..
 async def delete_project_attachment(project_id: UUID, attachment_id: UUID):
     """Delete an attachment from a project."""
     try:
-        project = await sync_to_async(Project.objects.get)(id=project_id)
+        project = await database_sync_to_async(Project.objects.get)(id=project_id)
     except Project.DoesNotExist:
         raise HTTPException(status_code=404, detail="Project not found")
 
     try:
-        attachment = await sync_to_async(Attachment.objects.get)(id=attachment_id)
+        attachment = await database_sync_to_async(Attachment.objects.get)(id=attachment_id)
     except Attachment.DoesNotExist:
         raise HTTPException(status_code=404, detail="Attachment not found")
 
-    await sync_to_async(project.attachments.remove)(attachment)
-    await sync_to_async(attachment.delete)()
+    await database_sync_to_async(project.attachments.remove)(attachment)
+    await database_sync_to_async(attachment.delete)()
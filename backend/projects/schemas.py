@@ -35,7 +35,7 @@ class BOMItemSchema(GlobalOpsSchema):
     part: PartSchema
     quantity: int
     designators: Optional[str] = ""
-    substitutes: List[PartSchema] = Field(default_factory=list)
+    substitutes: Annotated[List[PartSchema], BeforeValidator(convert_m2m_to_list)] = Field(default_factory=list)
 
 
 class BOMItemCreate(BaseModel):
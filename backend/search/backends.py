@@ -0,0 +1,322 @@
+"""
+Search backends behind the /search endpoints.
+
+`typesense` queries the Typesense collections of core.typesense, and `embedded` the same collections
+in the in-process index of core.embedded_search. `postgres` runs the same
+searches on the database: a prefix tsquery against the generated `search_vector` columns, OR'd
+with `icontains` on names and MPNs, which pg_trgm indexes serve when the extension is installed
+(see core.search_indexes). Both return the same shapes, so the router does not care which one
+answered.
+
+SEARCH_BACKEND picks the backend of a deployment. With SEARCH_FALLBACK, a Typesense request that
+cannot connect or gets a server error is answered by Postgres instead, and Typesense is skipped
+for SEARCH_FALLBACK_COOLDOWN seconds, so an outage does not add a connect timeout to every request.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+import httpx
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Count, Exists, F, OuterRef, Q
+from core.executor import database_sync_to_async
+from core.search_client import search_client
+from core.search_indexes import SEARCH_CONFIG
+
+logger = logging.getLogger(__name__)
+
+PART_FACETS = {"manufacturer": "manufacturer__name", "designator": "designator__code", "part_type": "part_type"}
+MAX_FACET_VALUES = 20
+
+
+class SearchUnavailable(Exception):
+    """The backend could not be reached or failed; another backend may answer instead."""
+
+
+def filter_values(field: str, values: List[str]) -> Optional[str]:
+    """Typesense `field:=[...]` clause matching any of `values` (None when empty)."""
+    values = [value.replace("`", "") for value in values]
+    if not values:
+        return None
+    return f"{field}:=[{','.join(f'`{value}`' for value in values)}]"
+
+
+def prefix_query(q: str) -> Optional[SearchQuery]:
+    """A tsquery matching every word of `q` as a prefix, as typed so far (None without words)."""
+    words = re.findall(r"\w+", q.lower())
+    if not words:
+        return None
+    return SearchQuery(" & ".join(f"{word}:*" for word in words), search_type="raw", config=SEARCH_CONFIG)
+
+
+class TypesenseBackend:
+    name = "typesense"
+
+    async def _search(self, collection: str, params: Dict) -> Dict:
+        path = f"/collections/{collection}/documents/search"
+        try:
+            response = await search_client.request("GET", path, params=params)
+        except httpx.TransportError as e:
+            raise SearchUnavailable(f"Typesense is unreachable: {e}") from e
+        if response.status_code >= 500:
+            raise SearchUnavailable(f"Typesense error: {response.status_code} {response.text}")
+        if response.is_error:
+            logger.error(f"Typesense HTTP error: {response.status_code} - {response.text}")
+            raise ValueError(f"Typesense error: {response.text}", response.status_code)
+        return response.json()
+
+    async def parts(
+        self, q: str, page: int, per_page: int, filters: Dict[str, List[str]], in_stock: Optional[bool]
+    ) -> Dict:
+        from core.typesense import PartCollection
+
+        fields = PartCollection.query_by_fields
+        clauses = [filter_values(field, values) for field, values in filters.items()]
+        if in_stock is not None:
+            clauses.append("total_stock:>0" if in_stock else "total_stock:<=0")
+        params = {
+            "q": q,
+            "query_by": ",".join(fields),
+            "infix": ",".join("always" if field in PartCollection.infix_fields else "off" for field in fields),
+            "facet_by": ",".join(PartCollection.facet_fields),
+            "max_facet_values": MAX_FACET_VALUES,
+            "page": page,
+            "per_page": per_page,
+        }
+        filter_by = " && ".join(clause for clause in clauses if clause)
+        if filter_by:
+            params["filter_by"] = filter_by
+
+        results = await self._search(PartCollection.name, params)
+        hits = []
+        for hit in results.get("hits", []):
+            highlights = {item["field"]: item["snippet"] for item in hit.get("highlights", []) if "snippet" in item}
+            hits.append({**hit["document"], "highlights": highlights})
+        return {
+            "results": hits,
+            "count": results.get("found", 0),
+            "facets": {
+                facet["field_name"]: [{"value": item["value"], "count": item["count"]} for item in facet["counts"]]
+                for facet in results.get("facet_counts", [])
+            },
+        }
+
+    async def locations(
+        self,
+        q: str,
+        skip: int,
+        limit: int,
+        has_stock: Optional[bool],
+        tags: List[str],
+        descendants_of: Optional[UUID],
+        parent_id: Optional[UUID] = None,
+    ) -> Tuple[List[str], int]:
+        clauses = [filter_values("tags", [tag]) for tag in tags]
+        if has_stock is not None:
+            clauses.append(f"has_stock:={'true' if has_stock else 'false'}")
+        if descendants_of:
+            clauses.append(f"ancestors:=[`{descendants_of}`]")
+        if parent_id:
+            clauses.append(f"parent_id:=[`{parent_id}`]")
+        params = {
+            "q": q,
+            "query_by": "name,description",
+            "infix": "always",  # Enable substring matching
+            "offset": skip,
+            "limit": limit,
+        }
+        if clauses:
+            params["filter_by"] = " && ".join(clauses)
+
+        results = await self._search("storage", params)
+        return [hit["document"]["id"] for hit in results.get("hits", [])], results.get("found", 0)
+
+    async def location_suggestions(self, q: str, limit: int) -> List[str]:
+        params = {"q": q, "query_by": "name", "limit": limit, "infix": "always", "drop_tokens_threshold": 0}
+        results = await self._search("storage", params)
+        return [hit["document"]["name"] for hit in results.get("hits", [])]
+
+
+class EmbeddedBackend(TypesenseBackend):
+    """The Typesense searches, answered by the embedded engine (SEARCH_BACKEND="embedded")."""
+
+    name = "embedded"
+
+    async def _search(self, collection: str, params: Dict) -> Dict:
+        from core.typesense import registry
+
+        return await asyncio.to_thread(registry.engine.search, collection, params)
+
+
+class PostgresBackend:
+    name = "postgres"
+
+    @staticmethod
+    def _match(queryset, q: str, substring_fields: Tuple[str, ...], also: Q = Q()):
+        """
+        Filter `queryset` to rows matching `q` as a word prefix or a substring of `substring_fields`
+        (or `also`), ranked by ts_rank when `q` has words. "*" matches everything.
+        """
+        if q.strip() == "*":
+            return queryset.order_by("name", "id")
+        match = also
+        for field in substring_fields:
+            match |= Q(**{f"{field}__icontains": q})
+        query = prefix_query(q)
+        if query is None:
+            return queryset.filter(match).order_by("name", "id")
+        return (
+            queryset.filter(match | Q(search_vector=query))
+            .annotate(rank=SearchRank(F("search_vector"), query))
+            .order_by("-rank", "name", "id")
+        )
+
+    async def parts(
+        self, q: str, page: int, per_page: int, filters: Dict[str, List[str]], in_stock: Optional[bool]
+    ) -> Dict:
+        from core.models import Company
+        from inventory.summary import total_stock_expression
+        from parts.models import Designator, Part
+
+        @database_sync_to_async
+        def _search():
+            queryset = Part.objects.all()
+            for field, values in filters.items():
+                if field == "tags":
+                    tag_match = Q()
+                    for tag in values:
+                        tag_match |= Q(tags__contains=[tag])
+                    queryset = queryset.filter(tag_match)
+                elif values:
+                    queryset = queryset.filter(**{f"{PART_FACETS[field]}__in": values})
+            queryset = queryset.annotate(total_stock=total_stock_expression())
+            if in_stock is not None:
+                queryset = queryset.filter(total_stock__gt=0) if in_stock else queryset.filter(total_stock__lte=0)
+
+            # Manufacturer names and designator codes are looked up on their own indexes first, so the
+            # part filter stays an OR of conditions on indexed part columns
+            related = Q()
+            query = prefix_query(q)
+            if query is not None and q.strip() != "*":
+                companies = Company.objects.filter(search_vector=query).values_list("id", flat=True)[:100]
+                codes = Designator.objects.filter(code__iexact=q.strip()).values_list("id", flat=True)
+                related = Q(manufacturer_id__in=list(companies)) | Q(designator_id__in=list(codes))
+            matched = self._match(queryset, q, ("name", "mpn"), also=related)
+
+            facet_rows = Part.objects.filter(id__in=matched.order_by().values("id"))
+            facets = {
+                field: [
+                    {"value": row["value"], "count": row["count"]}
+                    for row in facet_rows.exclude(**{f"{lookup}__isnull": True})
+                    .values(value=F(lookup))
+                    .annotate(count=Count("id"))
+                    .order_by("-count", "value")[:MAX_FACET_VALUES]
+                ]
+                for field, lookup in PART_FACETS.items()
+            }
+            offset = (page - 1) * per_page
+            rows = matched.values(
+                "id",
+                "name",
+                "mpn",
+                "description",
+                "manufacturer_id",
+                "part_type",
+                "footprint",
+                "tags",
+                "total_stock",
+                manufacturer_name=F("manufacturer__name"),
+                designator_code=F("designator__code"),
+            )[offset : offset + per_page]
+            hits = []
+            for row in rows:
+                manufacturer, designator = row.pop("manufacturer_name"), row.pop("designator_code")
+                tags = [str(tag) for tag in row.pop("tags") or []]
+                row.update(manufacturer=manufacturer or "", designator=designator or "", tags=tags, highlights={})
+                hits.append(row)
+            return {"results": hits, "count": matched.count(), "facets": facets}
+
+        return await _search()
+
+    async def locations(
+        self,
+        q: str,
+        skip: int,
+        limit: int,
+        has_stock: Optional[bool],
+        tags: List[str],
+        descendants_of: Optional[UUID],
+        parent_id: Optional[UUID] = None,
+    ) -> Tuple[List[str], int]:
+        from inventory.hierarchy import filter_descendants
+        from inventory.models import Stock, Storage
+
+        @database_sync_to_async
+        def _search():
+            queryset = Storage.objects.all()
+            if has_stock is not None:
+                stocked = Exists(Stock.objects.filter(storage_id=OuterRef("pk"), quantity__gt=0))
+                queryset = queryset.filter(stocked if has_stock else ~stocked)
+            for tag in tags:
+                queryset = queryset.filter(tags__contains=[tag])
+            if descendants_of:
+                queryset = filter_descendants(queryset, descendants_of)
+            if parent_id:
+                queryset = queryset.filter(parent_id=parent_id)
+            matched = self._match(queryset, q, ("name",))
+            ids = [str(pk) for pk in matched.values_list("id", flat=True)[skip : skip + limit]]
+            return ids, matched.count()
+
+        return await _search()
+
+    async def location_suggestions(self, q: str, limit: int) -> List[str]:
+        from inventory.models import Storage
+
+        @database_sync_to_async
+        def _suggest():
+            return list(self._match(Storage.objects.all(), q, ("name",)).values_list("name", flat=True)[:limit])
+
+        return await _suggest()
+
+
+BACKENDS = {backend.name: backend for backend in (TypesenseBackend(), EmbeddedBackend(), PostgresBackend())}
+
+
+class SearchDispatcher:
+    """Runs a search on the configured backend, falling back to Postgres while Typesense is unavailable."""
+
+    def __init__(self):
+        self._skip_until = 0.0
+        self.fallbacks = 0
+
+    async def run(self, operation: str, *args, **kwargs) -> Tuple[str, object]:
+        """Return the name of the backend that answered and its result."""
+        backend = BACKENDS[settings.SEARCH_BACKEND]
+        fallback = BACKENDS[PostgresBackend.name]
+        if backend is not fallback and settings.SEARCH_FALLBACK:
+            if time.monotonic() < self._skip_until:
+                backend = fallback
+            else:
+                try:
+                    return backend.name, await getattr(backend, operation)(*args, **kwargs)
+                except SearchUnavailable as e:
+                    logger.warning("Search backend %s unavailable, using %s: %s", backend.name, fallback.name, e)
+                    self._skip_until = time.monotonic() + settings.SEARCH_FALLBACK_COOLDOWN
+                    self.fallbacks += 1
+                    backend = fallback
+        return backend.name, await getattr(backend, operation)(*args, **kwargs)
+
+    def stats(self) -> Dict:
+        return {
+            "backend": settings.SEARCH_BACKEND,
+            "fallback": settings.SEARCH_FALLBACK,
+            "fallbacks": self.fallbacks,
+            "skipping_seconds": round(max(self._skip_until - time.monotonic(), 0.0), 3),
+        }
+
+
+search = SearchDispatcher()
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, HTTPException
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, Query, Response
+from typing import Dict, Optional, List
 from pydantic import BaseModel
-import socket
+from uuid import UUID
+from search.backends import SearchUnavailable, search
 from inventory.schemas import StorageSchema
-from django.conf import settings
 
 router = APIRouter(prefix="/search", tags=["search"])
 
@@ -13,137 +13,127 @@ class SearchLocationsResponse(BaseModel):
     count: int
 
 
-def get_typesense_config():
-    """Get Typesense configuration from Django settings."""
+class PartSearchHit(BaseModel):
+    id: UUID
+    name: str
+    mpn: str = ""
+    description: str = ""
+    manufacturer: str = ""
+    manufacturer_id: Optional[UUID] = None
+    designator: str = ""
+    part_type: str
+    footprint: str = ""
+    tags: List[str] = []
+    total_stock: int = 0
+    highlights: Dict[str, str] = {}
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class SearchPartsResponse(BaseModel):
+    results: List[PartSearchHit]
+    count: int
+    page: int
+    per_page: int
+    facets: Dict[str, List[FacetCount]]
+
+
+def csv_values(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+async def run_search(response: Response, operation: str, *args, **kwargs):
+    """Run a search on the selected backend; its name is returned in the X-Search-Backend header."""
     try:
-        socket.gethostbyname("typesense")
-        host = "typesense"
-    except socket.gaierror:
-        host = "localhost"
-
-    return {"url": f"http://{host}:8108", "api_key": settings.TYPESENSE_API_KEY}
-
-
-async def typesense_request(method: str, path: str, body: Optional[dict] = None, query_params: Optional[dict] = None):
-    """Make authenticated request to Typesense."""
-    import httpx
-    import logging
-
-    logger = logging.getLogger(__name__)
-    config = get_typesense_config()
-    url = f"{config['url']}{path}"
-    headers = {"X-TYPESENSE-API-KEY": config["api_key"]}
-
-    async with httpx.AsyncClient() as client:
-        try:
-            if method.upper() == "GET":
-                response = await client.get(url, headers=headers, params=query_params)
-            elif method.upper() == "POST":
-                response = await client.post(url, headers=headers, json=body, params=query_params)
-            elif method.upper() == "DELETE":
-                response = await client.delete(url, headers=headers, params=query_params)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Typesense HTTP error: {e.response.status_code} - {e.response.text}")
-            raise HTTPException(status_code=e.response.status_code, detail=f"Typesense error: {e.response.text}")
+        backend, result = await search.run(operation, *args, **kwargs)
+    except SearchUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Search is unavailable: {e}")
+    except ValueError as e:
+        args = e.args
+        raise HTTPException(status_code=args[1] if len(args) > 1 else 400, detail=args[0])
+    response.headers["X-Search-Backend"] = backend
+    return result
+
+
+@router.get("/parts", response_model=SearchPartsResponse)
+async def search_parts(
+    response: Response,
+    q: str = Query(..., min_length=1, description="Search text; * lists every part"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=250),
+    manufacturer: str = Query(None, description="Filter by manufacturer names (comma-separated)"),
+    designator: str = Query(None, description="Filter by designator codes (comma-separated)"),
+    part_type: str = Query(None, description="Filter by part types (comma-separated)"),
+    tags: str = Query(None, description="Filter by tags (comma-separated, any of)"),
+    in_stock: bool = Query(None, description="Only parts with (true) or without (false) available stock"),
+):
+    """
+    Ranked, faceted part search. Hits are built from the search index, without loading each part;
+    facet counts for manufacturer, designator and part type reflect the filters applied.
+    """
+    filters = {
+        "manufacturer": csv_values(manufacturer),
+        "designator": csv_values(designator),
+        "part_type": csv_values(part_type),
+        "tags": csv_values(tags),
+    }
+    results = await run_search(response, "parts", q, page, per_page, filters, in_stock)
+    return SearchPartsResponse(
+        results=[
+            PartSearchHit(**{**hit, "manufacturer_id": hit.get("manufacturer_id") or None})
+            for hit in results["results"]
+        ],
+        count=results["count"],
+        page=page,
+        per_page=per_page,
+        facets={
+            field: [FacetCount(**item) for item in counts] for field, counts in results["facets"].items()
+        },
+    )
 
 
 @router.get("/locations", response_model=SearchLocationsResponse)
 async def search_locations(
+    response: Response,
     q: str,
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=250),
     has_stock: Optional[bool] = None,
     tags: Optional[str] = None,
+    descendants_of: Optional[UUID] = None,
+    parent_id: Optional[UUID] = Query(None, description="Only the direct children of this location"),
 ):
     """
-    Search storage locations via Typesense with filters.
-    Returns full Storage objects from Django after Typesense search.
+    Search storage locations. Filtering, ranking and pagination run in the search backend;
+    only the returned page is loaded from Django.
     """
-    from asgiref.sync import sync_to_async
-    from inventory.models import Storage, Stock
-    from django.db.models import Exists, OuterRef
-    import logging
+    from core.executor import database_sync_to_async
+    from inventory.models import Storage
 
-    logger = logging.getLogger(__name__)
+    matching_ids, found = await run_search(
+        response, "locations", q, skip, limit, has_stock, csv_values(tags), descendants_of, parent_id
+    )
+    if not matching_ids:
+        return {"results": [], "count": found}
 
-    try:
-        # Search via Typesense
-        params = {
-            "q": q,
-            "query_by": "name,description",
-            "limit": 250,  # Typesense max per page
-            "infix": "always",  # Enable substring matching
-        }
-
-        results = await typesense_request("GET", "/collections/storage/documents/search", query_params=params)
-
-        # Extract matching IDs
-        matching_ids = [hit["document"]["id"] for hit in results.get("hits", [])]
-
-        if not matching_ids:
-            return {"results": [], "count": 0}
-
-        # Fetch full Storage objects from Django with filters
-        @sync_to_async
-        def _get_filtered_locations():
-            queryset = Storage.objects.filter(id__in=matching_ids).prefetch_related("attachments")
-
-            # Apply filters
-            if has_stock is not None:
-                if has_stock:
-                    queryset = queryset.filter(stock_in_location__quantity__gt=0).distinct()
-                else:
-                    has_stock_subquery = Stock.objects.filter(storage_id=OuterRef("pk"), quantity__gt=0)
-                    queryset = queryset.exclude(Exists(has_stock_subquery))
-
-            if tags:
-                tag_list = [tag.strip() for tag in tags.split(",") if tag.strip()]
-                for tag in tag_list:
-                    queryset = queryset.filter(tags__contains=[tag])
+    @database_sync_to_async
+    def _get_page():
+        # Keep the backend's relevance order; a location deleted since it was indexed is skipped
+        queryset = Storage.objects.filter(id__in=matching_ids).prefetch_related("attachments")
+        locations = {str(location.id): location for location in queryset}
+        page = [locations[pk] for pk in matching_ids if pk in locations]
+        # Eagerly convert attachments to lists
+        for location in page:
+            location.__dict__["attachments"] = list(location.attachments.all())
+        return page
 
-            # Order by Typesense relevance (maintain ID order from Typesense)
-            id_order = {id: index for index, id in enumerate(matching_ids)}
-            locations = list(queryset)
-            locations.sort(key=lambda loc: id_order.get(str(loc.id), 999999))
-
-            # Eagerly convert attachments to lists
-            for location in locations:
-                location.__dict__['attachments'] = list(location.attachments.all())
-
-            # Apply pagination
-            total_count = len(locations)
-            paginated = locations[skip : skip + limit]
-
-            return {"results": paginated, "count": total_count}
-
-        return await _get_filtered_locations()
-
-    except Exception as e:
-        logger.error(f"Error in search_locations: {type(e).__name__}: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+    return {"results": await _get_page(), "count": found}
 
 
 @router.get("/locations/suggestions")
-async def location_suggestions(q: str, limit: int = 5):
+async def location_suggestions(response: Response, q: str, limit: int = Query(5, ge=1, le=50)):
     """Get autocomplete suggestions for locations."""
-    try:
-        results = await typesense_request(
-            "GET",
-            "/collections/storage/documents/search",
-            query_params={
-                "q": q,
-                "query_by": "name",
-                "limit": limit,
-                "infix": "always",
-                "drop_tokens_threshold": 0,
-            },
-        )
-        suggestions = [hit["document"]["name"] for hit in results.get("hits", [])]
-        return {"suggestions": suggestions}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return {"suggestions": await run_search(response, "location_suggestions", q, limit)}
@@ -0,0 +1,72 @@
+import io
+import pytest
+from parts.models import Part
+from inventory.models import Storage, Stock, StockMovement, PartStockSummary
+from inventory.bulk import import_stock_rows, iter_csv_rows, iter_ndjson_rows
+
+
+def _csv(text):
+    return iter_csv_rows(io.BytesIO(text.encode()))
+
+
+@pytest.mark.django_db
+def test_bulk_import_creates_rows_and_reports_errors():
+    part = Part.objects.create(name="Resistor 10k", mpn="RC0805-10K", part_type="local")
+    storage = Storage.objects.create(name="SM01-1A")
+
+    rows = _csv(
+        "part_mpn,storage,quantity,status,price_unit,currency\n"
+        "RC0805-10K,SM01-1A,100,,0.01,usd\n"
+        f"RC0805-10K,{storage.name},5,reserved,,\n"
+        "MISSING,SM01-1A,1,,,\n"
+        "RC0805-10K,NOWHERE,abc,broken,,\n"
+    )
+    result = import_stock_rows(rows, chunk_size=2)
+
+    assert (result["total_rows"], result["created"], result["failed"]) == (4, 2, 2)
+    assert result["errors"][0] == {"row": 3, "errors": ["Part not found: MISSING"]}
+    assert len(result["errors"][1]["errors"]) == 3
+
+    assert Stock.objects.filter(part=part).count() == 2
+    summary = PartStockSummary.objects.get(part=part)
+    assert (summary.available, summary.reserved) == (100, 5)
+    assert StockMovement.objects.filter(part_id=part.id, reason="create").count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_import_dry_run_writes_nothing():
+    part = Part.objects.create(name="Capacitor", part_type="local")
+    storage = Storage.objects.create(name="SM01-1B")
+
+    rows = iter_ndjson_rows(
+        io.BytesIO(
+            (
+                f'{{"part_id": "{part.id}", "storage_id": "{storage.id}", "quantity": 7}}\n'
+                "not json\n"
+            ).encode()
+        )
+    )
+    result = import_stock_rows(rows, dry_run=True)
+
+    assert (result["valid_rows"], result["created"], result["failed"]) == (1, 0, 1)
+    assert not Stock.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_import_rejects_values_the_columns_cannot_hold():
+    Part.objects.create(name="Resistor", mpn="R1", part_type="local")
+    Storage.objects.create(name="SM01-1C")
+
+    rows = _csv(
+        "part_mpn,storage,quantity,price_unit\n"
+        "R1,SM01-1C,99999999999,\n"
+        "R1,SM01-1C,1,123456789012345678\n"
+        "R1,SM01-1C,1,0.00001\n"
+        "R1,SM01-1C,1,NaN\n"
+        "R1,SM01-1C,1,Infinity\n"
+        "R1,SM01-1C,1,0.0001\n"
+    )
+    result = import_stock_rows(rows)
+
+    assert (result["created"], result["failed"]) == (1, 5)
+    assert [error["errors"][0].split(":")[0] for error in result["errors"]] == ["quantity"] + ["price_unit"] * 4
@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.models import Company
+from core.singleflight import SingleFlight
+from dashboard.overview import counts
+from inventory.models import Storage, Stock
+from parts.models import Part
+from procurement.models import Order
+from projects.models import Project
+
+
+def test_singleflight_shares_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def run():
+        shared = await asyncio.gather(*(flight.do("key", compute) for _ in range(5)))
+        return shared, await flight.do("key", compute)
+
+    shared, later = asyncio.run(run())
+    assert shared == [1] * 5
+    assert later == 2
+    assert flight.stats() == {"in_flight": 0, "started": 2, "shared": 4}
+
+
+@pytest.mark.django_db
+def test_counts_come_from_one_query():
+    storage = Storage.objects.create(name="Bin A")
+    low = Part.objects.create(name="Low", part_type="local", low_stock_threshold=10)
+    Part.objects.create(name="Empty", part_type="local", low_stock_threshold=10)
+    Part.objects.create(name="Untracked", part_type="local")
+    Stock.objects.create(part=low, storage=storage, quantity=8)
+    vendor = Company.objects.create(name="Vendor", is_vendor=True)
+    Order.objects.create(vendor=vendor, number="1", status="open")
+    Order.objects.create(vendor=vendor, number="2", status="received")
+    Project.objects.create(name="Active", status="active")
+    Project.objects.create(name="Old", status="archived")
+
+    with CaptureQueriesContext(connection) as queries:
+        summary = counts()
+
+    assert len(queries) == 1
+    assert summary == {"totalParts": 3, "openOrders": 1, "activeProjects": 1, "critical": 1, "warning": 1}
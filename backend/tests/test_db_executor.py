@@ -0,0 +1,43 @@
+import asyncio
+import threading
+import pytest
+from django.conf import settings
+from core.executor import DatabaseExecutor, pool_stats
+from parts.models import Part
+
+
+def test_executor_runs_calls_concurrently_and_counts_them():
+    executor = DatabaseExecutor(2)
+    barrier = threading.Barrier(2, timeout=5)
+
+    def meet(value):
+        # Fails with BrokenBarrierError unless both calls are on different threads at once
+        barrier.wait()
+        return threading.current_thread().name, value
+
+    async def run():
+        return await asyncio.gather(executor.run(meet, 1), executor.run(meet, value=2))
+
+    try:
+        results = asyncio.run(run())
+        with pytest.raises(ZeroDivisionError):
+            asyncio.run(executor.run(lambda: 1 / 0))
+    finally:
+        executor.shutdown()
+
+    assert [value for _, value in results] == [1, 2]
+    assert all(name.startswith("makerdb-db") for name, _ in results)
+    stats = executor.stats()
+    assert stats["completed"] == 3
+    assert stats["active"] == 0 and stats["queued"] == 0
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(not settings.DB_POOL, reason="connection pooling is disabled")
+def test_pool_stats_count_connection_in_use():
+    Part.objects.count()  # the test transaction holds a pooled connection
+
+    stats = pool_stats()
+    assert stats["max_size"] == settings.DB_POOL_MAX_SIZE
+    assert stats["in_use"] >= 1
+    assert stats["size"] == stats["in_use"] + stats["available"]
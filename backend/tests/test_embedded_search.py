@@ -0,0 +1,102 @@
+import asyncio
+import pytest
+from core.embedded_search import EmbeddedIndex
+from core.typesense import registry
+from inventory.models import Storage
+from parts.models import Part
+from search.backends import BACKENDS
+
+FIELDS = ["name", "mpn", "description"]
+
+
+def part(number, name, mpn="", **fields):
+    return {"id": f"p{number}", "name": name, "mpn": mpn, "description": "", "created_at": number, **fields}
+
+
+def test_ranks_exact_then_prefix_then_infix_with_filters_and_facets(tmp_path):
+    index = EmbeddedIndex(tmp_path, "parts", FIELDS)
+    index.upsert(
+        [
+            part(1, "Resistor 10k", "RC0805FR-0710KL", part_type="local", total_stock=5, tags=["smd"]),
+            part(2, "Resistor array", "CAY16-103J4", part_type="local", total_stock=0),
+            part(3, "Resist tape", "T-1", part_type="meta", total_stock=2),
+            part(4, "Capacitor", "GRM188R71H104", part_type="linked", total_stock=9, tags=["smd"]),
+        ]
+    )
+    params = {"q": "resist", "query_by": "name,mpn", "infix": "always,always"}
+    assert [hit["document"]["id"] for hit in index.search(params)["hits"]] == ["p3", "p2", "p1"]
+    assert index.search({**params, "q": "0710"})["hits"][0]["highlights"] == [
+        {"field": "mpn", "snippet": "RC0805FR-<mark>0710</mark>KL"}
+    ]
+    assert index.search({**params, "q": "805", "infix": "off,off"})["found"] == 0
+
+    results = index.search(
+        {
+            **params,
+            "filter_by": "total_stock:>0 && part_type:=[`local`,`meta`]",
+            "facet_by": "part_type,tags",
+            "per_page": 1,
+            "page": 2,
+        }
+    )
+    assert results["found"] == 2 and [hit["document"]["id"] for hit in results["hits"]] == ["p1"]
+    assert results["facet_counts"] == [
+        {"field_name": "part_type", "counts": [{"value": "local", "count": 1}, {"value": "meta", "count": 1}]},
+        {"field_name": "tags", "counts": [{"value": "smd", "count": 1}]},
+    ]
+    assert index.search({"q": "*", "filter_by": "tags:=[`smd`]", "offset": 1, "limit": 5})["found"] == 2
+    index.close()
+
+
+def test_snapshot_and_journal_survive_a_restart(tmp_path):
+    index = EmbeddedIndex(tmp_path, "parts", FIELDS, compact_ops=2)
+    index.upsert([part(1, "Resistor"), part(2, "Capacitor")])  # reaches compact_ops: written to a snapshot
+    index.upsert([part(3, "Inductor"), part(1, "Resonator")])
+    index.delete(["p2"])
+    index._journal.close()  # a crash: the later changes are only in the journal
+    with open(index.journal_path, "a") as journal:
+        journal.write('{"op":"upsert","doc":{"id":"p9"')  # torn final write
+
+    reopened = EmbeddedIndex(tmp_path, "parts", FIELDS)
+    assert len(reopened) == 2
+    assert [hit["document"]["name"] for hit in reopened.search({"q": "reso"})["hits"]] == ["Resonator"]
+    assert reopened.search({"q": "capacitor"})["found"] == 0
+    reopened.close()  # compacts the replayed changes
+    assert reopened.journal_path.stat().st_size == 0
+    assert EmbeddedIndex(tmp_path, "parts", FIELDS).search({"q": "induct"})["found"] == 1
+
+
+@pytest.mark.django_db
+def test_embedded_backend_searches_indexed_parts(tmp_path, settings):
+    settings.SEARCH_BACKEND = "embedded"
+    settings.SEARCH_EMBEDDED_PATH = str(tmp_path)
+    registry.close()
+    try:
+        parts = [
+            Part.objects.create(name="Resistor 10k", mpn="RC0805FR-0710KL", part_type="local"),
+            Part.objects.create(name="Capacitor 100nF", mpn="GRM188R71H104", part_type="local"),
+        ]
+        assert registry.index("parts", [str(part.id) for part in parts]) == {}
+        results = asyncio.run(BACKENDS["embedded"].parts("0710", 1, 20, {"part_type": ["local"]}, None))
+        assert [hit["name"] for hit in results["results"]] == ["Resistor 10k"]
+        assert results["facets"]["part_type"] == [{"value": "local", "count": 1}]
+    finally:
+        registry.close()
+
+
+@pytest.mark.django_db
+def test_embedded_backend_filters_locations_by_parent(tmp_path, settings):
+    settings.SEARCH_BACKEND = "embedded"
+    settings.SEARCH_EMBEDDED_PATH = str(tmp_path)
+    registry.close()
+    try:
+        shelf = Storage.objects.create(name="Shelf")
+        bin_ = Storage.objects.create(name="Bin A", parent=shelf)
+        inner = Storage.objects.create(name="Bin A1", parent=bin_)
+        assert registry.index("storage", [str(location.id) for location in (shelf, bin_, inner)]) == {}
+        ids, found = asyncio.run(BACKENDS["embedded"].locations("bin", 0, 10, None, [], None, shelf.id))
+        assert (ids, found) == ([str(bin_.id)], 1)
+        ids, found = asyncio.run(BACKENDS["embedded"].locations("bin", 0, 10, None, [], shelf.id, None))
+        assert found == 2
+    finally:
+        registry.close()
@@ -0,0 +1,70 @@
+import time
+from datetime import date
+import pytest
+from django.db import connection
+from django.utils import timezone
+from core.etag import CHANNEL, etag_matches, resource_etag
+from inventory.models import Storage, Stock
+from inventory.batch import apply_stock_batch
+from parts.models import Part
+from projects.models import Project
+
+
+@pytest.mark.django_db
+def test_resource_etag_changes_only_with_its_models(django_capture_on_commit_callbacks):
+    parts, stock = resource_etag("parts"), resource_etag("stock")
+    assert resource_etag("parts") == parts
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Project.objects.create(name="Amp")
+    assert resource_etag("parts") == parts
+
+    with django_capture_on_commit_callbacks(execute=True):
+        part = Part.objects.create(name="Resistor", part_type="local")
+        storage = Storage.objects.create(name="Bin A")
+    assert resource_etag("parts") != parts
+    parts, stock = resource_etag("parts"), resource_etag("stock")
+
+    entry = Stock.objects.create(part=part, storage=storage, quantity=5)
+    with django_capture_on_commit_callbacks(execute=True):
+        # QuerySet.update path: no Stock signals, versions bumped by the batch itself
+        apply_stock_batch([{"op": "adjust", "stock_id": entry.id, "delta": 2}])
+    assert resource_etag("stock") != stock
+    assert resource_etag("parts") != parts  # total_stock comes from PartStockSummary
+
+
+def test_etag_matches_weak_and_lists():
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches('W/"x", W/"abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches('W/"x"', 'W/"abc"')
+    assert not etag_matches(None, 'W/"abc"')
+
+
+@pytest.mark.django_db
+def test_location_etag_follows_stock(django_capture_on_commit_callbacks):
+    part = Part.objects.create(name="Resistor", part_type="local")
+    storage = Storage.objects.create(name="Bin A")
+    locations = resource_etag("locations")
+    with django_capture_on_commit_callbacks(execute=True):
+        Stock.objects.create(part=part, storage=storage, quantity=5)
+    assert resource_etag("locations") != locations  # has_stock lists change
+
+
+@pytest.mark.django_db(transaction=True)
+def test_etag_follows_writes_of_other_processes():
+    designators = resource_etag("designators")
+    with connection.cursor() as cursor:  # what a write in another process sends on commit
+        cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, "parts.Designator"])
+    deadline = time.monotonic() + 5
+    while resource_etag("designators") == designators and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert resource_etag("designators") != designators
+
+
+@pytest.mark.django_db
+def test_dashboard_etag_changes_with_the_day(monkeypatch):
+    dashboard, parts = resource_etag("dashboard"), resource_etag("parts")
+    monkeypatch.setattr(timezone, "localdate", lambda: date(2030, 1, 2))
+    assert resource_etag("dashboard") != dashboard  # valueTrends ends on a new day
+    assert resource_etag("parts") == parts
@@ -0,0 +1,44 @@
+import pytest
+from inventory.generator import create_locations, parse_range
+from inventory.models import Storage
+
+
+def test_parse_range():
+    assert parse_range("A", "C", "letters") == ["A", "B", "C"]
+    assert parse_range("c", "a", "letters") == ["a", "b", "c"]
+    assert parse_range("Y", "AB", "letters") == ["Y", "Z", "AA", "AB"]
+    assert parse_range("001", "003", "numbers") == ["001", "002", "003"]
+    assert parse_range("9", "11", "numbers") == ["9", "10", "11"]
+    with pytest.raises(ValueError):
+        parse_range("1", "2000", "numbers")
+
+
+@pytest.mark.django_db
+def test_create_grid_under_parent():
+    shelf = Storage.objects.create(name="Shelf")
+    config = {
+        "mode": "grid",
+        "prefix": "Shelf-",
+        "row_range_type": "letters",
+        "row_range_start": "A",
+        "row_range_end": "B",
+        "col_range_type": "numbers",
+        "col_range_start": "1",
+        "col_range_end": "3",
+        "parent_id": shelf.id,
+    }
+
+    preview = create_locations(config, dry_run=True)
+    assert preview["names"] == ["Shelf-A1", "Shelf-A2", "Shelf-A3", "Shelf-B1", "Shelf-B2", "Shelf-B3"]
+    assert not Storage.objects.filter(parent=shelf).exists()
+
+    result = create_locations(config)
+    assert result["created"] == 6
+    bin_a1 = Storage.objects.get(name="Shelf-A1")
+    assert bin_a1.parent_id == shelf.id
+    assert bin_a1.path == f"{shelf.path}{bin_a1.id.hex}/"
+
+    with pytest.raises(ValueError) as error:
+        create_locations(config)
+    assert error.value.args[1] == 409
+    assert create_locations(config, dry_run=True)["conflicts"] == preview["names"]
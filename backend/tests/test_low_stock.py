@@ -0,0 +1,71 @@
+from datetime import timedelta
+import pytest
+from django.utils import timezone
+from parts.models import Part
+from inventory.models import PartStockSummary, Storage, Stock
+from inventory.alerts import low_stock_queryset, parse_severities, poll_cursor
+
+
+@pytest.mark.django_db
+def test_low_stock_severities_and_status_semantics():
+    storage = Storage.objects.create(name="Bin A")
+    critical = Part.objects.create(name="Critical part", part_type="local", low_stock_threshold=100)
+    warning = Part.objects.create(name="Warning part", part_type="local", low_stock_threshold=100)
+    healthy = Part.objects.create(name="Healthy part", part_type="local", low_stock_threshold=10)
+    Part.objects.create(name="Untracked part", part_type="local")
+
+    Stock.objects.create(part=critical, storage=storage, quantity=20)
+    # Reserved and rejected stock do not count towards the available total
+    Stock.objects.create(part=critical, storage=storage, quantity=500, status=Stock.StockStatus.RESERVED)
+    Stock.objects.create(part=critical, storage=storage, quantity=500, status=Stock.StockStatus.REJECTED)
+    Stock.objects.create(part=warning, storage=storage, quantity=80)
+    Stock.objects.create(part=healthy, storage=storage, quantity=50)
+
+    alerts = list(low_stock_queryset().values_list("name", "stock", "severity"))
+    assert alerts == [("Critical part", 20, "Critical"), ("Warning part", 80, "Warning")]
+
+    only_warning = low_stock_queryset(severities=parse_severities("warning"))
+    assert list(only_warning.values_list("name", flat=True)) == ["Warning part"]
+
+
+@pytest.mark.django_db
+def test_low_stock_changed_since_includes_recovered_parts():
+    storage = Storage.objects.create(name="Bin B")
+    moving = Part.objects.create(name="Moving part", part_type="local", low_stock_threshold=10)
+    Part.objects.create(name="Idle part", part_type="local", low_stock_threshold=10)
+    stock = Stock.objects.create(part=moving, storage=storage, quantity=1)
+
+    cursor = timezone.now()
+    stock.quantity = 50
+    stock.save()
+
+    changed = list(low_stock_queryset(changed_since=cursor).values_list("name", "severity"))
+    assert changed == [("Moving part", "OK")]
+
+
+@pytest.mark.django_db
+def test_poll_cursor_sees_changes_committed_late():
+    assert poll_cursor() is None
+    storage = Storage.objects.create(name="Bin C")
+    early = Part.objects.create(name="Early part", part_type="local", low_stock_threshold=10)
+    late = Part.objects.create(name="Late part", part_type="local", low_stock_threshold=10)
+    Stock.objects.create(part=early, storage=storage, quantity=1)
+    hour_ago = timezone.now() - timedelta(hours=1)
+    Part.objects.update(updated_at=hour_ago)
+    PartStockSummary.objects.update(updated_at=hour_ago)
+
+    cursor = poll_cursor()
+    assert cursor == hour_ago and not low_stock_queryset(changed_since=cursor).exists()  # idle: nothing repeats
+
+    Part.objects.filter(pk=early.pk).update(updated_at=timezone.now())
+    cursor = poll_cursor()
+    # A transaction that started earlier commits now, after the cursor was read
+    Part.objects.filter(pk=late.pk).update(updated_at=timezone.now() - timedelta(seconds=1))
+    changed = low_stock_queryset(changed_since=cursor).values_list("name", flat=True)
+    assert sorted(changed) == ["Early part", "Late part"]
+
+
+def test_parse_severities_rejects_unknown_values():
+    assert parse_severities("critical, WARNING") == ["Critical", "Warning"]
+    with pytest.raises(ValueError):
+        parse_severities("urgent")
@@ -0,0 +1,46 @@
+import pytest
+from django.core.cache import cache
+from parts.models import Part
+from inventory.models import Storage, Stock
+from inventory.occupancy import get_occupancy
+
+
+@pytest.mark.django_db
+def test_occupancy_summary_and_breakdowns(django_assert_num_queries):
+    cache.clear()
+    part = Part.objects.create(name="Resistor", part_type="local")
+    shelf = Storage.objects.create(name="Shelf SM01")
+    bin_a = Storage.objects.create(name="SM01-1A", parent=shelf, tags=["smd"])
+    Storage.objects.create(name="SM01-1B", parent=shelf, tags=["smd"])
+    Stock.objects.create(part=part, storage=bin_a, quantity=40)
+
+    occupancy = get_occupancy()
+    assert occupancy["total_locations"] == 3
+    assert occupancy["used_locations"] == 1
+    assert occupancy["top_locations"][0] == {"name": "SM01-1A", "quantity": 40}
+
+    by_parent = {item["name"]: item for item in occupancy["by_parent"]}
+    assert by_parent["Shelf SM01"]["total_locations"] == 2
+    assert by_parent["Shelf SM01"]["quantity"] == 40
+    assert by_parent["(top level)"]["total_locations"] == 1
+
+    by_tag = {item["name"]: item for item in occupancy["by_tag"]}
+    assert by_tag["smd"]["used_locations"] == 1
+    assert by_tag["(untagged)"]["total_locations"] == 1
+
+    # Served from cache until a Stock/Storage write commits
+    with django_assert_num_queries(0):
+        get_occupancy()
+
+
+@pytest.mark.django_db
+def test_occupancy_invalidated_on_stock_write(django_capture_on_commit_callbacks):
+    cache.clear()
+    part = Part.objects.create(name="Capacitor", part_type="local")
+    storage = Storage.objects.create(name="Bin B")
+    assert get_occupancy()["used_locations"] == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Stock.objects.create(part=part, storage=storage, quantity=5)
+
+    assert get_occupancy()["used_locations"] == 1
@@ -0,0 +1,63 @@
+import pytest
+from fastapi import HTTPException
+from core.pagination import BY_CREATED, BY_NAME, Total, encode_cursor, paginate
+from parts.models import Part
+
+
+@pytest.mark.django_db
+def test_cursor_pages_cover_every_row_once():
+    for name in ["B", "A", "B", "C", "B"]:
+        Part.objects.create(name=name, part_type="local")
+
+    seen, cursor = [], None
+    while True:
+        page, cursor, _ = paginate(Part.objects.all(), BY_NAME, 2, cursor=cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    assert [part.name for part in seen] == ["A", "B", "B", "B", "C"]
+    assert len({part.id for part in seen}) == 5
+
+    offset_page, _, _ = paginate(Part.objects.all(), BY_NAME, 2, skip=2)
+    assert offset_page == seen[2:4]
+
+
+@pytest.mark.django_db
+def test_total_counts_the_filtered_rows():
+    for name in ["A", "B", "C", "D", "E"]:
+        Part.objects.create(name=name, part_type="local")
+    queryset = Part.objects.exclude(name="E")
+
+    page, cursor, total = paginate(queryset, BY_NAME, 2, total=True)
+    assert [part.name for part in page] == ["A", "B"]
+    assert total == Total(4)
+
+    _, _, total = paginate(queryset.values("id", "name"), BY_NAME, 2, cursor=cursor, total=True)
+    assert total == Total(4)
+    _, _, total = paginate(queryset, BY_NAME, 2, skip=10, total=True)
+    assert total == Total(4)
+
+    # Small tables are counted exactly even when an estimate is allowed
+    _, _, total = paginate(Part.objects.all(), BY_NAME, 2, estimate=True)
+    assert total == Total(5, estimated=False)
+    assert paginate(queryset, BY_NAME, 2)[2] is None
+
+
+UUID = "00000000-0000-0000-0000-000000000000"
+
+
+@pytest.mark.parametrize(
+    "ordering, cursor",
+    [
+        (BY_NAME, "not-a-cursor"),
+        (BY_NAME, encode_cursor(["A"])),
+        (BY_NAME, encode_cursor(["A", "not-a-uuid"])),
+        (BY_CREATED, encode_cursor(["yesterday", UUID])),
+        (BY_CREATED, "WzEsIHt9XQ"),  # [1, {}]
+    ],
+)
+def test_tampered_cursor_is_a_bad_request(ordering, cursor):
+    with pytest.raises(HTTPException) as error:
+        paginate(Part.objects.all(), ordering, 10, cursor=cursor)
+    assert error.value.status_code == 400
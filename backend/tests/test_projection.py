@@ -0,0 +1,69 @@
+from typing import List
+import pytest
+from pydantic import TypeAdapter
+from core.models import Attachment, Company
+from inventory.management.commands.benchmark_stock_read import orm_page, projection_page
+from inventory.models import Lot, Storage, Stock
+from inventory.projections import STOCK_PROJECTION
+from inventory.schemas import StockSchema
+from parts.models import Part
+from projects.models import BOMItem, Project
+from projects.projections import BOM_ITEM_PROJECTION
+
+
+@pytest.mark.django_db
+def test_projection_matches_orm_read_path():
+    manufacturer = Company.objects.create(name="Yageo", is_manufacturer=True)
+    resistor = Part.objects.create(name="Resistor", part_type="local", manufacturer=manufacturer)
+    capacitor = Part.objects.create(name="Capacitor", part_type="local")
+    storage = Storage.objects.create(name="Bin A")
+    lot = Lot.objects.create(name="Lot 1")
+    datasheet = Attachment.objects.create(filename="r.pdf", content_type="application/pdf", size=10)
+    resistor.attachments.add(datasheet)
+    storage.attachments.add(datasheet)
+
+    Stock.objects.create(part=resistor, storage=storage, lot=lot, quantity=10, price_unit="0.0100", currency="USD")
+    Stock.objects.create(part=capacitor, storage=storage, quantity=4, status="reserved")
+
+    adapter = TypeAdapter(List[StockSchema])
+    expected = adapter.dump_python(adapter.validate_python(orm_page(100), from_attributes=True))
+    actual = adapter.dump_python(adapter.validate_python(projection_page(100)))
+
+    assert actual == expected
+    assert actual[0]["part"]["manufacturer"]["name"] == "Yageo"
+    assert [attachment["filename"] for attachment in actual[0]["storage"]["attachments"]] == ["r.pdf"]
+    assert actual[1]["lot"] is None
+
+
+@pytest.mark.django_db
+def test_select_skips_unrequested_relations():
+    part = Part.objects.create(name="Resistor", part_type="local")
+    storage = Storage.objects.create(name="Bin A")
+    Stock.objects.create(part=part, storage=storage, quantity=7)
+
+    projection = STOCK_PROJECTION.select(["quantity", "part.name"], None)
+    assert "JOIN" in str(projection.values(Stock.objects.all()).query)
+    [row] = projection.fetch(Stock.objects.all())
+    assert row == {"id": row["id"], "quantity": 7, "part": {"id": part.id, "name": "Resistor"}}
+
+    projection = STOCK_PROJECTION.select(["quantity", "storage_id"], None)
+    assert "JOIN" not in str(projection.values(Stock.objects.all()).query)
+    assert projection.fetch(Stock.objects.all())[0]["storage_id"] == storage.id
+
+    with pytest.raises(ValueError):
+        STOCK_PROJECTION.select(["colour"], None)
+
+
+@pytest.mark.django_db
+def test_select_expands_many_to_many():
+    project = Project.objects.create(name="Amp")
+    part = Part.objects.create(name="Op-amp", part_type="local")
+    substitute = Part.objects.create(name="Op-amp B", part_type="local")
+    item = BOMItem.objects.create(project=project, part=part, quantity=2)
+    item.substitutes.add(substitute)
+
+    projection = BOM_ITEM_PROJECTION.select(["quantity"], ["substitutes"])
+    [row] = projection.fetch(BOMItem.objects.all())
+    assert row["quantity"] == 2
+    assert set(row) == {"id", "quantity", "substitutes"}
+    assert [sub["name"] for sub in row["substitutes"]] == ["Op-amp B"]
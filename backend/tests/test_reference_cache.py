@@ -0,0 +1,43 @@
+import pytest
+from django.db import transaction
+from core.reference_cache import designators
+from parts.models import Designator
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reference_cache_serves_hits_and_invalidates_on_save(django_assert_num_queries):
+    designator = Designator.objects.create(code="R", name="Resistor")
+    designators.invalidate()
+
+    assert designators.get(code="R").name == "Resistor"
+    assert [item.code for item in designators.all("code")] == ["R"]
+    with django_assert_num_queries(0):
+        cached = designators.get(code="R")
+    cached.name = "Changed locally"
+    assert designators.get(code="R").name == "Resistor"  # callers get copies
+
+    designator.name = "Resistors"
+    designator.save()
+    Designator.objects.create(code="C", name="Capacitor")
+    assert designators.get(code="R").name == "Resistors"
+    assert [item.code for item in designators.all("code")] == ["C", "R"]
+    assert designators.get(code="X") is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reference_cache_keeps_no_rows_of_rolled_back_transactions(django_assert_num_queries):
+    designators.invalidate()
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            Designator.objects.create(code="L", name="Inductor")
+            assert designators.get(code="L").name == "Inductor"
+            raise RuntimeError
+    assert designators.get(code="L") is None
+
+    Designator.objects.create(code="D", name="Diode")
+    with transaction.atomic():
+        designators.get(code="D")
+        with django_assert_num_queries(1):
+            designators.get(code="D")  # not stored yet
+    with django_assert_num_queries(0):
+        assert designators.get(code="D").name == "Diode"  # stored on commit
@@ -0,0 +1,72 @@
+import asyncio
+import httpx
+import pytest
+from core.models import Company
+from core.search_client import search_client
+from inventory.models import Stock, Storage
+from parts.models import Part
+from search.backends import PostgresBackend, SearchDispatcher
+
+
+@pytest.fixture
+def catalog():
+    murata = Company.objects.create(name="Murata", is_manufacturer=True)
+    drawer = Storage.objects.create(name="Drawer")
+    capacitor = Part.objects.create(name="Capacitor 100nF", mpn="GRM188R71H104", part_type="local", manufacturer=murata)
+    Part.objects.create(name="Capacitor 10uF", mpn="GRM21BR61A106", part_type="local", tags=["bulk"])
+    Part.objects.create(name="Resistor 10k", mpn="RC0805FR-0710KL", part_type="linked")
+    Stock.objects.create(part=capacitor, storage=drawer, quantity=50)
+    return murata
+
+
+@pytest.mark.django_db(transaction=True)  # the searches run on the database executor's threads
+def test_postgres_backend_ranks_filters_and_facets(catalog):
+    backend = PostgresBackend()
+    results = asyncio.run(backend.parts("capac", 1, 20, {}, None))
+    assert results["count"] == 2
+    assert {hit["name"] for hit in results["results"]} == {"Capacitor 100nF", "Capacitor 10uF"}
+    assert results["facets"]["manufacturer"] == [{"value": "Murata", "count": 1}]
+    assert results["facets"]["part_type"] == [{"value": "local", "count": 2}]
+
+    in_stock = asyncio.run(backend.parts("capacitor", 1, 20, {}, True))["results"]
+    assert [(hit["name"], hit["manufacturer"], hit["total_stock"]) for hit in in_stock] == [
+        ("Capacitor 100nF", "Murata", 50)
+    ]
+    assert asyncio.run(backend.parts("murata", 1, 20, {}, None))["count"] == 1  # manufacturer name
+    assert asyncio.run(backend.parts("0710K", 1, 20, {}, None))["count"] == 1  # MPN substring
+    assert asyncio.run(backend.parts("*", 1, 20, {"tags": ["bulk"]}, None))["count"] == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_postgres_backend_searches_locations():
+    shelf = Storage.objects.create(name="Shelf A")
+    bin_ = Storage.objects.create(name="Bin A1", parent=shelf, tags=["smd"])
+    Storage.objects.create(name="Bin B1", tags=["smd"])
+    backend = PostgresBackend()
+
+    ids, found = asyncio.run(backend.locations("bin", 0, 10, None, ["smd"], shelf.id))
+    assert (ids, found) == ([str(bin_.id)], 1)
+    Storage.objects.create(name="Bin A1a", parent=bin_)
+    ids, found = asyncio.run(backend.locations("bin", 0, 10, None, [], None, shelf.id))
+    assert (ids, found) == ([str(bin_.id)], 1)  # children only
+    assert asyncio.run(backend.location_suggestions("bin", 5)) == ["Bin A1", "Bin A1a", "Bin B1"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_dispatcher_falls_back_to_postgres_while_typesense_is_down(catalog, monkeypatch, settings):
+    settings.SEARCH_BACKEND = "typesense"
+    settings.SEARCH_FALLBACK = True
+    calls = []
+
+    async def unreachable(method, path, json=None, params=None):
+        calls.append(path)
+        raise httpx.ConnectError("connection refused")
+
+    monkeypatch.setattr(search_client, "request", unreachable)
+    dispatcher = SearchDispatcher()
+    backend, results = asyncio.run(dispatcher.run("parts", "resistor", 1, 20, {}, None))
+    assert backend == "postgres" and results["count"] == 1
+    backend, _ = asyncio.run(dispatcher.run("location_suggestions", "drawer", 5))
+    assert backend == "postgres"
+    assert len(calls) == 1  # skipped during the cooldown
+    assert dispatcher.stats()["fallbacks"] == 1
@@ -0,0 +1,45 @@
+import asyncio
+import httpx
+import pytest
+from core.search_client import TypesenseHTTP
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"found": 0, "hits": []})
+
+    http = TypesenseHTTP()
+    build = http._build
+
+    def build_with_transport():
+        client = build()
+        client._transport = httpx.MockTransport(handler)
+        return client
+
+    monkeypatch.setattr(http, "_build", build_with_transport)
+    return http, calls
+
+
+def test_requests_share_one_client_and_retry_connect_errors(transport, settings):
+    settings.TYPESENSE_RETRIES = 1
+    http, calls = transport
+
+    async def run():
+        first = await http.request("GET", "/collections/parts/documents/search", params={"q": "10k"})
+        second = await http.request("GET", "/collections/parts/documents/search", params={"q": "10k"})
+        await http.aclose()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.json() == second.json() == {"found": 0, "hits": []}
+    assert calls[0].headers["X-TYPESENSE-API-KEY"] == settings.TYPESENSE_API_KEY
+    stats = http.stats()
+    assert stats["clients_opened"] == 1 and stats["retries"] == 1
+    endpoint = stats["endpoints"]["GET /collections/parts/documents/search"]
+    assert endpoint["requests"] == 3 and endpoint["errors"] == 1
@@ -0,0 +1,142 @@
+import pytest
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from core.models import SearchOutbox
+from core.search_outbox import OutboxWorker, outbox_stats
+from core.typesense import registry
+from inventory.models import Stock, Storage
+from parts.models import Part
+
+
+class FakeDocuments:
+    def __init__(self):
+        self.imported = []
+        self.documents = []
+        self.deleted = []
+        self.error = None
+
+    def import_(self, docs, params):
+        if self.error:
+            raise self.error
+        self.imported.append([doc["name"] for doc in docs])
+        self.documents.extend(docs)
+        return [{"success": True} for _ in docs]
+
+    def delete(self, params):
+        self.deleted.append(params["filter_by"])
+
+
+class FakeClient:
+    def __init__(self):
+        self.documents = FakeDocuments()
+        self.collections = {"storage": self, "parts": self}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(registry, "_client", fake)
+    return fake.documents
+
+
+@pytest.mark.django_db
+def test_outbox_coalesces_and_skips_rolled_back_writes(client):
+    storage = Storage.objects.create(name="Bin A")
+    storage.name = "Bin A1"
+    storage.save()
+    with transaction.atomic():
+        Storage.objects.create(name="Ghost")
+        transaction.set_rollback(True)
+
+    assert SearchOutbox.objects.count() == 2
+    worker = OutboxWorker()
+    assert worker.drain() == 2
+    assert client.imported == [["Bin A1"]]
+    assert SearchOutbox.objects.count() == 0
+
+    storage_id = storage.id
+    storage.delete()
+    worker.drain()
+    assert client.deleted == [f"id:[{storage_id}]"]
+    assert worker.stats()["indexed"] == 2
+
+
+@pytest.mark.django_db
+def test_outbox_retries_failures_with_backoff(client):
+    Storage.objects.create(name="Bin B")
+    client.error = ConnectionError("Typesense is down")
+
+    worker = OutboxWorker()
+    assert worker.drain() == 1
+    row = SearchOutbox.objects.get()
+    assert row.attempts == 1 and row.last_error == "Typesense is down"
+    assert worker.drain() == 0  # not due until the backoff passes
+
+    stats = outbox_stats()
+    assert stats["pending"] == 1 and stats["retrying"] == 1 and stats["max_attempts"] == 1
+    assert worker.stats()["failed"] == 1
+
+
+@pytest.mark.django_db
+def test_part_documents_follow_stock_changes(client):
+    part = Part.objects.create(name="Resistor 10k", mpn="RC0805-10K", part_type="local", tags=["smd"])
+    storage = Storage.objects.create(name="Drawer")
+    Stock.objects.create(part=part, storage=storage, quantity=25)
+
+    assert SearchOutbox.objects.filter(collection="parts", document_id=str(part.id)).count() == 2
+    OutboxWorker().drain()
+    document = next(doc for doc in client.documents if doc.get("mpn") == "RC0805-10K")
+    assert document["total_stock"] == 25
+    assert document["tags"] == ["smd"] and document["part_type"] == "local"
+
+
+@pytest.mark.django_db
+def test_storage_documents_carry_stock_and_ancestors(client):
+    shelf = Storage.objects.create(name="Shelf")
+    bin_ = Storage.objects.create(name="Bin", parent=shelf, tags=["smd"])
+    part = Part.objects.create(name="Capacitor", part_type="local")
+    Stock.objects.create(part=part, storage=bin_, quantity=4)
+    OutboxWorker().drain()
+    document = [doc for doc in client.documents if doc["id"] == str(bin_.id)][-1]
+    assert document["ancestors"] == [str(shelf.id)] and document["parent_id"] == str(shelf.id)
+    assert document["tags"] == ["smd"] and document["stock_quantity"] == 4 and document["has_stock"] is True
+
+    cabinet = Storage.objects.create(name="Cabinet")
+    shelf.parent = cabinet
+    shelf.save()  # the move queues the whole subtree
+    OutboxWorker().drain()
+    document = [doc for doc in client.documents if doc["id"] == str(bin_.id)][-1]
+    assert document["ancestors"] == [str(cabinet.id), str(shelf.id)]
+
+
+@pytest.mark.django_db
+def test_storage_subtree_is_queued_only_when_it_moves():
+    shelf = Storage.objects.create(name="Shelf")
+    bin_ = Storage.objects.create(name="Bin", parent=shelf)
+    Storage.objects.create(name="Other")
+    SearchOutbox.objects.all().delete()
+
+    shelf.name = "Shelf A"
+    shelf.save()
+    assert list(SearchOutbox.objects.values_list("document_id", flat=True)) == [str(shelf.id)]
+
+    SearchOutbox.objects.all().delete()
+    shelf.parent = Storage.objects.get(name="Other")
+    shelf.save()
+    assert set(SearchOutbox.objects.values_list("document_id", flat=True)) == {str(shelf.id), str(bin_.id)}
+
+    SearchOutbox.objects.all().delete()
+    Storage.objects.get(pk=shelf.pk).delete()
+    assert set(SearchOutbox.objects.values_list("document_id", flat=True)) == {str(shelf.id), str(bin_.id)}
+
+
+@pytest.mark.django_db
+def test_postgres_backend_queues_nothing(settings):
+    settings.SEARCH_BACKEND = "postgres"
+    Storage.objects.create(name="Bin P")
+    assert not SearchOutbox.objects.exists()
+
+    settings.SEARCH_BACKEND = "elastic"
+    with pytest.raises(ImproperlyConfigured):
+        apps.get_app_config("core").ready()
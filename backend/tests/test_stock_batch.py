@@ -0,0 +1,46 @@
+import pytest
+from parts.models import Part
+from inventory.batch import apply_stock_batch
+from inventory.models import Storage, Stock, StockMovement, PartStockSummary
+from inventory.summary import check_summaries
+
+
+@pytest.mark.django_db
+def test_batch_adjust_and_move():
+    part = Part.objects.create(name="Resistor 10k", part_type="local")
+    bin_a = Storage.objects.create(name="Bin A")
+    bin_b = Storage.objects.create(name="Bin B")
+    reel = Stock.objects.create(part=part, storage=bin_a, quantity=100)
+    tray = Stock.objects.create(part=part, storage=bin_a, quantity=10)
+
+    result = apply_stock_batch(
+        [
+            {"op": "adjust", "stock_id": reel.id, "delta": -20},
+            {"op": "move", "stock_id": reel.id, "storage_id": bin_b.id, "quantity": 30},
+            {"op": "move", "stock_id": tray.id, "storage_id": bin_b.id},
+        ]
+    )
+
+    entries = {(row["storage_id"], row["quantity"]) for row in result}
+    assert entries == {(bin_a.id, 50), (bin_b.id, 30), (bin_b.id, 10)}
+    assert PartStockSummary.objects.get(part=part).available == 90
+    assert check_summaries() == []
+    assert StockMovement.objects.filter(part_id=part.id, reason="transfer").count() == 4
+
+
+@pytest.mark.django_db
+def test_batch_is_all_or_nothing():
+    part = Part.objects.create(name="Capacitor", part_type="local")
+    storage = Storage.objects.create(name="Bin C")
+    stock = Stock.objects.create(part=part, storage=storage, quantity=5)
+
+    with pytest.raises(ValueError) as error:
+        apply_stock_batch(
+            [
+                {"op": "adjust", "stock_id": stock.id, "delta": 10},
+                {"op": "adjust", "stock_id": stock.id, "delta": -20},
+            ]
+        )
+    assert error.value.args[1] == 409
+    assert Stock.objects.get(id=stock.id).quantity == 5
+    assert PartStockSummary.objects.get(part=part).available == 5
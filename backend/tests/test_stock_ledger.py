@@ -0,0 +1,61 @@
+from datetime import timedelta
+from decimal import Decimal
+import pytest
+from django.utils import timezone
+from parts.models import Part
+from inventory.models import Storage, Stock, StockMovement
+from inventory.ledger import stock_as_of, take_snapshot
+from inventory.valuation import value_history
+
+
+@pytest.mark.django_db
+def test_movements_recorded_for_stock_changes():
+    part = Part.objects.create(name="Resistor", part_type="local")
+    bin_a = Storage.objects.create(name="Bin A")
+    bin_b = Storage.objects.create(name="Bin B")
+
+    stock = Stock.objects.create(part=part, storage=bin_a, quantity=10, price_unit=Decimal("0.5"))
+    stock.quantity = 4
+    stock.save()
+    stock.storage = bin_b
+    stock.save()
+    stock.delete()
+
+    reasons = list(StockMovement.objects.values_list("reason", "quantity_delta"))
+    assert reasons == [("create", 10), ("adjust", -6), ("transfer", -4), ("transfer", 4), ("delete", -4)]
+    assert sum(StockMovement.objects.values_list("value_delta", flat=True)) == 0
+
+
+@pytest.mark.django_db
+def test_stock_as_of_uses_snapshot_and_tail():
+    part = Part.objects.create(name="Capacitor", part_type="local")
+    storage = Storage.objects.create(name="Bin C")
+    stock = Stock.objects.create(part=part, storage=storage, quantity=100)
+
+    snapshot = take_snapshot()
+    assert snapshot.lines.get().quantity == 100
+
+    middle = timezone.now()
+    stock.quantity = 70
+    stock.save()
+
+    assert [p["quantity"] for p in stock_as_of(middle, part_id=part.id)] == [100]
+    assert [p["quantity"] for p in stock_as_of(timezone.now(), part_id=part.id)] == [70]
+
+
+@pytest.mark.django_db
+def test_value_history_replays_daily_movements():
+    part = Part.objects.create(name="MCU", part_type="local")
+    storage = Storage.objects.create(name="Bin D")
+    now = timezone.now()
+
+    StockMovement.objects.create(
+        created_at=now - timedelta(days=3), stock_id=part.id, part_id=part.id, storage_id=storage.id,
+        quantity_delta=10, value_delta=Decimal("20"), reason="create",
+    )
+    StockMovement.objects.create(
+        created_at=now - timedelta(days=1), stock_id=part.id, part_id=part.id, storage_id=storage.id,
+        quantity_delta=-5, value_delta=Decimal("-10"), reason="adjust",
+    )
+
+    assert value_history(days=5, now=now) == [0, 20, 20, 10, 10]
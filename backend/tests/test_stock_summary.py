@@ -0,0 +1,63 @@
+import pytest
+from parts.models import Part
+from inventory.models import Storage, Stock, PartStockSummary
+from inventory.summary import check_summaries, rebuild_summaries
+
+
+@pytest.mark.django_db
+def test_summary_tracks_stock_writes():
+    """PartStockSummary follows creates, updates, status changes and deletes."""
+    part = Part.objects.create(name="Resistor 10k", part_type="local")
+    other = Part.objects.create(name="Resistor 1k", part_type="local")
+    bin_a = Storage.objects.create(name="Bin A")
+
+    stock = Stock.objects.create(part=part, storage=bin_a, quantity=100)
+    Stock.objects.create(part=part, storage=bin_a, quantity=7, status=Stock.StockStatus.ORDERED)
+    summary = PartStockSummary.objects.get(part=part)
+    assert (summary.available, summary.ordered) == (100, 7)
+
+    stock.quantity = 60
+    stock.save()
+    assert PartStockSummary.objects.get(part=part).available == 60
+
+    stock = Stock.objects.get(id=stock.id)
+    stock.status = Stock.StockStatus.RESERVED
+    stock.save()
+    summary = PartStockSummary.objects.get(part=part)
+    assert (summary.available, summary.reserved) == (0, 60)
+
+    stock.part = other
+    stock.save()
+    assert PartStockSummary.objects.get(part=part).reserved == 0
+    assert PartStockSummary.objects.get(part=other).reserved == 60
+
+    stock.delete()
+    assert PartStockSummary.objects.get(part=other).reserved == 0
+    assert check_summaries() == []
+
+
+@pytest.mark.django_db
+def test_check_and_rebuild_summaries():
+    part = Part.objects.create(name="Capacitor 100n", part_type="local")
+    storage = Storage.objects.create(name="Bin B")
+    Stock.objects.create(part=part, storage=storage, quantity=25)
+
+    # Bypass the signals to simulate drift
+    Stock.objects.filter(part=part).update(quantity=40)
+    mismatches = check_summaries()
+    assert len(mismatches) == 1
+    assert mismatches[0]["expected"]["available"] == 40
+
+    assert rebuild_summaries() == 1
+    assert check_summaries() == []
+    assert PartStockSummary.objects.get(part=part).available == 40
+
+
+@pytest.mark.django_db
+def test_part_delete_cascades_summary():
+    part = Part.objects.create(name="Diode", part_type="local")
+    storage = Storage.objects.create(name="Bin C")
+    Stock.objects.create(part=part, storage=storage, quantity=5)
+
+    part.delete()
+    assert not PartStockSummary.objects.exists()
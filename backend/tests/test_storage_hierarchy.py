@@ -0,0 +1,50 @@
+import pytest
+from parts.models import Part
+from inventory.hierarchy import filter_descendants, subtree_rollup
+from inventory.models import Storage, Stock
+
+
+@pytest.mark.django_db
+def test_paths_follow_parent_changes():
+    shelf = Storage.objects.create(name="SM01")
+    row = Storage.objects.create(name="SM01-1", parent=shelf)
+    drawer = Storage.objects.create(name="SM01-1A", parent=row)
+    cabinet = Storage.objects.create(name="Cabinet")
+
+    assert drawer.path == f"{shelf.id.hex}/{row.id.hex}/{drawer.id.hex}/"
+    assert set(filter_descendants(Storage.objects.all(), shelf.id)) == {row, drawer}
+
+    row.parent = cabinet
+    row.save()
+    drawer.refresh_from_db()
+    assert drawer.path == f"{cabinet.id.hex}/{row.id.hex}/{drawer.id.hex}/"
+    assert not filter_descendants(Storage.objects.all(), shelf.id).exists()
+
+    cabinet.parent = drawer
+    with pytest.raises(ValueError):
+        cabinet.save()
+
+    cabinet.refresh_from_db()
+    cabinet.delete()
+    drawer.refresh_from_db()
+    assert drawer.path == f"{row.id.hex}/{drawer.id.hex}/"
+
+
+@pytest.mark.django_db
+def test_subtree_rollup():
+    part = Part.objects.create(name="Resistor", part_type="local")
+    shelf = Storage.objects.create(name="SM01")
+    row = Storage.objects.create(name="SM01-1", parent=shelf)
+    drawer = Storage.objects.create(name="SM01-1A", parent=row)
+    Storage.objects.create(name="SM01-2", parent=shelf)
+    Stock.objects.create(part=part, storage=row, quantity=5)
+    Stock.objects.create(part=part, storage=drawer, quantity=20)
+
+    subtree = subtree_rollup(shelf.id)
+    assert (subtree["total_locations"], subtree["used_locations"], subtree["total_quantity"]) == (4, 2, 25)
+
+    nodes = {node["name"]: node for node in subtree["locations"]}
+    assert subtree["locations"][0]["id"] == shelf.id
+    assert (nodes["SM01-1"]["quantity"], nodes["SM01-1"]["total_quantity"], nodes["SM01-1"]["depth"]) == (5, 25, 1)
+    assert nodes["SM01-1A"]["depth"] == 2
+    assert nodes["SM01-2"]["total_quantity"] == 0
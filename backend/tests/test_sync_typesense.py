@@ -0,0 +1,109 @@
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from core.typesense import SearchEngine, registry
+from inventory.models import Stock, Storage
+from parts.models import Part
+
+
+class FakeEngine(SearchEngine):
+    """Typesense collections and aliases, in memory."""
+
+    name = "typesense"
+
+    def __init__(self):
+        self.collections = {}
+        self.aliases = {}
+        self.upserts = []
+
+    def resolve(self, name):
+        return self.aliases.get(name, name)
+
+    def create_collection(self, collection, name=None):
+        self.collections.setdefault(name or collection.name, {})
+
+    def drop_collection(self, name):
+        self.collections.pop(self.resolve(name), None)
+
+    def upsert(self, name, documents):
+        self.upserts.append((name, [document["name"] for document in documents]))
+        self.collections[self.resolve(name)].update({document["id"]: document for document in documents})
+        return {}
+
+    def delete(self, name, ids):
+        for document_id in ids:
+            self.collections[self.resolve(name)].pop(document_id, None)
+
+    def exists(self, name):
+        return self.resolve(name) in self.collections
+
+    def document_ids(self, name):
+        return list(self.collections[self.resolve(name)])
+
+    def alias_target(self, name):
+        return self.aliases.get(name)
+
+    def point_alias(self, name, target):
+        self.aliases[name] = target
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    fake = FakeEngine()
+    monkeypatch.setattr(registry, "_engine", fake)
+    return fake
+
+
+@pytest.mark.django_db
+def test_full_sync_swaps_an_alias_to_a_new_version(engine):
+    Storage.objects.create(name="Shelf")
+    engine.collections["storage"] = {"stale": {"id": "stale", "name": "Old"}}  # from before versioning
+
+    call_command("sync_typesense", "--collection", "storage", "--batch-size", "1", stdout=StringIO())
+    first = engine.alias_target("storage")
+    assert first.startswith("storage_") and "storage" not in engine.collections
+    assert [doc["name"] for doc in engine.collections[first].values()] == ["Shelf"]
+
+    Storage.objects.create(name="Bin")
+    call_command("sync_typesense", "--collection", "storage", stdout=StringIO())
+    second = engine.alias_target("storage")
+    assert second != first and list(engine.collections) == [second]  # the old version is dropped
+    assert sorted(doc["name"] for doc in engine.collections[second].values()) == ["Bin", "Shelf"]
+
+
+@pytest.mark.django_db
+def test_since_last_syncs_updated_rows_and_removes_deleted_ones(engine):
+    shelf = Storage.objects.create(name="Shelf")
+    bin_ = Storage.objects.create(name="Bin")
+    call_command("sync_typesense", "--collection", "storage", stdout=StringIO())
+    live = engine.alias_target("storage")
+
+    Storage.objects.filter(pk=shelf.pk).update(name="Shelf A", updated_at=timezone.now())  # no signals
+    Storage.objects.filter(pk=bin_.pk).delete()
+    engine.upserts.clear()
+    call_command("sync_typesense", "--collection", "storage", "--since", "last", stdout=StringIO())
+
+    assert engine.alias_target("storage") == live
+    assert engine.upserts == [("storage", ["Shelf A"])]
+    assert [doc["name"] for doc in engine.collections[live].values()] == ["Shelf A"]
+
+
+@pytest.mark.django_db
+def test_since_last_sees_moved_subtrees_and_removed_stock(engine):
+    shelf, cabinet = Storage.objects.create(name="Shelf"), Storage.objects.create(name="Cabinet")
+    drawer = Storage.objects.create(name="Drawer", parent=shelf)
+    bin_ = Storage.objects.create(name="Bin", parent=drawer)
+    stock = Stock.objects.create(part=Part.objects.create(name="Resistor", part_type="local"), storage=bin_, quantity=5)
+    call_command("sync_typesense", "--collection", "storage", stdout=StringIO())
+    live = engine.alias_target("storage")
+    assert engine.collections[live][str(bin_.id)]["has_stock"] is True
+
+    drawer.parent = cabinet
+    drawer.save()  # rewrites the path of Bin with QuerySet.update
+    stock.delete()
+    call_command("sync_typesense", "--collection", "storage", "--since", "last", stdout=StringIO())
+
+    document = engine.collections[live][str(bin_.id)]
+    assert document["ancestors"] == [str(cabinet.id), str(drawer.id)]
+    assert (document["stock_quantity"], document["has_stock"]) == (0, False)
@@ -0,0 +1,57 @@
+from datetime import timedelta
+from decimal import Decimal
+import pytest
+from django.utils import timezone
+from parts.models import Part
+from inventory.models import Storage, Stock, StockMovement, StockValuation
+from inventory.valuation import record_valuations, valuation, value_history
+
+
+@pytest.mark.django_db
+def test_valuation_sums_quantity_times_price_per_currency_and_status():
+    part = Part.objects.create(name="Resistor", part_type="local")
+    storage = Storage.objects.create(name="Bin A")
+    Stock.objects.create(part=part, storage=storage, quantity=10, price_unit=Decimal("2"), currency="USD")
+    Stock.objects.create(part=part, storage=storage, quantity=1, price_unit=Decimal("100"))
+    Stock.objects.create(part=part, storage=storage, quantity=5, price_unit=Decimal("3"), currency="EUR")
+    Stock.objects.create(part=part, storage=storage, quantity=4, price_unit=Decimal("1"), currency="USD", status="ordered")
+    Stock.objects.create(part=part, storage=storage, quantity=7)
+
+    # Not SUM(quantity) * SUM(price_unit), and blank currencies count as INVENTORY_CURRENCY
+    assert [(line["currency"], line["status"], line["quantity"], line["value"]) for line in valuation()] == [
+        ("EUR", None, 5, Decimal("15")),
+        ("USD", None, 18, Decimal("120")),
+        ("USD", "ordered", 4, Decimal("4")),
+    ]
+
+
+@pytest.mark.django_db
+def test_value_history_reads_recorded_days():
+    part = Part.objects.create(name="MCU", part_type="local")
+    storage = Storage.objects.create(name="Bin B")
+    now = timezone.now()
+
+    StockMovement.objects.create(
+        created_at=now - timedelta(days=3), stock_id=part.id, part_id=part.id, storage_id=storage.id,
+        currency="USD", quantity_delta=10, value_delta=Decimal("20"), reason="create",
+    )
+    StockMovement.objects.create(
+        created_at=now - timedelta(days=3), stock_id=part.id, part_id=part.id, storage_id=storage.id,
+        currency="EUR", quantity_delta=1, value_delta=Decimal("50"), reason="create",
+    )
+    recorded = record_valuations(now=now, lag=0)
+    assert [valuation.day for valuation in recorded] == [
+        timezone.localtime(now).date() - timedelta(days=days) for days in (3, 2, 1)
+    ]
+    assert record_valuations(now=now, lag=0) == []
+
+    StockMovement.objects.create(
+        created_at=now, stock_id=part.id, part_id=part.id, storage_id=storage.id,
+        currency="USD", quantity_delta=-5, value_delta=Decimal("-10"), reason="adjust",
+    )
+    assert value_history(days=5, currency="USD", now=now) == [0, 20, 20, 20, 10]
+    assert value_history(days=5, currency="EUR", now=now) == [0, 50, 50, 50, 50]
+
+    # Recorded days are read back rather than replayed from the ledger
+    StockValuation.objects.get(day=recorded[1].day).lines.filter(currency="USD").update(value=Decimal("99"))
+    assert value_history(days=5, currency="USD", now=now) == [0, 20, 99, 20, 10]